@@ -0,0 +1,105 @@
+"""
+Scans the IoT traffic captures and builds the packet length histograms consumed by the nearest padding optimizer.
+Each capture gets its own histogram file, recorded in the manifest of the output folder with the digest of the
+capture, so captures that were already scanned are skipped (unless they changed) and adding a new day of traffic only
+costs that day. The per-capture histograms are then merged into a single file.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from glob import glob
+from os import cpu_count, makedirs
+from os.path import join, basename
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import typer
+
+from adaptive_padding.constants import FolderPath, HISTOGRAM_GROUP
+from adaptive_padding.utils.capture import capture_day, load_devices, load_capture
+from adaptive_padding.utils.histogram import LengthHistogram, DEFAULT_KEY, merge_histograms, save_histograms, \
+    load_histograms
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+
+
+def scan_capture(
+        filepath: str,
+        group_by: HISTOGRAM_GROUP,
+        devices: Optional[Set[str]],
+        chunksize: int) -> Dict[str, LengthHistogram]:
+    """
+    Builds the packet length histograms of a capture, reading it in chunks so that memory does not grow with its size.
+
+    Parameters:
+    filepath: compressed CSV file with the IoT traffic.
+    group_by: one histogram for the whole capture, one per device MAC address or one per day.
+    devices: MAC addresses whose packets are counted. When None, every packet is counted.
+    chunksize: number of rows read at a time.
+    """
+    histograms: Dict[str, LengthHistogram] = {}
+    for chunk in load_capture(filepath, chunksize):
+        chunk = chunk.dropna(subset=["Length"])
+        if devices is not None:
+            chunk = chunk[chunk["src_mac"].isin(devices)]
+        if group_by == HISTOGRAM_GROUP.DEVICE:
+            groups = chunk.groupby("src_mac", observed=True)["Length"]
+        else:
+            key = capture_day(filepath) if group_by == HISTOGRAM_GROUP.DAY else DEFAULT_KEY
+            groups = [(key, chunk["Length"])]
+        for key, lengths in groups:
+            histograms.setdefault(key, LengthHistogram()).add(lengths.to_numpy(dtype=np.int64))
+    return histograms
+
+
+def histogram_filepath(output_folder: str, filepath: str) -> str:
+    return join(output_folder, f"{basename(filepath)}.npz")
+
+
+def process_file(output_folder: str, group_by: HISTOGRAM_GROUP, devices: Optional[Set[str]], chunksize: int, filepath: str):
+    histograms = scan_capture(filepath, group_by, devices, chunksize)
+    save_histograms(histogram_filepath(output_folder, filepath), histograms)
+
+
+def iterate_over_files(
+        csv_folder: str,
+        output_folder: str,
+        group_by: HISTOGRAM_GROUP,
+        devices: Optional[Set[str]],
+        chunksize: int) -> Dict[str, LengthHistogram]:
+    """
+    Builds the histograms of the captures that are new or changed since the last run, according to the manifest of the
+    output folder, and merges the histograms of every capture.
+    """
+    manifest = Manifest(output_folder)
+    device_list: Optional[List[str]] = sorted(devices) if devices is not None else None
+    fingerprints = {
+        filepath: fingerprint(
+            input=manifest.file_digest(filepath),
+            group_by=group_by.value,
+            devices=device_list,
+            code=code_version(scan_capture, load_capture, LengthHistogram))
+        for filepath in sorted(glob(join(csv_folder, "*.xz")))}
+    pending_files = [
+        filepath for filepath, file_fingerprint in fingerprints.items()
+        if not manifest.is_fresh(basename(filepath), file_fingerprint, [histogram_filepath(output_folder, filepath)])]
+    manifest.save()
+    print(f"Scanning {len(pending_files)} of {len(fingerprints)} captures.")
+    partial_process_file = partial(process_file, output_folder, group_by, devices, chunksize)
+    with ProcessPoolExecutor(max_workers=cpu_count()) as executor:
+        for filepath, _ in zip(pending_files, executor.map(partial_process_file, pending_files)):
+            manifest.record(basename(filepath), fingerprints[filepath])
+            manifest.save()
+    return merge_histograms(*[load_histograms(histogram_filepath(output_folder, filepath)) for filepath in fingerprints])
+
+
+def main(group_by: str = HISTOGRAM_GROUP.ALL.value, iot_only: bool = True, chunksize: int = 1_000_000):
+    histogram_group = HISTOGRAM_GROUP(group_by)
+    name = histogram_group.value if iot_only else f"{histogram_group.value}-all-devices"
+    devices = set(load_devices()) if iot_only else None
+    output_folder = join(FolderPath.HISTOGRAMS.value, name)
+    makedirs(output_folder, exist_ok=True)
+    histograms = iterate_over_files(FolderPath.RAW_DATA.value, output_folder, histogram_group, devices, chunksize)
+    save_histograms(join(FolderPath.HISTOGRAMS.value, f"{name}.npz"), histograms)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,47 +1,169 @@
+'''
+This script computes the byte overhead of the padding strategies: the bytes sent by the IoT devices once padded relative to the bytes of the original traffic, per strategy and broken down by day and device.
+
+Captures and partitions are reduced in parallel, one per worker, and each is read in chunks, so only the byte totals of each (day, device) are held in memory.
+The totals of the original traffic do not depend on the strategies, so they are stored with a manifest and only recomputed for new or changed captures.
+'''
 import glob
 import json
 from glob import glob
-from os.path import join
-from typing import Dict
+from os.path import join, basename
+from typing import Dict, Iterable, List
 
+import numpy as np
 import pandas as pd
 import typer
+from joblib import Parallel, delayed
 
-from adaptive_padding.constants import FolderPath
+from adaptive_padding.constants import FolderPath, STORAGE
 from adaptive_padding.experiment.evaluation import ExperimentConfiguration
-from adaptive_padding.prepare_features import Feature
-
-
-def process_file(csv_folder: str, output_folder: str, filename: str) -> pd.DataFrame:
-	features = Feature(csv_folder, output_folder)
-	dataset = Feature.load_dataset(filename)
-	dataset = features.encode_labels(dataset)
-	dataset = Feature.filter_iot_devices(dataset)
-	dataset.drop(dataset["Length"][dataset["Length"] == "None"].index, inplace=True)
-	return dataset
-
-
-def iterate_over_files(csv_folder: str, output_folder: str) -> pd.DataFrame:
-	dataset = pd.DataFrame()
-	files = glob(join(csv_folder, "*.xz"))
-	for filename in files:
-		data = process_file(csv_folder, output_folder, filename)
-		dataset = pd.concat([dataset, data])
-	return dataset
-
-
-def process_raw_data() -> int:
-	csv_folder = FolderPath.RAW_DATA.value
-	output_folder = FolderPath.GROUND_TRUTH_FEATURES.value
-	data = iterate_over_files(csv_folder, output_folder)
-	return data["Length"].sum()
-
-
-def process_padding_data(padding: str, padding_strategy: str) -> int:
-	csv_folder = join(FolderPath.PADDING_DATA.value, padding, padding_strategy)
-	output_folder = join(FolderPath.PADDING_FEATURES.value, padding_strategy)
-	data = iterate_over_files(csv_folder, output_folder)
-	return data["Length"].sum()
+from adaptive_padding.utils.capture import DEVICES_FILEPATH, capture_day, load_devices, encode_devices, load_capture
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+from adaptive_padding.utils.profiling import profiling, stage, count_rows
+from adaptive_padding.utils.storage import packet_store
+from adaptive_padding.utils.utils import create_folder
+
+CHUNK_SIZE: int = 1_000_000
+TOTAL_COLUMNS: List[str] = ["day", "device", "packets", "bytes"]
+BYTE_OVERHEAD_FILENAME: str = "byte_overhead.json"
+BREAKDOWN_FILENAME: str = "byte_overhead.csv"
+
+
+def accumulate_totals(datasets: Iterable[pd.DataFrame], day: str) -> pd.DataFrame:
+	"""
+	Counts the packets and sums their lengths per device over the chunks of one day of traffic.
+
+	Parameters:
+	datasets: chunks whose src_mac column holds integer labels; packets without a length are ignored.
+	day: day of the traffic, e.g. 16-09-23.
+
+	Returns:
+	the "day", "device", "packets" and "bytes" columns, one row per device.
+	"""
+	totals = None
+	for dataset in datasets:
+		dataset = dataset.dropna(subset=["Length"])
+		lengths = pd.Series(dataset["Length"].to_numpy(dtype=np.int64))
+		chunk_totals = lengths.groupby(dataset["src_mac"].to_numpy(dtype=np.int64)).agg(packets="count", bytes="sum")
+		totals = chunk_totals if totals is None else totals.add(chunk_totals, fill_value=0)
+	if totals is None:
+		return pd.DataFrame(columns=TOTAL_COLUMNS).astype({"device": np.int64, "packets": np.int64, "bytes": np.int64})
+	totals = totals.astype(np.int64).rename_axis("device").reset_index()
+	totals.insert(0, "day", day)
+	return totals[TOTAL_COLUMNS]
+
+
+def file_totals(filepath: str, chunksize: int = CHUNK_SIZE, devices_filepath: str = DEVICES_FILEPATH) -> pd.DataFrame:
+	"""
+	Computes the byte totals per device of a capture (original or padded), reading it in chunks.
+	"""
+	devices = load_devices(devices_filepath)
+
+	def encode(dataset: pd.DataFrame) -> pd.DataFrame:
+		labels, is_iot_device = encode_devices(dataset["src_mac"], devices)
+		return dataset.loc[is_iot_device].assign(src_mac=labels[is_iot_device])
+
+	with stage("load_lengths", file=basename(filepath)) as record:
+		return accumulate_totals(map(encode, count_rows(load_capture(filepath, chunksize), record)), capture_day(filepath))
+
+
+def partition_totals(padding_folder: str, padding_strategy: str, day: str, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
+	"""
+	Computes the byte totals per device of one day of traffic padded by a strategy, reading only that partition of the Parquet store.
+	"""
+	datasets = packet_store(padding_folder).iterate(["Length", "device"], chunksize, strategy=padding_strategy, day=day)
+	with stage("load_lengths", strategy=padding_strategy, day=day) as record:
+		return accumulate_totals((dataset.rename(columns={"device": "src_mac"}) for dataset in count_rows(datasets, record)), day)
+
+
+def concatenate_totals(totals: List[pd.DataFrame]) -> pd.DataFrame:
+	totals = [day_totals for day_totals in totals if not day_totals.empty]
+	if not totals:
+		return accumulate_totals([], "")
+	return pd.concat(totals, ignore_index=True)
+
+
+def totals_code_version() -> str:
+	return code_version(accumulate_totals, file_totals, load_capture)
+
+
+def raw_totals_filepath(output_folder: str, filepath: str) -> str:
+	return join(output_folder, f"{capture_day(filepath)}.csv")
+
+
+def process_raw_data(
+		csv_folder: str = FolderPath.RAW_DATA.value,
+		output_folder: str = FolderPath.RAW_BYTE_TOTALS.value,
+		chunksize: int = CHUNK_SIZE,
+		workers: int = -1) -> pd.DataFrame:
+	"""
+	Returns the byte totals per day and device of the original captures. The totals of each capture are stored in the output folder and only computed for the captures that are new or changed since the last run, according to the manifest of the folder.
+	"""
+	create_folder(output_folder, exist_ok=True)
+	manifest = Manifest(output_folder)
+	fingerprints = {
+		filepath: fingerprint(input=manifest.file_digest(filepath), code=totals_code_version())
+		for filepath in sorted(glob(join(csv_folder, "*.xz")))}
+	files = [
+		filepath for filepath, file_fingerprint in fingerprints.items()
+		if not manifest.is_fresh(basename(filepath), file_fingerprint, [raw_totals_filepath(output_folder, filepath)])]
+	manifest.save()
+	results = Parallel(n_jobs=workers, return_as="generator")(delayed(file_totals)(filepath, chunksize) for filepath in files)
+	for filepath, totals in zip(files, results):
+		totals.to_csv(raw_totals_filepath(output_folder, filepath), index=False)
+		manifest.record(basename(filepath), fingerprints[filepath])
+		manifest.save()
+	return concatenate_totals([
+		pd.read_csv(raw_totals_filepath(output_folder, filepath), dtype={"day": str}) for filepath in fingerprints])
+
+
+def process_padding_data(
+		padding: str,
+		padding_strategy: str,
+		storage: str = STORAGE.CSV.value,
+		chunksize: int = CHUNK_SIZE,
+		workers: int = -1) -> pd.DataFrame:
+	"""
+	Returns the byte totals per day and device of the traffic padded by a strategy.
+	"""
+	padding_folder = join(FolderPath.PADDING_DATA.value, padding)
+	if storage == STORAGE.PARQUET.value:
+		days = packet_store(padding_folder).partition_values("day", strategy=padding_strategy)
+		totals = Parallel(n_jobs=workers)(
+			delayed(partition_totals)(padding_folder, padding_strategy, day, chunksize) for day in days)
+	else:
+		files = sorted(glob(join(padding_folder, padding_strategy, "*.xz")))
+		totals = Parallel(n_jobs=workers)(delayed(file_totals)(filepath, chunksize) for filepath in files)
+	return concatenate_totals(totals)
+
+
+def compute_breakdown(raw_totals: pd.DataFrame, padding_totals: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+	"""
+	Joins the byte totals of each strategy with those of the original traffic.
+
+	Returns:
+	one row per (strategy, day, device) with the packets and bytes of the original ("raw_") and padded ("padded_") traffic and their ratio ("overhead").
+	"""
+	raw_totals = raw_totals.rename(columns={"packets": "raw_packets", "bytes": "raw_bytes"})
+	breakdown = []
+	for padding_strategy, totals in padding_totals.items():
+		totals = totals.rename(columns={"packets": "padded_packets", "bytes": "padded_bytes"})
+		strategy_breakdown = raw_totals.merge(totals, how="outer", on=["day", "device"])
+		strategy_breakdown.insert(0, "strategy", padding_strategy)
+		breakdown.append(strategy_breakdown)
+	breakdown = pd.concat(breakdown, ignore_index=True)
+	columns = ["raw_packets", "raw_bytes", "padded_packets", "padded_bytes"]
+	breakdown[columns] = breakdown[columns].fillna(0).astype(np.int64)
+	breakdown["overhead"] = breakdown["padded_bytes"] / breakdown["raw_bytes"].where(breakdown["raw_bytes"] > 0)
+	return breakdown.sort_values(["strategy", "day", "device"], kind="stable").reset_index(drop=True)
+
+
+def compute_byte_overhead(breakdown: pd.DataFrame) -> Dict[str, float]:
+	"""
+	Returns the byte overhead of each strategy over every day and device: the padded bytes divided by the original bytes.
+	"""
+	totals = breakdown.groupby("strategy", sort=False)[["raw_bytes", "padded_bytes"]].sum()
+	return {strategy: row["padded_bytes"] / row["raw_bytes"] for strategy, row in totals.iterrows()}
 
 
 def write_file(filename: str, overhead: Dict[str, float]):
@@ -49,17 +171,23 @@ def write_file(filename: str, overhead: Dict[str, float]):
 		json.dump(overhead, file_writer)
 
 
-def main(filename: str = ""):
-	configuration_file = join(FolderPath.CONFIGURATION.value, filename)
-	setup = ExperimentConfiguration.load_configuration(configuration_file)
-	raw_data_length = process_raw_data()
-	byte_overhead = {}
-
-	padding_strategies = setup["padding_strategies"]
-	for padding_strategy in padding_strategies:
-		padding_data_length = process_padding_data(setup["padding"], padding_strategy)
-		byte_overhead[padding_strategy] = padding_data_length / raw_data_length
-	write_file("byte_overhead.json", byte_overhead)
+def main(
+		filename: str = "",
+		storage: str = STORAGE.CSV.value,
+		chunksize: int = CHUNK_SIZE,
+		workers: int = -1,
+		profile: str = ""):
+	with profiling(profile, "compute_byte_overhead"):
+		configuration_file = join(FolderPath.CONFIGURATION.value, filename)
+		setup = ExperimentConfiguration.load_configuration(configuration_file)
+		raw_totals = process_raw_data(chunksize=chunksize, workers=workers)
+
+		padding_totals = {
+			padding_strategy: process_padding_data(setup["padding"], padding_strategy, STORAGE(storage).value, chunksize, workers)
+			for padding_strategy in setup["padding_strategies"]}
+		breakdown = compute_breakdown(raw_totals, padding_totals)
+		breakdown.to_csv(BREAKDOWN_FILENAME, index=False)
+		write_file(BYTE_OVERHEAD_FILENAME, compute_byte_overhead(breakdown))
 
 
 if __name__ == "__main__":
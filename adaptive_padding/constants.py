@@ -8,8 +8,24 @@ class FolderPath(Enum):
     PADDING_FEATURES = join("Data", "Processed", "padding_features")
     GROUND_TRUTH_FEATURES = join("Data", "Processed", "ground_truth_features")
     CONFIGURATION = join("Data", "Configuration")
+    LOOKUP_TABLES = join("Data", "Processed", "lookup_tables")
+    HISTOGRAMS = join("Data", "Processed", "histograms")
+    NEAREST_SOLUTIONS = join("Data", "Processed", "nearest_solutions")
+    GROUND_TRUTH_MODELS = join("Data", "Processed", "ground_truth_models")
+    RAW_BYTE_TOTALS = join("Data", "Processed", "raw_byte_totals")
 
 
 class ATTACKER(Enum):
     INTERNAL = "internal"
     EXTERNAL = "external"
+
+
+class HISTOGRAM_GROUP(Enum):
+    ALL = "all"
+    DEVICE = "device"
+    DAY = "day"
+
+
+class STORAGE(Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
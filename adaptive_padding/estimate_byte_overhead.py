@@ -0,0 +1,41 @@
+"""
+Estimates the byte overhead of the padding strategies from the packet length histograms written by build_histograms.py,
+without padding the captures.
+"""
+from os.path import join
+from typing import Dict, List
+
+import typer
+
+from adaptive_padding.constants import FolderPath
+from adaptive_padding.padding.overhead import estimate_overheads
+from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.padding.strategies_mapping_factory import create_existing_strategies_mapping, \
+    create_proposal_strategies_mapping, create_nearest_strategies_mapping
+from adaptive_padding.utils.histogram import load_histograms
+
+
+def create_strategies(padding: List[str], number_buckets: List[int], nearest_histogram: str) -> Dict[str, PaddingStrategy]:
+    strategies: Dict[str, PaddingStrategy] = {}
+    if "existing" in padding:
+        strategies.update(create_existing_strategies_mapping())
+    if "proposal" in padding:
+        strategies.update(create_proposal_strategies_mapping())
+    if "nearest" in padding:
+        strategies.update(create_nearest_strategies_mapping(nearest_histogram, number_buckets))
+    return strategies
+
+
+def main(
+        histograms: str = join(FolderPath.HISTOGRAMS.value, "all.npz"),
+        padding: List[str] = typer.Option(["existing", "proposal"]),
+        number_buckets: List[int] = typer.Option([10]),
+        nearest_histogram: str = join(FolderPath.HISTOGRAMS.value, "all.npz"),
+        output: str = "estimated_byte_overhead.csv"):
+    estimates = estimate_overheads(load_histograms(histograms), create_strategies(padding, number_buckets, nearest_histogram))
+    estimates.to_csv(output, index=False)
+    print(estimates[["strategy", "key", "overhead", "standard_deviation"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,243 @@
+"""
+Evaluation engine of the attacker experiments. Every (strategy, day, fold, classifier) combination is an independent
+task that fits its own clone of the estimator and returns its metrics, so tasks run on a pool of processes without
+sharing estimators or intermediate predictions. The features of each day are stored once as .npy files that every
+worker maps read-only, and tasks refer to their samples by index, so a task only carries file paths and fold indices.
+Models trained on the original traffic do not depend on the strategy, so they are kept in a ModelCache and fitted once
+for every strategy.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha256
+from os import makedirs, replace, getpid
+from os.path import join, exists
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import joblib
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, recall_score, f1_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from adaptive_padding.utils.profiling import stage
+
+TRAIN_TEST_SPLIT_FOLD: int = -1
+
+
+def create_classifiers() -> Dict[str, BaseEstimator]:
+    """
+    Returns the (unfitted) classifiers of the attacker, identified by their representation, e.g. "SVC()".
+    """
+    classifiers = [RandomForestClassifier(), SVC(), DecisionTreeClassifier(), KNeighborsClassifier(n_neighbors=5)]
+    return {str(classifier): classifier for classifier in classifiers}
+
+
+@lru_cache(maxsize=None)
+def map_array(filepath: str) -> np.ndarray:
+    """
+    Maps a .npy file read-only. Each worker maps a file once and the operating system shares its pages between workers.
+    """
+    return np.load(filepath, mmap_mode="r")
+
+
+@lru_cache(maxsize=None)
+def file_digest(filepath: str) -> str:
+    with open(filepath, mode="rb") as file_reader:
+        return sha256(file_reader.read()).hexdigest()
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """
+    Features (X) and labels (y) of one day of traffic stored as .npy files.
+    """
+    X_filepath: str
+    y_filepath: str
+
+    @staticmethod
+    def create(folder: str, name: str, X: np.ndarray, y: np.ndarray) -> "FeatureMatrix":
+        """
+        Stores the matrix in the folder, unless a matrix with the same name is already there (e.g. the ground truth of a
+        day shared by every strategy).
+        """
+        matrix = FeatureMatrix(join(folder, f"{name}-X.npy"), join(folder, f"{name}-y.npy"))
+        if not (exists(matrix.X_filepath) and exists(matrix.y_filepath)):
+            np.save(matrix.X_filepath, np.ascontiguousarray(X))
+            np.save(matrix.y_filepath, np.ascontiguousarray(y))
+        return matrix
+
+    @property
+    def X(self) -> np.ndarray:
+        return map_array(self.X_filepath)
+
+    @property
+    def y(self) -> np.ndarray:
+        return map_array(self.y_filepath)
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def digest(self) -> str:
+        """
+        Identifies the content of the matrix (values, dtype and shape), whatever format the features were loaded from.
+        """
+        return sha256(f"{file_digest(self.X_filepath)}:{file_digest(self.y_filepath)}".encode()).hexdigest()
+
+    def select(self, index: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the samples at the given positions, or every sample when index is None.
+        """
+        if index is None:
+            return self.X, self.y
+        return self.X[index], self.y[index]
+
+
+@dataclass
+class ModelCache:
+    """
+    Fitted models stored on disk, one joblib file per (training matrix, estimator) named after the digest of the matrix,
+    the class and parameters of the estimator and the scikit-learn version.
+    """
+    folder: str
+
+    @staticmethod
+    def key(matrix: FeatureMatrix, estimator: BaseEstimator) -> str:
+        components = {
+            "features": matrix.digest(),
+            "estimator": type(estimator).__name__,
+            "parameters": estimator.get_params(),
+            "sklearn": sklearn.__version__}
+        return sha256(json.dumps(components, sort_keys=True, default=str).encode()).hexdigest()
+
+    def filepath(self, key: str) -> str:
+        return join(self.folder, f"{key}.joblib")
+
+    def load(self, key: str) -> Optional[BaseEstimator]:
+        if not exists(self.filepath(key)):
+            return None
+        return joblib.load(self.filepath(key))
+
+    def store(self, key: str, model: BaseEstimator) -> None:
+        """
+        Writes the model atomically, so workers that fit the same model at the same time never read a partial file.
+        """
+        makedirs(self.folder, exist_ok=True)
+        temporary_filepath = f"{self.filepath(key)}.{getpid()}.tmp"
+        joblib.dump(model, temporary_filepath)
+        replace(temporary_filepath, self.filepath(key))
+
+    def fit(self, estimator: BaseEstimator, matrix: FeatureMatrix) -> BaseEstimator:
+        """
+        Returns the estimator fitted on every sample of the matrix, loading it from the cache when it was already fitted.
+        """
+        key = ModelCache.key(matrix, estimator)
+        model = self.load(key)
+        if model is None:
+            model = clone(estimator).fit(matrix.X, matrix.y)
+            self.store(key, model)
+        return model
+
+
+def fit_models(
+        model_cache: ModelCache,
+        estimators: Iterable[BaseEstimator],
+        matrices: Iterable[FeatureMatrix],
+        workers: int = 1) -> None:
+    """
+    Fills the cache with the models of every (matrix, estimator) pair, fitting the missing ones on a pool of workers
+    processes before the tasks that use them are dispatched.
+    """
+    pairs = [(matrix, estimator) for matrix in matrices for estimator in estimators]
+    Parallel(n_jobs=workers)(delayed(model_cache.fit)(estimator, matrix) for matrix, estimator in pairs)
+
+
+@dataclass(eq=False)
+class ClassificationTask:
+    """
+    Fits a classifier on the training samples of a fold and scores it on the test samples. The train-test split
+    experiment uses a single fold, TRAIN_TEST_SPLIT_FOLD, with every sample of the training and test matrices; its
+    models are taken from model_cache when one is given.
+    """
+    strategy: str
+    filename: str
+    fold: int
+    classifier: str
+    estimator: BaseEstimator
+    train: FeatureMatrix
+    test: FeatureMatrix
+    train_index: Optional[np.ndarray] = None
+    test_index: Optional[np.ndarray] = None
+    model_cache: Optional[ModelCache] = None
+
+
+@dataclass
+class ClassificationResult:
+    strategy: str
+    filename: str
+    fold: int
+    classifier: str
+    accuracy: float
+    recall: float
+    f1_score: float
+    fit_time: float = field(compare=False)
+    predict_time: float = field(compare=False)
+
+
+def compute_classifier_performance(y_test: np.ndarray, y_pred: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Calculates accuracy, recall, and F1-score metric values.
+    """
+    accuracy = accuracy_score(y_test, y_pred)
+    recall = recall_score(y_test, y_pred, average="micro")
+    f1_measurement = f1_score(y_test, y_pred, average="micro")
+    return accuracy, recall, f1_measurement
+
+
+def fit_model(task: ClassificationTask) -> BaseEstimator:
+    if task.model_cache is not None and task.train_index is None:
+        return task.model_cache.fit(task.estimator, task.train)
+    X_train, y_train = task.train.select(task.train_index)
+    return clone(task.estimator).fit(X_train, y_train)
+
+
+def run_task(task: ClassificationTask) -> ClassificationResult:
+    """
+    Fits (or loads) the model of the task and scores it. The fit and predict times are measured in seconds; the fit time
+    of a model taken from the cache is the time to load it.
+    """
+    labels = {"strategy": task.strategy, "file": task.filename, "fold": task.fold, "classifier": task.classifier}
+    start = time.perf_counter()
+    with stage("fit", **labels) as record:
+        model = fit_model(task)
+        record.rows = len(task.train) if task.train_index is None else len(task.train_index)
+    fit_time = time.perf_counter() - start
+    X_test, y_test = task.test.select(task.test_index)
+    start = time.perf_counter()
+    with stage("predict", **labels) as record:
+        y_pred = model.predict(X_test)
+        record.rows = len(y_test)
+    predict_time = time.perf_counter() - start
+    accuracy, recall, f1_measurement = compute_classifier_performance(y_test, y_pred)
+    return ClassificationResult(
+        task.strategy, task.filename, task.fold, task.classifier, accuracy, recall, f1_measurement, fit_time, predict_time)
+
+
+def run_tasks(tasks: Iterable[ClassificationTask], workers: int = 1) -> Iterator[ClassificationResult]:
+    """
+    Runs the tasks in order, in the current process or on a pool of worker processes. Tasks are consumed lazily, so
+    only the data of the tasks being dispatched is held in memory.
+
+    Parameters:
+    tasks: tasks to run.
+    workers: number of worker processes (-1 for one per CPU).
+    """
+    if workers == 1:
+        return map(run_task, tasks)
+    return Parallel(n_jobs=workers, return_as="generator")(delayed(run_task)(task) for task in tasks)
@@ -1,16 +1,27 @@
-import codecs
 import glob
 import json
-import lzma
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import islice
 from lzma import open as lzma_open
-from os import remove
 from os.path import join, basename
-from typing import Dict
+from shutil import rmtree
+from time import perf_counter
+from typing import Dict, List, Optional, TextIO, Tuple
 
+import numpy as np
 from tqdm import tqdm
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy
-from adaptive_padding.utils.utils import create_folder
+from adaptive_padding.constants import STORAGE
+from adaptive_padding.padding.padding_strategy import PaddingStrategy, LookupTablePaddingStrategy
+from adaptive_padding.utils.capture import capture_day, load_devices, encode_devices, load_capture
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+from adaptive_padding.utils.profiling import stage
+from adaptive_padding.utils.storage import PartitionedParquetWriter, packet_store
+from adaptive_padding.utils.utils import create_folder, derive_seed
+
+ENCODING: str = "ISO-8859-1"
 
 
 class ExperimentConfiguration:
@@ -19,70 +30,283 @@ class ExperimentConfiguration:
         return json.load(open(filepath, mode="r"))
 
 
+class CaptureChunk:
+    """
+    A batch of capture lines split around the packet length column, so that only that column is rewritten.
+    Lines whose length is not an integer (header, "None") are written unchanged.
+    """
+    def __init__(self, lines: List[str], packet_length_index: int):
+        self.lines = lines
+        self.positions: List[int] = []
+        self.heads: List[str] = []
+        self.tails: List[str] = []
+        lengths: List[int] = []
+        for position, line in enumerate(lines):
+            fields = line.split(",", packet_length_index + 1)
+            try:
+                length = fields[packet_length_index].replace('"', "").strip()
+                lengths.append(int(length))
+            except (ValueError, IndexError):
+                continue
+            prefix, _, suffix = fields[packet_length_index].partition(length)
+            self.positions.append(position)
+            self.heads.append(",".join(fields[:packet_length_index] + [prefix]))
+            self.tails.append(",".join([suffix] + fields[packet_length_index + 1:]))
+        self.lengths: np.ndarray = np.array(lengths, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def render(self, padded_lengths: np.ndarray) -> str:
+        """
+        Returns the chunk text with the packet length column replaced by the padded lengths.
+        """
+        lines = list(self.lines)
+        for position, head, padded_length, tail in zip(self.positions, self.heads, padded_lengths.tolist(), self.tails):
+            lines[position] = f"{head}{padded_length}{tail}"
+        return "".join(lines)
+
+
+@dataclass(frozen=True)
+class PaddingJob:
+    """
+    Pads one capture with one or more strategies. In single-pass mode a job holds every strategy.
+    """
+    filename: str
+    filepath: str
+    strategy_names: Tuple[str, ...]
+    position: int = 0
+
+    @property
+    def description(self) -> str:
+        return f"{self.filename} [{', '.join(self.strategy_names)}]"
+
+
 class PaddingExperiment:
     def __init__(
             self,
             csv_folder,
             output_folder,
             packet_length_index,
-            strategies_mapping):
+            strategies_mapping,
+            chunk_size: int = 100_000,
+            single_pass: bool = False,
+            workers: int = 1,
+            seed: Optional[int] = None,
+            lookup_table_folder: Optional[str] = None,
+            storage: str = STORAGE.CSV.value):
         self.csv_folder = csv_folder
         self.output_folder = output_folder
         self.packet_length_index = packet_length_index
         self.strategies_mapping: Dict[str, PaddingStrategy] = strategies_mapping
+        self.chunk_size = chunk_size
+        self.single_pass = single_pass
+        self.workers = workers
+        self.seed = seed
+        self.lookup_table_folder = lookup_table_folder
+        self.storage = storage
 
     def execute(self):
+        """
+        Pads the captures with every strategy. (capture, strategy) pairs recorded in the manifest of the output folder
+        with the same capture digest, strategy parameters, seed and code version are skipped.
+        """
         for strategy_name in self.strategies_mapping.keys():
-            _ = create_folder(join(self.output_folder, strategy_name))
-        self.__process_files()
+            _ = create_folder(self.strategy_folder(strategy_name), exist_ok=True)
+        self.compile_lookup_tables()
+        manifest = Manifest(self.output_folder)
+        fingerprints = self.create_fingerprints(manifest)
+        jobs = self.create_jobs(manifest, fingerprints)
+        manifest.save()
+        if self.workers > 1:
+            self.__process_jobs_in_parallel(jobs, manifest, fingerprints)
+        else:
+            self.__process_jobs(jobs, manifest, fingerprints)
 
-    @staticmethod
-    def write_file(line, output_file):
-        with codecs.open(output_file, "a+", "ISO-8859-1") as file_writer:
-            file_writer.write(line)
-
-    def __process_files(self):
-        files = glob.glob(join(self.csv_folder, "*.xz"))
-        current_file_number = 1
-        number_files = len(files)
+    def strategy_folder(self, strategy_name: str) -> str:
+        if self.storage == STORAGE.PARQUET.value:
+            return packet_store(self.output_folder).partition_folder(strategy=strategy_name)
+        return join(self.output_folder, strategy_name)
+
+    def compile_lookup_tables(self):
+        """
+        Builds (or loads) the lookup tables of deterministic strategies once, before the jobs are sent to the workers.
+        """
+        for strategy in self.strategies_mapping.values():
+            if isinstance(strategy, LookupTablePaddingStrategy):
+                strategy.compile_table(self.lookup_table_folder)
+
+    def create_fingerprints(self, manifest: Manifest) -> Dict[Tuple[str, str], Dict]:
+        """
+        Computes the fingerprint of every (capture, strategy) pair before any strategy is reseeded by a job.
+        """
+        fingerprints = {}
+        for filepath in sorted(glob.glob(join(self.csv_folder, "*.xz"))):
+            input_digest = manifest.file_digest(filepath)
+            for strategy_name, strategy in self.strategies_mapping.items():
+                fingerprints[(basename(filepath), strategy_name)] = fingerprint(
+                    input=input_digest,
+                    parameters=strategy.parameters(),
+                    seed=self.seed,
+                    packet_length_index=self.packet_length_index,
+                    storage=self.storage,
+                    code=code_version(type(strategy), PaddingExperiment))
+        return fingerprints
+
+    def output_path(self, strategy_name: str, filename: str) -> str:
+        if self.storage == STORAGE.PARQUET.value:
+            return packet_store(self.output_folder).partition_folder(strategy=strategy_name, day=capture_day(filename))
+        return self.output_filepath(strategy_name, filename)
+
+    def create_jobs(
+            self,
+            manifest: Optional[Manifest] = None,
+            fingerprints: Optional[Dict[Tuple[str, str], Dict]] = None) -> List[PaddingJob]:
+        """
+        Creates one job per (capture, strategy) pair, or one job per capture in single-pass mode. When a manifest is
+        given, pairs that are up to date are left out.
+        """
+        files = sorted(glob.glob(join(self.csv_folder, "*.xz")))
+        if self.single_pass:
+            groups = [tuple(self.strategies_mapping)]
+        else:
+            groups = [(strategy_name,) for strategy_name in self.strategies_mapping]
+        jobs = []
         for filepath in files:
             filename = basename(filepath)
-            print(f"Processing the file ({current_file_number}/{number_files}): {filename}")
-            self.__apply_padding_strategies(
-                filename,
-                filepath)
-            current_file_number += 1
+            for strategy_names in groups:
+                if manifest is not None:
+                    strategy_names = tuple(
+                        strategy_name for strategy_name in strategy_names
+                        if not manifest.is_fresh(
+                            f"{strategy_name}/{filename}",
+                            fingerprints[(filename, strategy_name)],
+                            [self.output_path(strategy_name, filename)]))
+                if not strategy_names:
+                    continue
+                position = len(jobs) % self.workers + 1 if self.workers > 1 else 0
+                jobs.append(PaddingJob(filename, filepath, strategy_names, position))
+        return jobs
+
+    @staticmethod
+    def record_job(job: PaddingJob, manifest: Manifest, fingerprints: Dict[Tuple[str, str], Dict]):
+        for strategy_name in job.strategy_names:
+            manifest.record(f"{strategy_name}/{job.filename}", fingerprints[(job.filename, strategy_name)])
+        manifest.save()
+
+    @staticmethod
+    def pad_lengths(strategy: PaddingStrategy, lengths: np.ndarray) -> np.ndarray:
+        """
+        Pads a batch of lengths, using the vectorized method of the strategy when it is available.
+        """
+        pad_many = getattr(strategy, "pad_many", None)
+        if pad_many is not None:
+            return pad_many(lengths)
+        return np.fromiter((strategy.pad(int(length)) for length in lengths), dtype=np.int64, count=len(lengths))
+
+    def read_chunks(self, input_file: TextIO):
+        """
+        Yields the capture in chunks of at most chunk_size lines.
+        """
+        while lines := list(islice(input_file, self.chunk_size)):
+            yield CaptureChunk(lines, self.packet_length_index)
+
+    def output_filepath(self, strategy_name: str, filename: str) -> str:
+        return join(self.output_folder, strategy_name, filename.replace(".csv.tar.xz", ".xz"))
+
+    def run_job(self, job: PaddingJob) -> Tuple[int, float]:
+        """
+        Decompresses and parses the capture once and feeds every strategy of the job from that parse.
+        Each strategy writes its own output. When a seed is set, every (capture, strategy) pair is
+        reseeded from it, so the output does not depend on the number of workers or on the order of the jobs.
+
+        Returns:
+        the number of rows processed and the elapsed time in seconds.
+        """
+        start = perf_counter()
+        strategies = {strategy_name: self.strategies_mapping[strategy_name] for strategy_name in job.strategy_names}
+        if self.seed is not None:
+            for strategy_name, strategy in strategies.items():
+                strategy.reseed(derive_seed(self.seed, job.filename, strategy_name))
+        with tqdm(
+                desc=job.description,
+                unit="rows",
+                unit_scale=True,
+                position=job.position,
+                leave=self.workers <= 1) as progress_bar, \
+                stage("pad", file=job.filename, strategies=",".join(job.strategy_names), storage=self.storage) as record:
+            if self.storage == STORAGE.PARQUET.value:
+                number_rows = self.pad_to_parquet(job, strategies, progress_bar)
+            else:
+                number_rows = self.pad_to_csv(job, strategies, progress_bar)
+            record.rows = number_rows
+        return number_rows, perf_counter() - start
+
+    def pad_to_csv(self, job: PaddingJob, strategies: Dict[str, PaddingStrategy], progress_bar: tqdm) -> int:
+        """
+        Writes a compressed copy of the capture per strategy in which only the packet length column is rewritten.
+        """
+        number_rows = 0
+        with ExitStack() as stack:
+            input_file = stack.enter_context(lzma_open(job.filepath, mode="rt", encoding=ENCODING))
+            output_files = {
+                strategy_name: stack.enter_context(
+                    lzma_open(self.output_filepath(strategy_name, job.filename), mode="wt", encoding=ENCODING))
+                for strategy_name in strategies}
+            for chunk in self.read_chunks(input_file):
+                for strategy_name, strategy in strategies.items():
+                    output_files[strategy_name].write(
+                        chunk.render(PaddingExperiment.pad_lengths(strategy, chunk.lengths)))
+                number_rows += len(chunk)
+                progress_bar.update(len(chunk))
+        return number_rows
+
+    def pad_to_parquet(self, job: PaddingJob, strategies: Dict[str, PaddingStrategy], progress_bar: tqdm) -> int:
+        """
+        Stores the time and padded length of the packets of IoT devices in the Parquet store, partitioned by strategy,
+        day and device. Every packet with a length is padded, in capture order, so random strategies draw the same
+        values as in CSV mode.
+        """
+        number_rows = 0
+        devices = load_devices()
+        day = capture_day(job.filename)
+        store = packet_store(self.output_folder)
+        for strategy_name in strategies:
+            rmtree(store.partition_folder(strategy=strategy_name, day=day), ignore_errors=True)
+        with PartitionedParquetWriter(store) as writer:
+            for chunk in load_capture(job.filepath, self.chunk_size):
+                number_rows += len(chunk)
+                progress_bar.update(len(chunk))
+                chunk = chunk.dropna(subset=["Length"])
+                lengths = chunk["Length"].to_numpy(dtype=np.int64)
+                labels, is_iot_device = encode_devices(chunk["src_mac"], devices)
+                labels, times = labels[is_iot_device], chunk["Time"].to_numpy()[is_iot_device]
+                for strategy_name, strategy in strategies.items():
+                    padded_lengths = PaddingExperiment.pad_lengths(strategy, lengths)
+                    writer.write_packets(strategy_name, day, labels, times, padded_lengths[is_iot_device])
+        return number_rows
+
+    def __process_jobs(self, jobs: List[PaddingJob], manifest: Manifest, fingerprints: Dict[Tuple[str, str], Dict]):
+        for job_number, job in enumerate(jobs, start=1):
+            print(f"Processing the job ({job_number}/{len(jobs)}): {job.description}")
+            number_rows, elapsed_time = self.run_job(job)
+            PaddingExperiment.report_throughput(job, number_rows, elapsed_time)
+            PaddingExperiment.record_job(job, manifest, fingerprints)
 
-    def __apply_padding_strategies(
+    def __process_jobs_in_parallel(
             self,
-            filename: str,
-            filepath: str):
-        for strategy_name in self.strategies_mapping:
-            print(f"Executing the padding strategy: {strategy_name}")
-            with lzma_open(filename=filepath, mode="rt", encoding="ISO-8859-1") as input_file:
-                output_strategy_folder = join(self.output_folder, strategy_name)
-                output_filepath = join(output_strategy_folder, filename.replace(".csv.tar.xz", ".csv"))
-                for line in tqdm(input_file.readlines()):
-                    self.__update_length(line, strategy_name, output_filepath)
-                self.__compress(output_filepath)
-                PaddingExperiment.remove_temporary_file(output_filepath)
-
-    def __update_length(self, line: str, strategy_name: str, output_filepath: str):
-        try:
-            length = line.split(",")[self.packet_length_index].replace('"', "")
-            modified_length = self.strategies_mapping[strategy_name].pad(int(length))
-            line = line.replace(length, str(modified_length))
-        except (ValueError, IndexError) as exception:
-            ...
-        finally:
-            PaddingExperiment.write_file(line, output_filepath)
-
-    def __compress(self, filepath: str) -> None:
-        print("Generating compressed file.")
-        output_file = lzma.LZMAFile(filepath.replace(".csv", ".xz"), mode="wb")
-        with open(filepath, mode="rt", encoding="ISO-8859-1") as file_reader:
-            output_file.write(file_reader.read().encode())
+            jobs: List[PaddingJob],
+            manifest: Manifest,
+            fingerprints: Dict[Tuple[str, str], Dict]):
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.run_job, job): job for job in jobs}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Jobs", position=0):
+                number_rows, elapsed_time = future.result()
+                PaddingExperiment.report_throughput(futures[future], number_rows, elapsed_time)
+                PaddingExperiment.record_job(futures[future], manifest, fingerprints)
 
     @staticmethod
-    def remove_temporary_file(filepath: str):
-        remove(filepath)
+    def report_throughput(job: PaddingJob, number_rows: int, elapsed_time: float):
+        tqdm.write(
+            f"{job.description}: padded {number_rows} rows in {elapsed_time:.2f} s "
+            f"({number_rows / max(elapsed_time, 1e-9):.0f} rows/s).")
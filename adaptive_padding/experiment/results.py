@@ -0,0 +1,129 @@
+"""
+Results table of the attacker experiments. The metrics and timings of every (strategy, attacker, day, fold, classifier)
+task are buffered in memory and written in batches (one row group per batch) to a single Parquet file, which the plots
+and statistical tests read instead of the per-strategy JSON summaries.
+"""
+from dataclasses import asdict
+from os import remove, replace
+from os.path import exists
+from typing import Dict, List, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from adaptive_padding.experiment.classification import ClassificationResult
+from adaptive_padding.utils.capture import capture_day
+
+RESULTS_FILENAME: str = "evaluation_results.parquet"
+BATCH_SIZE: int = 1_000
+METRICS: List[str] = ["accuracy", "recall", "f1_score"]
+
+RESULT_SCHEMA: pa.Schema = pa.schema([
+    ("strategy", pa.string()),
+    ("attacker", pa.string()),
+    ("day", pa.string()),
+    ("fold", pa.int32()),
+    ("classifier", pa.string()),
+    ("accuracy", pa.float64()),
+    ("recall", pa.float64()),
+    ("f1_score", pa.float64()),
+    ("fit_time", pa.float64()),
+    ("predict_time", pa.float64())])
+
+
+class ResultsSink:
+    """
+    Collects the results of a run. The rows of each (strategy, attacker) that receives new results replace the rows of
+    previous runs; the rows of the other strategies and attackers are kept. The new table replaces the file atomically
+    when the sink is closed; when the run fails, the new rows are discarded and the file is left unchanged.
+    """
+    def __init__(self, filepath: str = RESULTS_FILENAME, batch_size: int = BATCH_SIZE):
+        self.filepath = filepath
+        self.batch_size = batch_size
+        self.records: List[Dict] = []
+        self.replaced: Set[Tuple[str, str]] = set()
+        self.writer = None
+
+    @property
+    def temporary_filepath(self) -> str:
+        return f"{self.filepath}.tmp"
+
+    def append(self, attacker: str, result: ClassificationResult) -> None:
+        record = asdict(result)
+        record["attacker"] = attacker
+        record["day"] = capture_day(record.pop("filename"))
+        self.records.append(record)
+        self.replaced.add((result.strategy, attacker))
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.temporary_filepath, RESULT_SCHEMA)
+        self.writer.write_table(pa.Table.from_pylist(self.records, schema=RESULT_SCHEMA))
+        self.records.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is None:
+            return
+        if exists(self.filepath):
+            previous = pq.read_table(self.filepath, schema=RESULT_SCHEMA)
+            kept = [
+                (strategy, attacker) not in self.replaced
+                for strategy, attacker in zip(previous["strategy"].to_pylist(), previous["attacker"].to_pylist())]
+            if any(kept):
+                self.writer.write_table(previous.filter(pa.array(kept)))
+        self.writer.close()
+        self.writer = None
+        replace(self.temporary_filepath, self.filepath)
+
+    def discard(self) -> None:
+        """
+        Drops the rows collected so far without touching the results file.
+        """
+        self.records.clear()
+        self.replaced.clear()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if exists(self.temporary_filepath):
+            remove(self.temporary_filepath)
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+def load_results(filepath: str = RESULTS_FILENAME, **filters) -> pd.DataFrame:
+    """
+    Loads the rows of the results table whose columns are equal to the given values, e.g. attacker="external".
+    """
+    results = pq.read_table(filepath, filters=[(column, "=", value) for column, value in filters.items()] or None)
+    return results.to_pandas()
+
+
+def summarize_results(results: pd.DataFrame) -> Dict[str, List[Dict]]:
+    """
+    Returns, for each strategy, the average, minimum and maximum of each metric per classifier, in the format of the
+    JSON files written by the evaluation ({"name": classifier, "Average accuracy": ..., ...}).
+    """
+    summary = {}
+    for strategy, strategy_results in results.groupby("strategy", sort=False):
+        summary[strategy] = []
+        for classifier, classifier_results in strategy_results.groupby("classifier", sort=False):
+            performance = {"name": classifier}
+            for metric in METRICS:
+                performance[f"Average {metric}"] = classifier_results[metric].mean()
+                performance[f"Min {metric}"] = classifier_results[metric].min()
+                performance[f"Max {metric}"] = classifier_results[metric].max()
+            summary[strategy].append(performance)
+    return summary
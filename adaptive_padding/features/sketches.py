@@ -0,0 +1,97 @@
+"""
+Length sketches of the traffic of a device in a window: the counts of a fixed histogram of the packet lengths over
+0..1514 bytes (the largest Ethernet frame) and the quantiles interpolated from it. A sketch takes a fixed number of
+counters whatever the number of packets, is computed for every window of a chunk with a single bincount, and sketches of
+the same window from different chunks, captures or finer windows merge by adding their counts.
+
+The bins are bin_width bytes wide. Quantiles are interpolated within a bin, so they cannot tell apart lengths of the
+same bin: 1-byte bins keep every length (1515 counters per window) and wider bins trade that resolution for memory.
+The default, 8 bytes (190 counters), separates lengths padded to different levels or nearest padding lengths.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+MAXIMUM_LENGTH: int = 1514
+DEFAULT_BIN_WIDTH: int = 8
+QUANTILES: List[float] = [0.1, 0.25, 0.5, 0.75, 0.9]
+QUANTILE_COLUMNS: List[str] = [f"q{round(quantile * 100)}" for quantile in QUANTILES]
+
+
+@dataclass(frozen=True)
+class LengthSketch:
+    """
+    Histogram grid of the length sketches. Sketches merge only when they share the same grid.
+    """
+    bin_width: int = DEFAULT_BIN_WIDTH
+
+    def __post_init__(self):
+        if not 1 <= self.bin_width <= MAXIMUM_LENGTH + 1:
+            raise ValueError(f"Invalid bin width: {self.bin_width}.")
+
+    @property
+    def number_bins(self) -> int:
+        return -(-(MAXIMUM_LENGTH + 1) // self.bin_width)
+
+    @property
+    def bin_edges(self) -> np.ndarray:
+        """
+        Edges of the bins; the last bin ends at MAXIMUM_LENGTH + 1 and may be narrower than the others.
+        """
+        return np.minimum(np.arange(self.number_bins + 1) * self.bin_width, MAXIMUM_LENGTH + 1)
+
+    @property
+    def bin_columns(self) -> List[str]:
+        return [f"bin_{index}" for index in range(self.number_bins)]
+
+    @property
+    def columns(self) -> List[str]:
+        return self.bin_columns + QUANTILE_COLUMNS
+
+    def length_bins(self, lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns the histogram bin of each length. Lengths above MAXIMUM_LENGTH are counted in the last bin.
+        """
+        return np.minimum(np.asarray(lengths, dtype=np.int64) // self.bin_width, self.number_bins - 1)
+
+    def bin_counts(self, lengths: np.ndarray, groups: np.ndarray, number_groups: int) -> np.ndarray:
+        """
+        Counts the lengths of each group (e.g. each window of each device) per bin.
+
+        Parameters:
+        lengths: packet lengths.
+        groups: group of each packet, from 0 to number_groups - 1.
+        number_groups: number of groups.
+
+        Returns:
+        a (number_groups, number_bins) array of counts.
+        """
+        flat_bins = np.asarray(groups, dtype=np.int64) * self.number_bins + self.length_bins(lengths)
+        counts = np.bincount(flat_bins, minlength=number_groups * self.number_bins)
+        return counts.reshape(number_groups, self.number_bins)
+
+    def quantiles(self, counts: np.ndarray, quantiles: Sequence[float] = QUANTILES) -> np.ndarray:
+        """
+        Interpolates quantiles from histograms, assuming the lengths of a bin are spread uniformly over it.
+
+        Parameters:
+        counts: a (number_histograms, number_bins) array of counts; every histogram must have at least one length.
+        quantiles: quantiles to compute, strictly between 0 and 1.
+
+        Returns:
+        a (number_histograms, len(quantiles)) array.
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        edges = self.bin_edges
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+        rows = np.arange(len(counts))
+        values = np.empty((len(counts), len(quantiles)), dtype=np.float64)
+        for column, quantile in enumerate(quantiles):
+            targets = quantile * totals
+            bins = np.argmax(cumulative >= targets[:, None], axis=1)
+            previous = cumulative[rows, bins] - counts[rows, bins]
+            fractions = (targets - previous) / counts[rows, bins]
+            values[:, column] = edges[bins] + fractions * (edges[bins + 1] - edges[bins])
+        return values
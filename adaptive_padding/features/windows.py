@@ -0,0 +1,148 @@
+"""
+Packet length features at several observation windows. The per-second features of prepare_features group packets by
+their Time value; here, the packets of a chunk are sorted once by device and time, so the packets of a device that fall
+in the same window of any size are contiguous, and the count, sum and sum of squares of every window of every size are
+reduced from that single sorted order. Like the per-second statistics, the partial statistics of the chunks of a
+capture add up, and the features of every window size are returned (and stored) together in a long table with a window
+column. Optionally, every window also keeps a length sketch (see sketches.py), accumulated in the same pass.
+"""
+from os.path import join, basename
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from adaptive_padding.features.sketches import LengthSketch, QUANTILE_COLUMNS
+
+DEFAULT_WINDOWS: List[float] = [0.5, 1.0, 5.0, 30.0]
+STATISTICS_INDEX: List[str] = ["window", "src_mac", "window_index"]
+WINDOWED_FEATURE_COLUMNS: List[str] = ["window", "avg", "std", "total", "count", "label"]
+WINDOWED_FEATURES_SUFFIX: str = "_windowed_features.csv"
+
+
+def windowed_features_filepath(output_folder: str, filepath: str) -> str:
+    """
+    Returns the CSV file of the windowed features of a capture, next to its per-second features, e.g.
+    16-09-23.csv.tar.xz_windowed_features.csv.
+    """
+    return join(output_folder, f"{basename(filepath)}{WINDOWED_FEATURES_SUFFIX}")
+
+
+def accumulate_window_statistics(
+        dataset: pd.DataFrame,
+        windows: Sequence[float],
+        statistics: Optional[pd.DataFrame] = None,
+        sketch: Optional[LengthSketch] = None) -> pd.DataFrame:
+    """
+    Counts the packets and sums their lengths and squared lengths in windows of each size.
+
+    Parameters:
+    dataset: packets whose src_mac column holds integer labels, without missing lengths.
+    windows: window sizes in seconds. The window of a packet is floor(Time / window).
+    statistics: partial statistics of the previous chunks, if any.
+    sketch: when given, also counts the lengths of each window per bin of its histogram.
+
+    Returns:
+    the "count", "sum" and "sum_squares" columns (and the bin columns of the sketch) indexed by window size, label and
+    window index.
+    """
+    labels = dataset["src_mac"].to_numpy(dtype=np.int64)
+    times = dataset["Time"].to_numpy(dtype=np.float64)
+    lengths = dataset["Length"].to_numpy(dtype=np.int64)
+    order = np.lexsort((times, labels))
+    labels, times, lengths = labels[order], times[order], lengths[order]
+    squares = lengths * lengths
+    frames = []
+    for window in windows:
+        indices = np.floor(times / window).astype(np.int64)
+        is_start = np.ones(len(lengths), dtype=bool)
+        is_start[1:] = (labels[1:] != labels[:-1]) | (indices[1:] != indices[:-1])
+        starts = np.flatnonzero(is_start)
+        frame = pd.DataFrame({
+            "window": np.full(len(starts), float(window)),
+            "src_mac": labels[starts],
+            "window_index": indices[starts],
+            "count": np.diff(np.append(starts, len(lengths))),
+            "sum": np.add.reduceat(lengths, starts) if len(starts) else np.zeros(0, dtype=np.int64),
+            "sum_squares": np.add.reduceat(squares, starts) if len(starts) else np.zeros(0, dtype=np.int64)})
+        if sketch is not None:
+            counts = sketch.bin_counts(lengths, np.cumsum(is_start) - 1, len(starts))
+            frame = pd.concat([frame, pd.DataFrame(counts, columns=sketch.bin_columns)], axis=1)
+        frames.append(frame)
+    chunk_statistics = pd.concat(frames, ignore_index=True).set_index(STATISTICS_INDEX)
+    if statistics is None:
+        return chunk_statistics
+    return statistics.add(chunk_statistics, fill_value=0).astype(np.int64)
+
+
+def create_windowed_features(statistics: pd.DataFrame, sketch: Optional[LengthSketch] = None) -> pd.DataFrame:
+    """
+    Calculates the average, (sample) standard deviation, number of bytes and number of packets of every window, and the
+    bin counts and quantiles of its lengths when a sketch is given. Windows with a single packet have no standard
+    deviation and are left out, as in the per-second features.
+    """
+    statistics = statistics.sort_index()
+    count = statistics["count"].to_numpy()
+    total = statistics["sum"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (count * statistics["sum_squares"].to_numpy() - total * total) / (count * (count - 1))
+    features = pd.DataFrame({
+        "window": statistics.index.get_level_values("window").to_numpy(),
+        "avg": total / count,
+        "std": np.where(count > 1, np.sqrt(np.maximum(variance, 0)), np.nan),
+        "total": total,
+        "count": count,
+        "label": statistics.index.get_level_values("src_mac").to_numpy()})
+    if sketch is not None:
+        counts = statistics[sketch.bin_columns].to_numpy()
+        features = pd.concat([
+            features,
+            pd.DataFrame(counts, columns=sketch.bin_columns),
+            pd.DataFrame(sketch.quantiles(counts), columns=QUANTILE_COLUMNS)], axis=1)
+    return features.dropna(subset=["std"]).reset_index(drop=True)
+
+
+class WindowAggregator:
+    """
+    Accumulates the window statistics (and sketches) of the chunks of a capture, alongside the per-second statistics.
+    """
+    def __init__(self, windows: Iterable[float] = DEFAULT_WINDOWS, sketch: Optional[LengthSketch] = None):
+        self.windows: List[float] = sorted(set(float(window) for window in windows))
+        self.sketch = sketch
+        self.statistics: Optional[pd.DataFrame] = None
+
+    @property
+    def columns(self) -> List[str]:
+        return WINDOWED_FEATURE_COLUMNS + (self.sketch.columns if self.sketch is not None else [])
+
+    def add(self, dataset: pd.DataFrame) -> None:
+        self.statistics = accumulate_window_statistics(dataset, self.windows, self.statistics, self.sketch)
+
+    def merge(self, other: "WindowAggregator") -> "WindowAggregator":
+        """
+        Adds the statistics of another aggregator with the same windows and sketch, e.g. of another capture of the same
+        device.
+        """
+        if other.windows != self.windows or other.sketch != self.sketch:
+            raise ValueError("Only aggregators with the same windows and sketch can be merged.")
+        merged = WindowAggregator(self.windows, self.sketch)
+        if self.statistics is None or other.statistics is None:
+            merged.statistics = self.statistics if other.statistics is None else other.statistics
+        else:
+            merged.statistics = self.statistics.add(other.statistics, fill_value=0).astype(np.int64)
+        return merged
+
+    def features(self) -> pd.DataFrame:
+        if self.statistics is None:
+            return pd.DataFrame(columns=self.columns)
+        return create_windowed_features(self.statistics, self.sketch)
+
+
+def select_window(features: pd.DataFrame, window: float) -> pd.DataFrame:
+    """
+    Returns the features of one window size, e.g. the observation window of the attacker chosen in the configuration.
+    """
+    selected = features.loc[np.isclose(features["window"].to_numpy(dtype=np.float64), float(window))]
+    if selected.empty and not features.empty:
+        raise ValueError(f"No features for a window of {window} s; available: {sorted(features['window'].unique())}.")
+    return selected.reset_index(drop=True)
@@ -0,0 +1,48 @@
+"""
+Generates synthetic smart home captures for scale tests and benchmarks, in the layout of the UNSW days (Data/Raw) or as
+IoT packets in the Parquet store of a padding folder.
+"""
+from dataclasses import replace
+from os import makedirs
+from os.path import join
+
+import typer
+
+from adaptive_padding.constants import FolderPath, STORAGE
+from adaptive_padding.utils.synthetic import CaptureSpecification, capture_days, write_capture, write_packets
+
+
+def main(
+        days: int = 1,
+        duration: int = 3600,
+        iot_devices: int = 21,
+        other_devices: int = 2,
+        packets_per_second: float = 5.0,
+        distribution: str = "iot",
+        seed: int = 0,
+        configuration: str = "",
+        output: str = FolderPath.RAW_DATA.value,
+        storage: str = STORAGE.CSV.value,
+        strategy: str = "synthetic"):
+    """
+    Writes one capture per day. The traffic is described either by a JSON file in Data/Configuration (--configuration)
+    or by the number of devices, their packet rate (per device) and length distribution (iot, bimodal or uniform). With
+    --storage parquet, the packets are written to the Parquet store of the output folder as the traffic of --strategy.
+    """
+    if configuration:
+        specification = CaptureSpecification.load(join(FolderPath.CONFIGURATION.value, configuration))
+    else:
+        specification = CaptureSpecification.create(
+            iot_devices, other_devices, packets_per_second, distribution, duration, seed)
+    makedirs(output, exist_ok=True)
+    for index, day in enumerate(capture_days(days)):
+        day_specification = replace(specification, seed=specification.seed + index)
+        if STORAGE(storage) == STORAGE.PARQUET:
+            number_packets = write_packets(output, day, day_specification, strategy)
+        else:
+            number_packets = write_capture(join(output, f"{day}.csv.tar.xz"), day_specification)
+        print(f"Generated {number_packets} packets for {day}.")
+
+
+if __name__ == "__main__":
+    typer.run(main)
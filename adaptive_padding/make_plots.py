@@ -1,10 +1,10 @@
-from typing import Dict, List
+from typing import Dict
 from sys import argv
 
+from adaptive_padding.experiment.results import load_results, summarize_results
 from adaptive_padding.utils.graphs.graph import make_barplot, make_scatterplot, sort_values
 
 import json
-from glob import glob
 
 
 def load_file(filepath: str):
@@ -49,10 +49,11 @@ def get_performance(algorithm: str, performance: Dict[str, str], strategy: str,
 
 
 def main():
-    files: List[str] = glob(argv[1])
-    performance = {}
-    for file in files:
-        performance[file.split("_")[0]] = load_file(file)
+    """
+    Arguments: results table (evaluation_results.parquet), byte overhead JSON file, palette JSON file and attacker
+    (internal or external).
+    """
+    performance = summarize_results(load_results(argv[1], attacker=argv[4]))
     metric_names = {"Average accuracy": "Accuracy", "Average recall": "Recall", "Average f1_score": "F1 score"}
     byte_overhead = load_file(argv[2])
     for metric_name, metric_label in metric_names.items():
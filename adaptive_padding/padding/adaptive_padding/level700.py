@@ -1,8 +1,11 @@
 from dataclasses import dataclass, field
-from random import randint
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+from numpy.random import default_rng
+
+from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu, \
+    pad_lengths_equal_to_or_greater_than_mtu, length_moments_equal_to_or_greater_than_mtu, uniform_padding_moments
 
 
 @dataclass
@@ -10,10 +13,15 @@ class Level700(PaddingStrategy):
     extra_bytes: int = field(default=0)
     mtu_number_bytes: int = field(default=1500)
     __memory: Dict[int, int] = field(default_factory=dict)
+    seed: Optional[int] = field(default=None)
 
     def __post_init__(self):
         self.__threshold = 700
         self.__extra_bytes = 0
+        self.random_generator = default_rng(self.seed)
+
+    def reseed(self, seed: int) -> None:
+        self.random_generator = default_rng(seed)
 
     @pad_length_equal_to_or_greater_than_mtu
     def pad(self, length: int) -> int:
@@ -26,13 +34,36 @@ class Level700(PaddingStrategy):
                 self.__memory[length] = length + self.__extra_bytes
             elif length >= self.__threshold and length < 999:
                 upper_bound = 1000 - length
-                self.__extra_bytes = randint(1, upper_bound)
+                self.__extra_bytes = int(self.random_generator.integers(1, upper_bound, endpoint=True))
             elif length >= 999 and length <= 1399:
                 upper_bound = 1400 - length
-                self.__extra_bytes = randint(1, upper_bound)
+                self.__extra_bytes = int(self.random_generator.integers(1, upper_bound, endpoint=True))
             elif length >= 1400 and length < self.mtu_number_bytes:
                 self.__extra_bytes = self.mtu_number_bytes - int(length)
                 self.__memory[length] = length + self.__extra_bytes
             return length + self.__extra_bytes
         except ValueError as e:
             raise e
+
+    @pad_lengths_equal_to_or_greater_than_mtu
+    def pad_many(self, lengths: np.ndarray) -> np.ndarray:
+        padded_lengths = np.select(
+            [lengths < self.__threshold, lengths >= 1400],
+            [self.__threshold, self.mtu_number_bytes],
+            default=lengths)
+        random_band = (lengths >= self.__threshold) & (lengths <= 1399)
+        upper_bounds = np.where(lengths[random_band] < 999, 1000, 1400) - lengths[random_band]
+        padded_lengths[random_band] += self.random_generator.integers(1, upper_bounds, endpoint=True)
+        return padded_lengths
+
+    @length_moments_equal_to_or_greater_than_mtu
+    def length_moments(self, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        means = np.select(
+            [lengths < self.__threshold, lengths >= 1400],
+            [self.__threshold, self.mtu_number_bytes],
+            default=lengths).astype(np.float64)
+        variances = np.zeros(len(lengths), dtype=np.float64)
+        random_band = (lengths >= self.__threshold) & (lengths <= 1399)
+        upper_bounds = np.where(lengths[random_band] < 999, 1000, 1400) - lengths[random_band]
+        means[random_band], variances[random_band] = uniform_padding_moments(lengths[random_band], upper_bounds)
+        return means, variances
@@ -1,26 +1,18 @@
-import math
 from dataclasses import dataclass, field
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+
+from adaptive_padding.padding.padding_strategy import LookupTablePaddingStrategy
 
 
 @dataclass
-class ExponentialPadding(PaddingStrategy):
+class ExponentialPadding(LookupTablePaddingStrategy):
     mtu_number_bytes: int = field(default=1500)
 
-    def __post_init__(self):
-        self.__extra_bytes: int = 0
-
-    @pad_length_equal_to_or_greater_than_mtu
-    def pad(self, length: int) -> int:
-        try:
-            if length < 1024:
-                self.__extra_bytes = 2 ** (int(math.log(length, 2)) + 1) - length
-
-            elif length >= 1024 and int(length) < self.mtu_number_bytes:
-                self.__extra_bytes = self.mtu_number_bytes - length
-
-            return length + self.__extra_bytes
-
-        except ValueError as exception:
-            raise exception
+    def build_table(self, lengths: np.ndarray) -> np.ndarray:
+        # frexp returns the exponent e such that 2 ** (e - 1) <= length < 2 ** e, i.e. the next power of two.
+        _, exponents = np.frexp(lengths)
+        return np.select(
+            [lengths == 0, lengths < 1024, lengths < self.mtu_number_bytes],
+            [lengths, np.left_shift(1, exponents.astype(np.int64)), self.mtu_number_bytes],
+            default=lengths)
@@ -1,29 +1,18 @@
 from dataclasses import dataclass, field
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+
+from adaptive_padding.padding.padding_strategy import LookupTablePaddingStrategy
 
 
 @dataclass
-class LinearPadding(PaddingStrategy):
+class LinearPadding(LookupTablePaddingStrategy):
     mtu_number_bytes: int = field(default=1500)
     threshold: int = 128
 
-    def __post_init__(self):
-        self.__extra_bytes: int = 0
-
-    @pad_length_equal_to_or_greater_than_mtu
-    def pad(self, length: int) -> int:
-        try:
-            if length < 1408:
-                for x in range(1, 12):
-                    if length < x * self.threshold:
-                        self.__extra_bytes = x * self.threshold - length
-                        break
-
-            elif length >= 1409 and int(length) < self.mtu_number_bytes:
-                self.__extra_bytes = self.mtu_number_bytes - length
-
-            return length + self.__extra_bytes
-
-        except ValueError as e:
-            raise e
+    def build_table(self, lengths: np.ndarray) -> np.ndarray:
+        steps = lengths // self.threshold + 1
+        return np.select(
+            [(lengths < 1408) & (steps < 12), (lengths >= 1409) & (lengths < self.mtu_number_bytes)],
+            [steps * self.threshold, self.mtu_number_bytes],
+            default=lengths)
@@ -1,22 +1,16 @@
 from dataclasses import dataclass, field
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+
+from adaptive_padding.padding.padding_strategy import LookupTablePaddingStrategy
 
 
 @dataclass
-class MouseElephant(PaddingStrategy):
+class MouseElephant(LookupTablePaddingStrategy):
     mtu_number_bytes: int = field(default=1500)
 
-    def __post_init__(self):
-        self.__extra_bytes: int = 0
-
-    @pad_length_equal_to_or_greater_than_mtu
-    def pad(self, length: int) -> int:
-        try:
-            if length < 100:
-                self.__extra_bytes = 100 - length
-            elif length >= 100 and length < self.mtu_number_bytes:
-                self.__extra_bytes = self.mtu_number_bytes - length
-            return length + self.__extra_bytes
-        except ValueError as e:
-            raise e
+    def build_table(self, lengths: np.ndarray) -> np.ndarray:
+        return np.select(
+            [lengths < 100, lengths < self.mtu_number_bytes],
+            [100, self.mtu_number_bytes],
+            default=lengths)
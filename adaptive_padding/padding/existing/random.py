@@ -1,15 +1,24 @@
 from dataclasses import dataclass, field
-from random import randint
+from typing import Optional, Tuple
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+from numpy.random import default_rng
+
+from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu, \
+    pad_lengths_equal_to_or_greater_than_mtu, length_moments_equal_to_or_greater_than_mtu, uniform_padding_moments
 
 
 @dataclass
 class RandomPadding(PaddingStrategy):
     mtu_number_bytes: int = field(default=1500)
+    seed: Optional[int] = field(default=None)
 
     def __post_init__(self):
         self.__extra_bytes: int = 0
+        self.random_generator = default_rng(self.seed)
+
+    def reseed(self, seed: int) -> None:
+        self.random_generator = default_rng(seed)
 
     @pad_length_equal_to_or_greater_than_mtu
     def pad(self, length: int) -> int:
@@ -17,10 +26,28 @@ class RandomPadding(PaddingStrategy):
             modification = length
             if int(length) < self.mtu_number_bytes:
                 upper_bound = self.mtu_number_bytes - int(length)
-                self.__extra_bytes = randint(1, upper_bound)
+                self.__extra_bytes = int(self.random_generator.integers(1, upper_bound, endpoint=True))
                 modification = int(length) + self.__extra_bytes
 
             return modification
 
         except ValueError as e:
             raise e
+
+    @pad_lengths_equal_to_or_greater_than_mtu
+    def pad_many(self, lengths: np.ndarray) -> np.ndarray:
+        padded_lengths = lengths.copy()
+        below_mtu = lengths < self.mtu_number_bytes
+        upper_bounds = self.mtu_number_bytes - lengths[below_mtu]
+        padded_lengths[below_mtu] += self.random_generator.integers(1, upper_bounds, endpoint=True)
+        return padded_lengths
+
+    @length_moments_equal_to_or_greater_than_mtu
+    def length_moments(self, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        means = lengths.astype(np.float64)
+        variances = np.zeros(len(lengths), dtype=np.float64)
+        below_mtu = lengths < self.mtu_number_bytes
+        means[below_mtu], variances[below_mtu] = uniform_padding_moments(
+            lengths[below_mtu],
+            self.mtu_number_bytes - lengths[below_mtu])
+        return means, variances
@@ -1,26 +1,61 @@
 from dataclasses import dataclass, field
-from random import randint
+from typing import Optional, Tuple
 
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+import numpy as np
+from numpy.random import default_rng
+
+from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu, \
+    pad_lengths_equal_to_or_greater_than_mtu, length_moments_equal_to_or_greater_than_mtu
 
 
 @dataclass
 class Random255(PaddingStrategy):
     mtu_number_bytes: int = field(default=1500)
+    seed: Optional[int] = field(default=None)
 
     def __post_init__(self):
         self.__extra_bytes: int = 0
         self.__LOWER_BOUND = 1
         self.__UPPER_BOUND = 255
+        self.random_generator = default_rng(self.seed)
+
+    def reseed(self, seed: int) -> None:
+        self.random_generator = default_rng(seed)
 
     @pad_length_equal_to_or_greater_than_mtu
     def pad(self, length: int) -> int:
         if length >= self.mtu_number_bytes:
             return length
         try:
-            self.__extra_bytes = randint(self.__LOWER_BOUND, self.__UPPER_BOUND)
+            self.__extra_bytes = int(self.random_generator.integers(
+                self.__LOWER_BOUND,
+                self.__UPPER_BOUND,
+                endpoint=True))
             if self.__extra_bytes + length >= self.mtu_number_bytes:
                 self.__extra_bytes = self.mtu_number_bytes - length
             return length + self.__extra_bytes
         except ValueError as e:
             raise e
+
+    @pad_lengths_equal_to_or_greater_than_mtu
+    def pad_many(self, lengths: np.ndarray) -> np.ndarray:
+        padded_lengths = lengths.copy()
+        below_mtu = lengths < self.mtu_number_bytes
+        extra_bytes = self.random_generator.integers(
+            self.__LOWER_BOUND,
+            self.__UPPER_BOUND,
+            size=np.count_nonzero(below_mtu),
+            endpoint=True)
+        padded_lengths[below_mtu] += np.minimum(extra_bytes, self.mtu_number_bytes - lengths[below_mtu])
+        return padded_lengths
+
+    @length_moments_equal_to_or_greater_than_mtu
+    def length_moments(self, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # The extra bytes X, drawn from 1 to n, are capped at c = MTU - length: X takes the values 1 to c - 1 with
+        # probability 1 / n each and c with the remaining probability.
+        n = self.__UPPER_BOUND - self.__LOWER_BOUND + 1
+        caps = np.minimum(self.mtu_number_bytes - lengths, self.__UPPER_BOUND).astype(np.float64)
+        remaining = n - caps + 1
+        mean = ((caps - 1) * caps / 2 + caps * remaining) / n
+        second_moment = ((caps - 1) * caps * (2 * caps - 1) / 6 + caps * caps * remaining) / n
+        return lengths + mean, second_moment - mean * mean
@@ -53,7 +53,7 @@ end
 end # module OptimalPadding
 
 using .OptimalPadding, BenchmarkTools
-m = 10
+m = length(ARGS) > 0 ? parse(Int, ARGS[1]) : 10
 @show m, n, length(v), mean(v)
 @show (padding,_) = discrete_optimal_padding(m, n, C)
 @show padding / length(v) / mean(v)
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from subprocess import run, PIPE
-from typing import List
+from typing import List, Optional
+
+from adaptive_padding.padding.nearest.solution_cache import solve_with_cache
+from adaptive_padding.utils.histogram import LengthHistogram
+from adaptive_padding.utils.profiling import stage, profiled
 
 class ExternalIntegration(ABC):
     @abstractmethod
@@ -13,6 +17,7 @@ class ExternalIntegration(ABC):
 class JuliaExternalIntegration(ExternalIntegration):
     julia_command: List[str]
 
+    @profiled("solve", solver="julia")
     def execute(self) -> List[int]:
         command_output = run(self.julia_command, stdout=PIPE, stderr=PIPE, universal_newlines=True)
         return self.__get_packets_length(command_output.stdout)
@@ -22,3 +27,19 @@ class JuliaExternalIntegration(ExternalIntegration):
             '])',
             '').split(', ')
         return [int(x) for x in packet_sizes]
+
+
+@dataclass
+class PythonExternalIntegration(ExternalIntegration):
+    """
+    Computes the optimal packet lengths in process from a packet length histogram, with the same dynamic program as
+    OptimalPadding.jl. When a cache folder is given, solutions are reused across runs.
+    """
+    histogram: LengthHistogram
+    number_buckets: int = 10
+    cache_folder: Optional[str] = None
+
+    def execute(self) -> List[int]:
+        with stage("solve", solver="python", number_buckets=self.number_buckets) as record:
+            record.rows = self.histogram.total
+            return solve_with_cache(self.histogram, [self.number_buckets], self.cache_folder)[self.number_buckets]
@@ -1,27 +1,26 @@
-from dataclasses import dataclass, field
-from typing import List, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
 
 from adaptive_padding.padding.nearest.external_integration import ExternalIntegration
-from adaptive_padding.padding.padding_strategy import PaddingStrategy, pad_length_equal_to_or_greater_than_mtu
+from adaptive_padding.padding.padding_strategy import LookupTablePaddingStrategy
 
 
 @dataclass
-class NearestPadding(PaddingStrategy):
+class NearestPadding(LookupTablePaddingStrategy):
     external_integration: ExternalIntegration
-    __memory: Dict[int, int] = field(default_factory=dict)
 
     def __post_init__(self):
-        self.lengths: List[int] = self.external_integration.execute()
+        self.lengths: List[int] = sorted(self.external_integration.execute())
 
-    @pad_length_equal_to_or_greater_than_mtu
-    def pad(self, length: int) -> int:
-        if length in self.__memory:
-            return self.__memory.get(length)
+    def parameters(self) -> Dict[str, Any]:
+        return {"lengths": self.lengths}
 
-        extra_bytes = 0
-        for l in self.lengths:
-            if l >= length:
-                extra_bytes = l - length
-                break
-        self.__memory[length] = length + extra_bytes
-        return self.__memory.get(length)
+    def build_table(self, lengths: np.ndarray) -> np.ndarray:
+        if not self.lengths:
+            return lengths
+        boundaries = np.asarray(self.lengths, dtype=np.int64)
+        positions = np.searchsorted(boundaries, lengths, side="left")
+        has_boundary = positions < len(boundaries)
+        return np.where(has_boundary, boundaries[np.minimum(positions, len(boundaries) - 1)], lengths)
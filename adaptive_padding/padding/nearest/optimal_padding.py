@@ -0,0 +1,139 @@
+"""
+NumPy port of OptimalPadding.jl. Finds the m packet lengths (buckets) that minimize the number of padding bytes when
+every packet is padded to the nearest bucket greater than or equal to its length.
+"""
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+def compute_cost_matrix(lengths: np.ndarray, frequencies: np.ndarray) -> np.ndarray:
+    """
+    Computes the cost matrix C of OptimalPadding.jl with zero-based indices: C[i, j], for i <= j, is the number of
+    padding bytes needed to pad every packet with a length between lengths[i] and lengths[j] to lengths[j].
+
+    Parameters:
+    lengths: distinct packet lengths, in ascending order.
+    frequencies: number of packets with each length.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    frequencies = np.asarray(frequencies, dtype=np.int64)
+    cumulative_frequencies = np.concatenate(([0], np.cumsum(frequencies)))
+    cumulative_bytes = np.concatenate(([0], np.cumsum(frequencies * lengths)))
+    cost_matrix = lengths[np.newaxis, :] * (cumulative_frequencies[np.newaxis, 1:] - cumulative_frequencies[:-1, np.newaxis])
+    cost_matrix -= cumulative_bytes[np.newaxis, 1:] - cumulative_bytes[:-1, np.newaxis]
+    return np.triu(cost_matrix)
+
+
+def compute_next_layer(cost_matrix: np.ndarray, previous_cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes one layer of the dynamic program: cost[j] = min over i < j of C[i + 1, j] + previous_cost[i].
+    The leftmost minimizer is monotone in j because C satisfies the quadrangle inequality, so the layer is solved by
+    divide and conquer in O(n log n) instead of O(n^2). Ties are broken towards the smallest i, as in OptimalPadding.jl.
+
+    Returns:
+    the cost of the layer and the predecessor of each length.
+    """
+    number_lengths = len(previous_cost)
+    cost = np.zeros(number_lengths, dtype=np.int64)
+    predecessor = np.zeros(number_lengths, dtype=np.int64)
+    pending = [(1, number_lengths - 1, 0, number_lengths - 2)]
+    while pending:
+        low, high, optimum_low, optimum_high = pending.pop()
+        if low > high:
+            continue
+        middle = (low + high) // 2
+        candidates = np.arange(optimum_low, min(middle - 1, optimum_high) + 1)
+        values = cost_matrix[candidates + 1, middle] + previous_cost[candidates]
+        best = int(np.argmin(values))
+        cost[middle] = values[best]
+        predecessor[middle] = candidates[best]
+        pending.append((low, middle - 1, optimum_low, candidates[best]))
+        pending.append((middle + 1, high, candidates[best], optimum_high))
+    return cost, predecessor
+
+
+def solve_layers(max_number_buckets: int, cost_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Runs the dynamic program up to the given number of buckets. Layer m - 1 only depends on the previous layers, so a
+    single run solves every number of buckets up to max_number_buckets.
+
+    Returns:
+    the optimal padding for each number of buckets (index m - 1) and the predecessor table.
+    """
+    number_lengths = cost_matrix.shape[0]
+    max_number_buckets = min(max_number_buckets, number_lengths)
+    paddings = np.zeros(max_number_buckets, dtype=np.int64)
+    predecessors = np.zeros((max_number_buckets, number_lengths), dtype=np.int64)
+    if max_number_buckets == 0:
+        return paddings, predecessors
+    cost = cost_matrix[0].copy()
+    paddings[0] = cost[-1]
+    for layer in range(1, max_number_buckets):
+        cost, predecessors[layer] = compute_next_layer(cost_matrix, cost)
+        paddings[layer] = cost[-1]
+    return paddings, predecessors
+
+
+def backtrack(number_buckets: int, predecessors: np.ndarray) -> np.ndarray:
+    """
+    Returns the indices of the lengths chosen for the given number of buckets, in ascending order.
+    """
+    number_buckets = min(number_buckets, predecessors.shape[0])
+    indices = np.zeros(number_buckets, dtype=np.int64)
+    if number_buckets == 0:
+        return indices
+    indices[-1] = predecessors.shape[1] - 1
+    for layer in range(number_buckets - 2, -1, -1):
+        indices[layer] = predecessors[layer + 1, indices[layer + 1]]
+    return indices
+
+
+def discrete_optimal_padding(number_buckets: int, cost_matrix: np.ndarray) -> Tuple[int, np.ndarray]:
+    """
+    Solves the discrete optimal padding problem for the given number of buckets.
+
+    Returns:
+    the total number of padding bytes and the indices of the chosen lengths, in ascending order.
+    """
+    paddings, predecessors = solve_layers(number_buckets, cost_matrix)
+    if len(paddings) == 0:
+        return 0, np.zeros(0, dtype=np.int64)
+    return int(paddings[-1]), backtrack(number_buckets, predecessors)
+
+
+def sort_histogram(lengths: np.ndarray, frequencies: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(lengths)
+    return np.asarray(lengths, dtype=np.int64)[order], np.asarray(frequencies, dtype=np.int64)[order]
+
+
+def optimal_padding(lengths: np.ndarray, frequencies: np.ndarray, number_buckets: int) -> Tuple[int, np.ndarray]:
+    """
+    Returns the total number of padding bytes and the optimal bucket lengths for a packet length histogram.
+    """
+    lengths, frequencies = sort_histogram(lengths, frequencies)
+    padding, indices = discrete_optimal_padding(number_buckets, compute_cost_matrix(lengths, frequencies))
+    return padding, lengths[indices]
+
+
+def optimal_padding_sweep(
+        lengths: np.ndarray,
+        frequencies: np.ndarray,
+        numbers_buckets: Iterable[int]) -> Dict[int, Tuple[int, np.ndarray]]:
+    """
+    Returns the total number of padding bytes and the optimal bucket lengths for several numbers of buckets, computed
+    from one cost matrix and one dynamic programming table.
+    """
+    numbers_buckets = list(numbers_buckets)
+    if not numbers_buckets:
+        return {}
+    lengths, frequencies = sort_histogram(lengths, frequencies)
+    paddings, predecessors = solve_layers(max(numbers_buckets), compute_cost_matrix(lengths, frequencies))
+    solutions = {}
+    for number_buckets in numbers_buckets:
+        if len(paddings) == 0:
+            solutions[number_buckets] = (0, lengths)
+            continue
+        padding = int(paddings[min(number_buckets, len(paddings)) - 1])
+        solutions[number_buckets] = (padding, lengths[backtrack(number_buckets, predecessors)])
+    return solutions
@@ -0,0 +1,62 @@
+import json
+from dataclasses import dataclass
+from os import makedirs
+from os.path import join, exists
+from typing import Dict, Iterable, List, Optional
+
+from adaptive_padding.padding.nearest.optimal_padding import optimal_padding_sweep
+from adaptive_padding.utils.histogram import LengthHistogram
+
+
+@dataclass
+class SolutionCache:
+    """
+    Optimal packet lengths stored on disk, one JSON file per histogram (named after its digest) with one entry per
+    number of buckets.
+    """
+    folder: str
+
+    def filepath(self, digest: str) -> str:
+        return join(self.folder, f"{digest}.json")
+
+    def load(self, digest: str) -> Dict[int, List[int]]:
+        if not exists(self.filepath(digest)):
+            return {}
+        with open(self.filepath(digest), mode="r") as file_reader:
+            return {int(number_buckets): solution["lengths"] for number_buckets, solution in json.load(file_reader).items()}
+
+    def update(self, digest: str, solutions: Dict[int, Dict]) -> None:
+        """
+        Adds solutions ({number of buckets: {"padding": bytes, "lengths": [...]}}) to the file of the histogram.
+        """
+        makedirs(self.folder, exist_ok=True)
+        stored = {}
+        if exists(self.filepath(digest)):
+            with open(self.filepath(digest), mode="r") as file_reader:
+                stored = json.load(file_reader)
+        stored.update({str(number_buckets): solution for number_buckets, solution in solutions.items()})
+        with open(self.filepath(digest), mode="w") as file_writer:
+            json.dump(stored, file_writer)
+
+
+def solve_with_cache(
+        histogram: LengthHistogram,
+        numbers_buckets: Iterable[int],
+        cache_folder: Optional[str] = None) -> Dict[int, List[int]]:
+    """
+    Returns the optimal packet lengths for each number of buckets. Numbers of buckets already in the cache are not
+    solved again; the others are solved together with a single dynamic programming table and added to the cache.
+    """
+    numbers_buckets = list(numbers_buckets)
+    cache = SolutionCache(cache_folder) if cache_folder is not None else None
+    digest = histogram.digest()
+    cached = cache.load(digest) if cache is not None else {}
+    missing = [number_buckets for number_buckets in numbers_buckets if number_buckets not in cached]
+    lengths, frequencies = histogram.lengths_and_frequencies()
+    solutions = {
+        number_buckets: {"padding": padding, "lengths": packet_lengths.tolist()}
+        for number_buckets, (padding, packet_lengths) in optimal_padding_sweep(lengths, frequencies, missing).items()}
+    if cache is not None and solutions:
+        cache.update(digest, solutions)
+    cached.update({number_buckets: solution["lengths"] for number_buckets, solution in solutions.items()})
+    return {number_buckets: cached[number_buckets] for number_buckets in numbers_buckets}
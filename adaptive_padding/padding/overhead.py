@@ -0,0 +1,92 @@
+"""
+Byte overhead of the padding strategies computed from packet length histograms instead of padded captures. The padded
+length of each observed length has a known expected value and variance (the length_moments method of the strategy,
+which returns them for an array of lengths without drawing random numbers), so the total
+of a histogram follows from one vectorized pass over its distinct lengths, whatever the number of packets: the overhead
+is exact for the deterministic strategies and its expected value for the random ones, whose packets are padded
+independently. This screens strategies and parameters in milliseconds, before padding every capture. Strategies without
+length_moments can only be measured on padded captures (compute_byte_overhead.py).
+"""
+from dataclasses import dataclass, asdict
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.utils.histogram import LengthHistogram, DEFAULT_KEY
+
+
+@dataclass
+class OverheadEstimate:
+    """
+    Estimated bytes of the traffic of a histogram once padded by a strategy. expected_bytes and variance are those of
+    the total number of padded bytes; the variance is zero when the padded total is exact.
+    """
+    strategy: str
+    key: str
+    packets: int
+    original_bytes: int
+    expected_bytes: float
+    variance: float
+
+    @property
+    def exact(self) -> bool:
+        return self.variance == 0
+
+    @property
+    def overhead(self) -> float:
+        """
+        Padded bytes divided by original bytes, as in byte_overhead.json.
+        """
+        return self.expected_bytes / self.original_bytes if self.original_bytes else float("nan")
+
+    @property
+    def standard_deviation(self) -> float:
+        """
+        Standard deviation of the overhead.
+        """
+        return float(np.sqrt(self.variance)) / self.original_bytes if self.original_bytes else float("nan")
+
+
+def estimate_overhead(
+        histogram: LengthHistogram,
+        strategy: PaddingStrategy,
+        strategy_name: str = "",
+        key: str = DEFAULT_KEY) -> OverheadEstimate:
+    """
+    Estimates the byte overhead of a strategy on the traffic of a histogram (of every packet, one device or one day).
+    """
+    if not callable(getattr(strategy, "length_moments", None)):
+        raise TypeError(
+            f"{type(strategy).__name__} does not define length_moments, so its overhead cannot be estimated from "
+            f"histograms; pad the captures and run compute_byte_overhead.py instead.")
+    lengths, frequencies = histogram.lengths_and_frequencies()
+    means, variances = strategy.length_moments(lengths)
+    return OverheadEstimate(
+        strategy_name or type(strategy).__name__,
+        key,
+        int(frequencies.sum()),
+        int(np.dot(lengths, frequencies)),
+        float(np.dot(means, frequencies)),
+        float(np.dot(variances, frequencies)))
+
+
+def estimate_overheads(histograms: Dict[str, LengthHistogram], strategies: Dict[str, PaddingStrategy]) -> pd.DataFrame:
+    """
+    Estimates the byte overhead of every strategy on every histogram, e.g. the histograms per device or per day written
+    by build_histograms.py.
+
+    Returns:
+    one row per (strategy, histogram key) with the fields of OverheadEstimate, the overhead and its standard deviation.
+    """
+    rows = []
+    for strategy_name, strategy in strategies.items():
+        for key, histogram in histograms.items():
+            estimate = estimate_overhead(histogram, strategy, strategy_name, key)
+            rows.append({
+                **asdict(estimate),
+                "overhead": estimate.overhead,
+                "standard_deviation": estimate.standard_deviation,
+                "exact": estimate.exact})
+    return pd.DataFrame(rows)
@@ -1,5 +1,16 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Callable
+from dataclasses import fields, is_dataclass
+from hashlib import sha256
+from os import makedirs
+from os.path import join, exists
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from adaptive_padding.utils.manifest import code_version
+
+MTU_NUMBER_BYTES: int = 1500
 
 
 class PaddingStrategy(ABC):
@@ -10,9 +21,33 @@ class PaddingStrategy(ABC):
         """
         ...
 
+    def pad_many(self, lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns the new packet lengths for an array of original lengths.
+        Strategies override this method with a vectorized implementation; the default applies pad to each length.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        return np.fromiter((self.pad(int(length)) for length in lengths), dtype=np.int64, count=len(lengths))
+
+    def reseed(self, seed: int) -> None:
+        """
+        Restarts the random generator of the strategy from the given seed (e.g. a seed derived for one capture). The
+        configured seed, returned by parameters(), is left unchanged. Deterministic strategies ignore it.
+        """
+        ...
+
+    def parameters(self) -> Dict[str, Any]:
+        """
+        Returns the parameters that determine the padded lengths produced by the strategy. Private fields (e.g. memo
+        tables) are left out.
+        """
+        if not is_dataclass(self):
+            return {}
+        return {field.name: getattr(self, field.name) for field in fields(self) if not field.name.startswith("_")}
+
 
 def pad_length_equal_to_or_greater_than_mtu(function: Callable):
-    mtu: int = 1500
+    mtu: int = MTU_NUMBER_BYTES
 
     def wrapper(*args, **kwargs):
         length = args[1]
@@ -20,3 +55,103 @@ def pad_length_equal_to_or_greater_than_mtu(function: Callable):
             return length
         return function(*args, **kwargs)
     return wrapper
+
+
+def pad_lengths_equal_to_or_greater_than_mtu(function: Callable):
+    mtu: int = MTU_NUMBER_BYTES
+
+    def wrapper(*args, **kwargs):
+        lengths = np.asarray(args[1], dtype=np.int64)
+        padded_lengths = lengths.copy()
+        below_mtu = lengths < mtu
+        if below_mtu.any():
+            padded_lengths[below_mtu] = function(args[0], lengths[below_mtu], *args[2:], **kwargs)
+        return padded_lengths
+    return wrapper
+
+
+def length_moments_equal_to_or_greater_than_mtu(function: Callable):
+    mtu: int = MTU_NUMBER_BYTES
+
+    def wrapper(*args, **kwargs):
+        lengths = np.asarray(args[1], dtype=np.int64)
+        means = lengths.astype(np.float64)
+        variances = np.zeros(len(lengths), dtype=np.float64)
+        below_mtu = lengths < mtu
+        if below_mtu.any():
+            means[below_mtu], variances[below_mtu] = function(args[0], lengths[below_mtu], *args[2:], **kwargs)
+        return means, variances
+    return wrapper
+
+
+def uniform_padding_moments(lengths: np.ndarray, upper_bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the expected value and the variance of length + X, where X is drawn uniformly from the integers 1 to
+    upper_bound (integers(1, upper_bound, endpoint=True)).
+    """
+    upper_bounds = np.asarray(upper_bounds, dtype=np.float64)
+    return lengths + (upper_bounds + 1) / 2, (upper_bounds * upper_bounds - 1) / 12
+
+
+class LookupTablePaddingStrategy(PaddingStrategy):
+    """
+    Padding strategy that is a fixed function of the packet length. The padded length of every length below the MTU
+    is computed once by build_table and stored in a dense table, which pad and pad_many index.
+    """
+    @abstractmethod
+    def build_table(self, lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns the padded lengths for an array of lengths below the MTU.
+        """
+        ...
+
+    @property
+    def table(self) -> np.ndarray:
+        if getattr(self, "_table", None) is None:
+            self._table = self.build_table(np.arange(MTU_NUMBER_BYTES, dtype=np.int64)).astype(np.int64)
+        return self._table
+
+    def table_filename(self) -> str:
+        """
+        Names the table after the parameters of the strategy and the version of the code of its class (and base classes),
+        so a table built by a previous version of build_table is never reused.
+        """
+        key = {"parameters": self.parameters(), "code": code_version(type(self))}
+        digest = sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return f"{type(self).__name__}-{digest[:16]}.npy"
+
+    def compile_table(self, folder: Optional[str] = None) -> np.ndarray:
+        """
+        Builds the lookup table, or loads it from the folder when it was saved by a previous run with the same parameters
+        and code.
+
+        Parameters:
+        folder: folder where lookup tables are stored. When None, the table is only kept in memory.
+        """
+        if folder is None:
+            return self.table
+        filepath = join(folder, self.table_filename())
+        if exists(filepath):
+            self._table = np.load(filepath)
+        else:
+            makedirs(folder, exist_ok=True)
+            np.save(filepath, self.table)
+        return self._table
+
+    @pad_length_equal_to_or_greater_than_mtu
+    def pad(self, length: int) -> int:
+        if length < 0:
+            raise ValueError(f"Invalid packet length: {length}.")
+        return int(self.table[length])
+
+    @pad_lengths_equal_to_or_greater_than_mtu
+    def pad_many(self, lengths: np.ndarray) -> np.ndarray:
+        if len(lengths) and lengths.min() < 0:
+            raise ValueError(f"Invalid packet length: {lengths.min()}.")
+        return self.table[lengths]
+
+    def length_moments(self, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the padded length of each length with a variance of zero, as the padding is deterministic.
+        """
+        return self.pad_many(lengths).astype(np.float64), np.zeros(len(lengths), dtype=np.float64)
@@ -1,44 +1,85 @@
-from typing import Dict
+from typing import Dict, List, Optional, Union
 
+from adaptive_padding.constants import FolderPath
 from adaptive_padding.padding.adaptive_padding.level100 import Level100
 from adaptive_padding.padding.adaptive_padding.level500 import Level500
 from adaptive_padding.padding.adaptive_padding.level700 import Level700
 from adaptive_padding.padding.adaptive_padding.level900 import Level900
-from adaptive_padding.padding.nearest.external_integration import JuliaExternalIntegration
+from adaptive_padding.padding.nearest.external_integration import JuliaExternalIntegration, PythonExternalIntegration
 from adaptive_padding.padding.nearest.nearest_padding import NearestPadding
+from adaptive_padding.padding.nearest.solution_cache import solve_with_cache
 from adaptive_padding.padding.existing.exponential_padding import ExponentialPadding
 from adaptive_padding.padding.existing.linear import LinearPadding
 from adaptive_padding.padding.existing.mouse_elephant import MouseElephant
 from adaptive_padding.padding.existing.mtu import Mtu
 from adaptive_padding.padding.existing.random import RandomPadding
 from adaptive_padding.padding.existing.random_255 import Random255
+from adaptive_padding.padding.exceptions import InvalidPaddingStrategy
 from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.utils.histogram import load_histogram
 
 from os.path import join
 
 
-def create_existing_strategies_mapping() -> Dict[str, PaddingStrategy]:
+def create_existing_strategies_mapping(seed: Optional[int] = None) -> Dict[str, PaddingStrategy]:
     return {
         "exponential": ExponentialPadding(),
         "linear": LinearPadding(),
         "mouse_elephant": MouseElephant(),
         "mtu": Mtu(),
-        "random": RandomPadding(),
-        "random255": Random255()}
+        "random": RandomPadding(seed=seed),
+        "random255": Random255(seed=seed)}
 
 
-def create_proposal_strategies_mapping() -> Dict[str, PaddingStrategy]:
+def create_proposal_strategies_mapping(seed: Optional[int] = None) -> Dict[str, PaddingStrategy]:
     return {
-        "level100": Level100(),
-        "level500": Level500(),
-        "level700": Level700(),
-        "level900": Level900()
+        "level100": Level100(seed=seed),
+        "level500": Level500(seed=seed),
+        "level700": Level700(seed=seed),
+        "level900": Level900(seed=seed)
     }
 
 
-def create_nearest_strategies_mapping() -> Dict[str, PaddingStrategy]:
-    julia_command = ["julia", join("adaptive_padding", "padding", "nearest" "OptimalPadding.jl")]
-    julia_external_integration = JuliaExternalIntegration(julia_command)
+def create_nearest_strategies_mapping(
+        histogram_filepath: str = join(FolderPath.HISTOGRAMS.value, "all.npz"),
+        number_buckets: Union[int, List[int]] = 10,
+        cache_folder: Optional[str] = FolderPath.NEAREST_SOLUTIONS.value,
+        use_julia: bool = False) -> Dict[str, PaddingStrategy]:
+    """
+    Creates the nearest padding strategy.
+
+    Parameters:
+    histogram_filepath: packet length histogram written by build_histograms.py, or a CSV file with one packet length
+    per row in its Length column (e.g. Data/OnlyIoT/packet_sizes.csv).
+    number_buckets: number of packet lengths (m in OptimalPadding.jl). A list creates one strategy per value, named
+    near<m>, all solved with a single dynamic programming table.
+    cache_folder: folder where solutions are cached, keyed by the histogram digest and the number of buckets.
+    use_julia: computes the packet lengths with OptimalPadding.jl, which reads Data/OnlyIoT/packet_sizes.csv.
+    """
+    numbers_buckets = [number_buckets] if isinstance(number_buckets, int) else list(number_buckets)
+    names = {m: "near" if isinstance(number_buckets, int) else f"near{m}" for m in numbers_buckets}
+    if use_julia:
+        julia_command = ["julia", join("adaptive_padding", "padding", "nearest", "OptimalPadding.jl")]
+        return {names[m]: NearestPadding(JuliaExternalIntegration(julia_command + [str(m)])) for m in numbers_buckets}
+    histogram = load_histogram(histogram_filepath)
+    solve_with_cache(histogram, numbers_buckets, cache_folder)
     return {
-        "near": NearestPadding(julia_external_integration)
-    }
+        names[m]: NearestPadding(PythonExternalIntegration(histogram, m, cache_folder)) for m in numbers_buckets}
+
+
+def create_strategies_mapping(
+        strategy_names: List[str],
+        histogram_filepath: str = join(FolderPath.HISTOGRAMS.value, "all.npz"),
+        number_buckets: Union[int, List[int]] = 10,
+        seed: Optional[int] = None) -> Dict[str, PaddingStrategy]:
+    """
+    Creates the strategies with the given names, e.g. the padding_strategies of an experiment configuration. The nearest
+    padding strategies are only solved when one of them is requested.
+    """
+    strategies = {**create_existing_strategies_mapping(seed), **create_proposal_strategies_mapping(seed)}
+    if any(strategy_name.startswith("near") for strategy_name in strategy_names):
+        strategies.update(create_nearest_strategies_mapping(histogram_filepath, number_buckets))
+    unknown_names = [strategy_name for strategy_name in strategy_names if strategy_name not in strategies]
+    if unknown_names:
+        raise InvalidPaddingStrategy(f"Unknown padding strategies: {', '.join(unknown_names)}.")
+    return {strategy_name: strategies[strategy_name] for strategy_name in strategy_names}
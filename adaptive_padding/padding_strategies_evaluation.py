@@ -1,33 +1,48 @@
 import json
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
-from os import cpu_count
+from itertools import chain, groupby
 from os.path import join
 from random import seed
-from typing import Tuple
+from tempfile import TemporaryDirectory
+from typing import Dict, Iterable, Iterator, List, Optional
 
 import numpy as np
 import pandas as pd
 import typer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, recall_score, f1_score
 from sklearn.model_selection import StratifiedKFold
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from sklearn.tree import DecisionTreeClassifier
 from tqdm import tqdm
 
-from adaptive_padding.constants import FolderPath, ATTACKER
+from adaptive_padding.constants import FolderPath, ATTACKER, STORAGE
+from adaptive_padding.experiment.classification import ClassificationTask, ClassificationResult, FeatureMatrix, \
+	ModelCache, TRAIN_TEST_SPLIT_FOLD, create_classifiers, fit_models, run_task, run_tasks
 from adaptive_padding.experiment.evaluation import ExperimentConfiguration
+from adaptive_padding.experiment.results import ResultsSink, RESULTS_FILENAME
+from adaptive_padding.features.windows import WINDOWED_FEATURES_SUFFIX, select_window
+from adaptive_padding.utils.capture import capture_day
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+from adaptive_padding.utils.profiling import profiling
+from adaptive_padding.utils.storage import feature_store, windowed_feature_store
 
 logging.basicConfig(level=logging.INFO)
 
+DEFAULT_FEATURES = ["avg", "std", "total"]
+FEATURE_COLUMNS = DEFAULT_FEATURES + ["label"]
+EVALUATION_MANIFEST_FILENAME = "evaluation_manifest.json"
+
 seed(42)
 
 
 class Experiment:
-	def __init__(self, padding_strategy, ground_truth_folder_features, padding_folder_features):
+	def __init__(
+			self,
+			padding_strategy,
+			ground_truth_folder_features,
+			padding_folder_features,
+			storage=STORAGE.CSV.value,
+			model_cache_folder: Optional[str] = FolderPath.GROUND_TRUTH_MODELS.value,
+			window: Optional[float] = None,
+			features: Optional[List[str]] = None):
 		"""
 		Initializes the variables used throughout the experiment. 
 		
@@ -35,6 +50,10 @@ class Experiment:
 		paddingStrategy: padding strategy evaluated (can take the following values: 100, 500, 700, 900, Exponential, Linear, Mouse_elephant, Random, Random255, and MTU).
 		groundTruthFolderFeatures: folder where files with IoT traffic features are located;
 		paddingFolderFeatures: folder where the files with traffic features modified by the padding strategy are located.
+		storage: format in which the features are stored (csv or parquet).
+		model_cache_folder: folder where the models trained on the original IoT traffic are kept and reused by every strategy (None to fit them for each strategy).
+		window: observation window of the attacker in seconds, read from the windowed features written by prepare_features with --window (None for the per-second features).
+		features: features the classifiers are trained on (avg, std and total by default). The windowed features add count and, when prepare_features was run with --sketch, the bin_<index> length counts and the q10..q90 length quantiles, so they need a window.
 		"""
 		self.filenames = [
 			'16-09-23.csv',
@@ -60,59 +79,129 @@ class Experiment:
 		self.__padding_strategy = padding_strategy
 		self.__ground_truth_folder_features = ground_truth_folder_features
 		self.__padding_folder_features = padding_folder_features
-
-		self.rfc = RandomForestClassifier()
-		self.svc = SVC()
-		self.dtc = DecisionTreeClassifier()
-		self.knn = KNeighborsClassifier(n_neighbors=5)
+		self.__storage = storage
+		self.window = window
+		self.features = list(features) if features else DEFAULT_FEATURES
+		if self.window is None and not set(self.features).issubset(DEFAULT_FEATURES):
+			raise ValueError(f"Features {sorted(set(self.features) - set(DEFAULT_FEATURES))} are only computed for windows, set a window.")
+		self.model_cache = ModelCache(model_cache_folder) if model_cache_folder is not None else None
+
+		self.classifiers = create_classifiers()
 		self.skf = StratifiedKFold(n_splits=10)
+		self.performance = {classifier: [[], [], []] for classifier in self.classifiers}
 
-		self.rfc_dict = [[], [], []]
-		self.svc_dict = [[], [], []]
-		self.dtc_dict = [[], [], []]
-		self.knn_dict = [[], [], []]
+	@property
+	def columns(self) -> List[str]:
+		return self.features + ["label"]
 
-		self.classifiers = {
-			self.rfc: self.rfc_dict,
-			self.svc: self.svc_dict,
-			self.dtc: self.dtc_dict,
-			self.knn: self.knn_dict}
+	def load_ground_truth_features(self, filename: str) -> pd.DataFrame:
+		"""
+		Loads the features of the original IoT traffic of one day. 
 
-	def compute_classifier_performance(self) -> Tuple[float, float, float]:
+		Parameters:
+		filename: name of the CSV file of the day (e.g. 16-09-23.csv).
 		"""
-		Calculates accuracy, recall, and F1-score metric values. 
+		if self.window is not None:
+			return self.load_windowed_features(filename, ground_truth=True)
+		if self.__storage == STORAGE.PARQUET.value:
+			return feature_store(self.__ground_truth_folder_features, by_strategy=False).read(
+				self.columns,
+				day=capture_day(filename))
+		return pd.read_csv(self.ground_truth_features_path(filename))
+
+	def load_padding_features(self, filename: str) -> pd.DataFrame:
 		"""
-		self.accuracy = accuracy_score(self.y_test, self.y_pred)
-		self.recall = recall_score(self.y_test, self.y_pred, average='micro')
-		self.f1_measurement = f1_score(self.y_test, self.y_pred, average='micro')
-		return self.accuracy, self.recall, self.f1_measurement
+		Loads the features of the IoT traffic of one day modified by the padding strategy. 
 
-	def write_file(self, classifier, traffic_filename, filename):
+		Parameters:
+		filename: name of the CSV file of the day (e.g. 16-09-23.csv).
+		"""
+		if self.window is not None:
+			return self.load_windowed_features(filename, ground_truth=False)
+		if self.__storage == STORAGE.PARQUET.value:
+			return feature_store(self.__padding_folder_features).read(
+				self.columns,
+				strategy=self.__padding_strategy,
+				day=capture_day(filename))
+		return pd.read_csv(self.padding_features_path(filename))
+
+	def ground_truth_features_path(self, filename: str) -> str:
 		"""
-		Write the values of the accuracy, recall, and F1-score metrics in a text file.  
+		Returns the file (CSV) or partition folder (Parquet) of the features of the original IoT traffic of one day, windowed when a window is set.
+		"""
+		if self.__storage == STORAGE.PARQUET.value:
+			store = windowed_feature_store if self.window is not None else feature_store
+			return store(self.__ground_truth_folder_features, by_strategy=False).partition_folder(day=capture_day(filename))
+		suffix = WINDOWED_FEATURES_SUFFIX if self.window is not None else "_features.csv"
+		return os.path.join(self.__ground_truth_folder_features, f"{filename}.tar.xz{suffix}")
 
-		Parameters:
-		classifier: classifier name.
-		trafficFilename: name of the CSV file that stores the data coming from the IoT traffic. 
-		filename: file name in which accuracy, recall, and F1-score metric values are written.
-		"""
-		with open(filename, mode='a') as file_writer:
-			file_writer.write(f"{traffic_filename} ------ {classifier}.\n")
-			file_writer.write(f"accuracy: {self.accuracy}.\n")
-			file_writer.write(f"recall: {self.recall}.\n")
-			file_writer.write(f"f1_score: {self.f1_measurement}.\n")
-			file_writer.write("\n\n######################################")
-	
-	def update_classifiers_performance(self, classifier):
+	def padding_features_path(self, filename: str) -> str:
+		"""
+		Returns the file (CSV) or partition folder (Parquet) of the features of one day of traffic padded by the strategy, windowed when a window is set.
+		"""
+		if self.__storage == STORAGE.PARQUET.value:
+			store = windowed_feature_store if self.window is not None else feature_store
+			return store(self.__padding_folder_features).partition_folder(strategy=self.__padding_strategy, day=capture_day(filename))
+		suffix = WINDOWED_FEATURES_SUFFIX if self.window is not None else "_features.csv"
+		return os.path.join(self.__padding_folder_features, self.__padding_strategy, f"{filename.replace('.csv', '.xz')}{suffix}")
+
+	def load_windowed_features(self, filename: str, ground_truth: bool) -> pd.DataFrame:
+		"""
+		Loads the features of the window of the experiment from the features of every window size of one day.
+		"""
+		if self.__storage == STORAGE.PARQUET.value and ground_truth:
+			features = windowed_feature_store(self.__ground_truth_folder_features, by_strategy=False).read(
+				["window"] + self.columns,
+				day=capture_day(filename))
+		elif self.__storage == STORAGE.PARQUET.value:
+			features = windowed_feature_store(self.__padding_folder_features).read(
+				["window"] + self.columns,
+				strategy=self.__padding_strategy,
+				day=capture_day(filename))
+		else:
+			features = pd.read_csv(self.ground_truth_features_path(filename) if ground_truth else self.padding_features_path(filename))
+		return select_window(features, self.window)[self.columns]
+
+	def results_filename(self, attacker: str) -> str:
+		"""
+		Returns the name of the JSON file with the results of the experiment for the attacker.
+		"""
+		experiment = "train_test_split" if attacker == ATTACKER.EXTERNAL.value else "cross_validation"
+		return f"{self.__padding_strategy}_{experiment}.json"
+
+	def feature_digest(self, manifest: Manifest, filename: str, ground_truth: bool) -> str:
+		"""
+		Returns the digest of the features of one day, as stored by prepare_features.
+		"""
+		path = self.ground_truth_features_path(filename) if ground_truth else self.padding_features_path(filename)
+		if self.__storage == STORAGE.PARQUET.value:
+			return manifest.folder_digest(path)
+		return manifest.file_digest(path)
+
+	def fingerprint(self, manifest: Manifest, attacker: str) -> Dict:
+		"""
+		Identifies the results of the experiment by the digests of the features it reads and the version of this script.
+		"""
+		inputs = {}
+		for filename in self.filenames:
+			inputs[filename] = [self.feature_digest(manifest, filename, ground_truth=False)]
+			if attacker == ATTACKER.EXTERNAL.value:
+				inputs[filename].append(self.feature_digest(manifest, filename, ground_truth=True))
+		window = {"window": self.window} if self.window is not None else {}
+		features = {"features": self.features} if self.features != DEFAULT_FEATURES else {}
+		return fingerprint(
+			inputs=inputs, attacker=attacker, storage=self.__storage, code=code_version(Experiment, run_task), **window, **features)
+
+	def update_classifiers_performance(self, result: ClassificationResult):
 		"""
 		Stores the accuracy, recall and F1-score for each classifier evaluated in each analyzed dataset. 
 
 		Parameters:
-		classifier: name of the evaluated classifier. 
+		result: metrics of a classifier on one day (and fold) of IoT traffic.
 		""" 
-		self.classifiers[classifier][0].append(self.accuracy)
-		self.classifiers[classifier][1].append(self.recall)
-		self.classifiers[classifier][2].append(self.f1_measurement)
+		self.performance[result.classifier][0].append(result.accuracy)
+		self.performance[result.classifier][1].append(result.recall)
+		self.performance[result.classifier][2].append(result.f1_score)
 	
 	def save_classifiers_performance_to_file(self, filename: str):
 		"""
@@ -124,97 +213,178 @@ class Experiment:
 		classifiers_performance = []
 		for classifier in self.classifiers:
 			performance = {
-				"name": str(classifier),
-				"Average accuracy": np.mean(self.classifiers[classifier][0]),
-				"Min accuracy": np.min(self.classifiers[classifier][0]),
-				"Max accuracy": np.max(self.classifiers[classifier][0]),
-				"Average recall": np.mean(self.classifiers[classifier][1]),
-				"Min recall": np.min(self.classifiers[classifier][1]),
-				"Max recall": np.max(self.classifiers[classifier][1]),
-				"Average f1_score": np.mean(self.classifiers[classifier][2]),
-				"Min f1_score": np.min(self.classifiers[classifier][2]),
-				"Max f1_score": np.max(self.classifiers[classifier][2])
+				"name": classifier,
+				"Average accuracy": np.mean(self.performance[classifier][0]),
+				"Min accuracy": np.min(self.performance[classifier][0]),
+				"Max accuracy": np.max(self.performance[classifier][0]),
+				"Average recall": np.mean(self.performance[classifier][1]),
+				"Min recall": np.min(self.performance[classifier][1]),
+				"Max recall": np.max(self.performance[classifier][1]),
+				"Average f1_score": np.mean(self.performance[classifier][2]),
+				"Min f1_score": np.min(self.performance[classifier][2]),
+				"Max f1_score": np.max(self.performance[classifier][2])
 			}
 			classifiers_performance.append(performance)
 
 		with open(filename, mode="w") as file_writer:
 			json.dump(classifiers_performance, file_writer)
 
-	def run_train_test_split(self):
+	@staticmethod
+	def create_matrix(matrix_folder: str, name: str, data: pd.DataFrame, features: List[str] = DEFAULT_FEATURES) -> FeatureMatrix:
 		"""
-		It performs an experiment in which classifiers are trained with features calculated from the original IoT traffic, while testing these models with features calculated from the traffic changed by padding strategy. 
+		Stores the features of one day as a matrix that the worker processes map instead of receiving a copy. 
 		"""
-		for filename in tqdm(self.filenames):
-			self.train_data = pd.read_csv(os.path.join(self.__ground_truth_folder_features, f"{filename}.tar.xz_features.csv"))
-			self.test_data = pd.read_csv(os.path.join(self.__padding_folder_features, self.__padding_strategy, f"{filename.replace('.csv', '.xz')}_features.csv"))
-
-			self.X_train = self.train_data[['avg', 'std', 'total']]
-			self.y_train = self.train_data['label']
-
-			self.X_test = self.test_data[['avg', 'std', 'total']]
-			self.y_test = self.test_data['label']
-
-			with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
-				executor.map(
-					lambda cls: cls.fit(self.X_train, self.y_train),
-					self.classifiers)
+		return FeatureMatrix.create(
+			matrix_folder,
+			name,
+			data[features].to_numpy(dtype=np.float64),
+			data['label'].to_numpy(dtype=np.int64))
 
+	def create_ground_truth_matrices(self, matrix_folder: str) -> Dict[str, FeatureMatrix]:
+		"""
+		Stores the features of the original IoT traffic of each day, which are shared by every strategy: a run builds them once and passes them to the models and tasks of every strategy. 
+		"""
+		return {
+			filename: Experiment.create_matrix(
+				matrix_folder,
+				f"ground_truth-{capture_day(filename)}",
+				self.load_ground_truth_features(filename),
+				self.features)
+			for filename in self.filenames}
+
+	def fit_ground_truth_models(self, ground_truth_matrices: Dict[str, FeatureMatrix], workers: int = 1):
+		"""
+		Trains the classifiers on the original IoT traffic of each day that has no model in the cache yet. 
+		"""
+		if self.model_cache is not None:
+			fit_models(self.model_cache, self.classifiers.values(), ground_truth_matrices.values(), workers)
 
-			for classifier in self.classifiers:
-				self.y_pred = classifier.predict(self.X_test)
-				self.accuracy, self.recall, self.f1_measurement = self.compute_classifier_performance()
-				self.update_classifiers_performance(classifier)
-				self.write_file(classifier, filename, f"{self.__padding_strategy}_train_test_split.txt")
+	def create_train_test_split_tasks(
+			self,
+			matrix_folder: str,
+			ground_truth_matrices: Optional[Dict[str, FeatureMatrix]] = None) -> Iterator[ClassificationTask]:
+		"""
+		Creates the tasks of an experiment in which classifiers are trained with features calculated from the original IoT traffic, while testing these models with features calculated from the traffic changed by padding strategy. 
+		The ground truth matrices are built when they are not given.
+		"""
+		if ground_truth_matrices is None:
+			ground_truth_matrices = self.create_ground_truth_matrices(matrix_folder)
+		for filename in self.filenames:
+			day = capture_day(filename)
+			train = ground_truth_matrices[filename]
+			test = Experiment.create_matrix(matrix_folder, f"{self.__padding_strategy}-{day}", self.load_padding_features(filename), self.features)
+			for classifier, estimator in self.classifiers.items():
+				yield ClassificationTask(
+					self.__padding_strategy, filename, TRAIN_TEST_SPLIT_FOLD, classifier, estimator, train, test, model_cache=self.model_cache)
+
+	def create_cross_validation_tasks(self, matrix_folder: str) -> Iterator[ClassificationTask]:
+		"""
+		Creates the tasks of an experiment that evaluates classifiers only on the attributes of traffic changed by padding strategies. 
+		Models are trained and tested on the same datasets using the cross-validation technique; folds are passed to the tasks as index arrays. 
+		"""
+		for filename in self.filenames:
+			matrix = Experiment.create_matrix(
+				matrix_folder,
+				f"{self.__padding_strategy}-{capture_day(filename)}",
+				self.load_padding_features(filename),
+				self.features)
+			for fold, (train_index, test_index) in enumerate(self.skf.split(matrix.X, matrix.y)):
+				for classifier, estimator in self.classifiers.items():
+					yield ClassificationTask(
+						self.__padding_strategy, filename, fold, classifier, estimator, matrix, matrix, train_index, test_index)
+
+	def create_tasks(
+			self,
+			attacker: str,
+			matrix_folder: str,
+			ground_truth_matrices: Optional[Dict[str, FeatureMatrix]] = None) -> Iterator[ClassificationTask]:
+		if attacker == ATTACKER.EXTERNAL.value:
+			return self.create_train_test_split_tasks(matrix_folder, ground_truth_matrices)
+		return self.create_cross_validation_tasks(matrix_folder)
+
+	def run(self, attacker: str, workers: int = 1):
+		with TemporaryDirectory() as matrix_folder, ResultsSink() as sink:
+			ground_truth_matrices = None
+			if attacker == ATTACKER.EXTERNAL.value:
+				ground_truth_matrices = self.create_ground_truth_matrices(matrix_folder)
+				self.fit_ground_truth_models(ground_truth_matrices, workers)
+			tasks = self.create_tasks(attacker, matrix_folder, ground_truth_matrices)
+			self.save_results(attacker, run_tasks(tasks, workers), sink)
+
+	def number_tasks(self, attacker: str) -> int:
+		number_folds = 1 if attacker == ATTACKER.EXTERNAL.value else self.skf.get_n_splits()
+		return len(self.filenames) * number_folds * len(self.classifiers)
+
+	def save_results(self, attacker: str, results: Iterable[ClassificationResult], sink: ResultsSink):
+		"""
+		Adds the metrics of every task to the results table and writes their summary to the JSON file. 
+		"""
+		for result in results:
+			self.update_classifiers_performance(result)
+			sink.append(attacker, result)
+		self.save_classifiers_performance_to_file(self.results_filename(attacker))
 
-		self.save_classifiers_performance_to_file(f"{self.__padding_strategy}_train_test_split.json")
+	def run_train_test_split(self, workers: int = 1):
+		"""
+		It performs an experiment in which classifiers are trained with features calculated from the original IoT traffic, while testing these models with features calculated from the traffic changed by padding strategy. 
+		"""
+		self.run(ATTACKER.EXTERNAL.value, workers)
 
-	def run_cross_validation(self):
+	def run_cross_validation(self, workers: int = 1):
 		"""
 		Evaluates classifiers only on the attributes of traffic changed by padding strategies. 
 		Models are trained and tested on the same datasets using the cross-validation technique. 
 		"""
-		for filename in tqdm(self.filenames):
-			self.test_data = pd.read_csv(os.path.join(
-				self.__padding_folder_features,
-				self.__padding_strategy,
-				f"{filename.replace('.csv', '.xz')}_features.csv"))
-
-			self.X = self.test_data[['avg', 'std', 'total']].values
-			self.y = self.test_data['label'].values
-
-			for train_index, test_index in self.skf.split(self.X, self.y):
-				self.X_train, self.X_test = self.X[train_index], self.X[test_index]
-				self.y_train, self.y_test = self.y[train_index], self.y[test_index]
-
-				with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
-					executor.map(
-						lambda cls: cls.fit(self.X_train, self.y_train),
-						self.classifiers)
-
-				for classifier in self.classifiers:
-					self.y_pred = classifier.predict(self.X_test)
-					self.accuracy, self.recall, self.f1_measurement = self.compute_classifier_performance()
-					self.update_classifiers_performance(classifier)
-					self.write_file(classifier, filename, f"{self.__padding_strategy}_cross_validation.txt")
-
-		self.save_classifiers_performance_to_file(f"{self.__padding_strategy}_cross_validation.json")
-
-
-def main(filename: str = "", attacker: str = ""):
-	configuration_file = os.path.join(FolderPath.CONFIGURATION.value, filename)
-	experiment_configuration = ExperimentConfiguration()
-	setup = experiment_configuration.load_configuration(configuration_file)
-	strategies = setup["padding_strategies"]
-	for strategy in strategies:
-		print(f"Evaluating strategy {strategy}.")
-		experiment = Experiment(
-			padding_strategy=strategy,
-			ground_truth_folder_features=join(FolderPath.GROUND_TRUTH_FEATURES.value),
-			padding_folder_features=join(FolderPath.PADDING_FEATURES.value))
-		if attacker == ATTACKER.EXTERNAL.value:
-			experiment.run_train_test_split()
-		elif attacker == ATTACKER.INTERNAL.value:
-			experiment.run_cross_validation()
+		self.run(ATTACKER.INTERNAL.value, workers)
+
+
+def main(filename: str = "", attacker: str = "", storage: str = STORAGE.CSV.value, workers: int = -1, profile: str = ""):
+	"""
+	Evaluates the strategies of the configuration file. The (strategy, day, fold, classifier) tasks of every strategy with stale results run on a pool of workers processes (-1 for one per CPU).
+	"""
+	with profiling(profile, "padding_strategies_evaluation"):
+		configuration_file = os.path.join(FolderPath.CONFIGURATION.value, filename)
+		experiment_configuration = ExperimentConfiguration()
+		setup = experiment_configuration.load_configuration(configuration_file)
+		strategies = setup["padding_strategies"]
+		attacker = ATTACKER(attacker).value
+		manifest = Manifest(".", EVALUATION_MANIFEST_FILENAME)
+		experiments = {}
+		fingerprints = {}
+		for strategy in strategies:
+			experiment = Experiment(
+				padding_strategy=strategy,
+				ground_truth_folder_features=join(FolderPath.GROUND_TRUTH_FEATURES.value),
+				padding_folder_features=join(FolderPath.PADDING_FEATURES.value),
+				storage=STORAGE(storage).value,
+				window=setup.get("window"),
+				features=setup.get("features"))
+			fingerprints[strategy] = experiment.fingerprint(manifest, attacker)
+			if manifest.is_fresh(f"{strategy}/{attacker}", fingerprints[strategy], [experiment.results_filename(attacker), RESULTS_FILENAME]):
+				print(f"Skipping strategy {strategy}: the results are up to date.")
+				continue
+			print(f"Evaluating strategy {strategy}.")
+			experiments[strategy] = experiment
+
+		with TemporaryDirectory() as matrix_folder, ResultsSink() as sink:
+			# The ground truth matrices (and models) do not depend on the strategy, so they are built once for every strategy.
+			ground_truth_matrices = None
+			if attacker == ATTACKER.EXTERNAL.value and experiments:
+				first_experiment = next(iter(experiments.values()))
+				ground_truth_matrices = first_experiment.create_ground_truth_matrices(matrix_folder)
+				first_experiment.fit_ground_truth_models(ground_truth_matrices, workers)
+			tasks = chain.from_iterable(
+				experiment.create_tasks(attacker, matrix_folder, ground_truth_matrices) for experiment in experiments.values())
+			results = tqdm(
+				run_tasks(tasks, workers),
+				total=sum(experiment.number_tasks(attacker) for experiment in experiments.values()),
+				desc="Tasks")
+			for strategy, strategy_results in groupby(results, key=lambda result: result.strategy):
+				experiments[strategy].save_results(attacker, strategy_results, sink)
+		# The results table is only replaced when every strategy succeeded, so the strategies are recorded afterwards.
+		for strategy in experiments:
+			manifest.record(f"{strategy}/{attacker}", fingerprints[strategy])
+		manifest.save()
 
 
 if __name__ == "__main__":
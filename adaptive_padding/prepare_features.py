@@ -3,90 +3,64 @@ This script reads the CSV files, in which padding was applied or not, and genera
 '''
 import glob
 from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
 from functools import partial
 from glob import glob
 from os import cpu_count
 from os.path import join, basename
-from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from adaptive_padding.constants import FolderPath
-from adaptive_padding.experiment.evaluation import ExperimentConfiguration
-from adaptive_padding.utils.utils import create_folder
+from adaptive_padding.constants import FolderPath, STORAGE
+from adaptive_padding.experiment.evaluation import ExperimentConfiguration, PaddingExperiment
+from adaptive_padding.features.sketches import DEFAULT_BIN_WIDTH, LengthSketch
+from adaptive_padding.features.windows import WindowAggregator, windowed_features_filepath
+from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.padding.strategies_mapping_factory import create_strategies_mapping
+from adaptive_padding.utils.capture import DEVICES_FILEPATH, capture_day, load_devices, encode_devices, load_capture
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+from adaptive_padding.utils.profiling import profiling, stage, count_rows
+from adaptive_padding.utils.storage import packet_store, feature_store, windowed_feature_store
+from adaptive_padding.utils.utils import create_folder, derive_seed
 
 import typer
 
+CHUNK_SIZE: int = 1_000_000
+
 
 class Feature:
-	def __init__(self, csv_folder, output_folder):
+	def __init__(self, csv_folder, output_folder, devices_filepath: str = DEVICES_FILEPATH):
 		self.__csv_folder = csv_folder
 		self.__output_folder = output_folder
-		self.__device_id_generator = Feature.generate_device_id()
-		self.__devices_mac_addresses = [
-			"d0:52:a8:00:67:5e",
-			"44:65:0d:56:cc:d3",
-			"70:ee:50:18:34:43",
-			"f4:f2:6d:93:51:f1",
-			"00:16:6c:ab:6b:88",
-			"30:8c:fb:2f:e4:b2",
-			"00:62:6e:51:27:2e",
-			"00:24:e4:11:18:a8",
-			"ec:1a:59:79:f4:89",
-			"50:c7:bf:00:56:39",
-			"74:c6:3b:29:d7:1d",
-			"ec:1a:59:83:28:11",
-			"18:b4:30:25:be:e4",
-			"70:ee:50:03:b8:ac",
-			"00:24:e4:1b:6f:96",
-			"74:6a:89:00:2e:25",
-			"00:24:e4:20:28:c6",
-			"d0:73:d5:01:83:08",
-			"18:b7:9e:02:20:44",
-			"e0:76:d0:33:bb:85",
-			"70:5a:0f:e4:9b:c0"]
-		self.devices = {device_address: next(self.__device_id_generator) for device_address in self.__devices_mac_addresses}
-		self.__temporary_directory: TemporaryDirectory = TemporaryDirectory()
-
-	@staticmethod
-	def generate_device_id():
-		device_id = 0
-		while True:
-			yield device_id
-			device_id += 1
+		self.__devices_mac_addresses = load_devices(devices_filepath)
+		self.devices = {device_address: device_id for device_id, device_address in enumerate(self.__devices_mac_addresses)}
 
-	def encode_labels(self, dataset: pd.DataFrame) -> pd.DataFrame:
+	def encode_devices(self, mac_addresses: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
 		"""
-		Converts the MAC address of IoT devices into integer labels. 
+		Maps MAC addresses to device labels in a single pass over the column.
 
 		Parameters:
-		dataset: dataset with IoT traffic.
+		mac_addresses: source MAC address of each packet.
 
 		Returns:
-		a dataset with MAC addresses of IoT devices mapped to integer labels.
+		the integer label of each packet (-1 for packets that do not come from an IoT device) and the mask of packets that come from IoT devices.
 		"""
-		for device in self.devices:
-			dataset["src_mac"] = dataset["src_mac"].replace(device, self.devices[device])
-		return dataset
+		return encode_devices(mac_addresses, self.__devices_mac_addresses)
 
-	@staticmethod
-	def filter_iot_devices(dataset: pd.DataFrame) -> pd.DataFrame:
+	def encode_labels(self, dataset: pd.DataFrame) -> pd.DataFrame:
 		"""
-		Selects only the IoT devices present in the analyzed data.
+		Converts the MAC address of IoT devices into integer labels and selects only the IoT devices present in the analyzed data.
 
 		Parameters:
 		dataset: dataset with IoT traffic.
 
 		Returns:
-		a dataset that contains only samples coming from IoT devices. 
-		"""
-		return dataset[dataset['src_mac'].astype(str).str.isdigit()]
-
-	def remove_temporary_files(self) -> None:
-		"""
-		Discards temporary files.  
+		a dataset that contains only samples coming from IoT devices, with their MAC addresses mapped to integer labels.
 		"""
-		self.__temporary_directory.cleanup()
+		labels, is_iot_device = self.encode_devices(dataset["src_mac"])
+		return dataset.loc[is_iot_device].assign(src_mac=labels[is_iot_device])
 
 	def save_file(self, dataset: pd.DataFrame, filepath: str) -> None:
 		"""
@@ -98,99 +72,483 @@ class Feature:
 		"""
 		dataset.to_csv(join(self.__output_folder, f"{basename(filepath)}_features.csv"), sep=",", index=False)
 
-	def group_samples_per_second(self, dataset: pd.DataFrame) -> None:
+	@staticmethod
+	def accumulate_statistics(dataset: pd.DataFrame, statistics: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+		"""
+		Counts the packets and sums their lengths and squared lengths at one-second intervals. These partial statistics add up across chunks of a capture.
+
+		Parameters:
+		dataset: dataset with IoT traffic, without missing lengths.
+		statistics: partial statistics of the previous chunks, if any.
+
+		Returns:
+		the "count", "sum" and "sum_squares" columns indexed by label and time.
+		"""
+		lengths = dataset["Length"].to_numpy(dtype=np.int64)
+		chunk_statistics = dataset.assign(Length=lengths, square=lengths * lengths).groupby(by=["src_mac", "Time"]).agg(
+			count=("Length", "count"),
+			sum=("Length", "sum"),
+			sum_squares=("square", "sum"))
+		if statistics is None:
+			return chunk_statistics
+		return statistics.add(chunk_statistics, fill_value=0).astype(np.int64)
+
+	@staticmethod
+	def summarize_statistics(statistics: pd.DataFrame) -> pd.DataFrame:
+		"""
+		Calculates the average, (sample) standard deviation, and number of bytes of the packet length from the partial statistics.
+
+		Parameters:
+		statistics: partial statistics computed by accumulate_statistics.
+
+		Returns:
+		the statistics ("mean", "sum" and "std" columns) indexed by label and time.
+		"""
+		count = statistics["count"].to_numpy()
+		total = statistics["sum"].to_numpy()
+		with np.errstate(divide="ignore", invalid="ignore"):
+			variance = (count * statistics["sum_squares"].to_numpy() - total * total) / (count * (count - 1))
+		summary = pd.DataFrame(index=statistics.index)
+		summary["mean"] = total / count
+		summary["sum"] = total
+		summary["std"] = np.where(count > 1, np.sqrt(np.maximum(variance, 0)), np.nan)
+		return summary.sort_index()
+
+	def group_samples_per_second(self, dataset: pd.DataFrame) -> pd.DataFrame:
 		"""
 		Calculates the average, standard deviation, and number of bytes statistics for the packet length grouped at one-second intervals. 
 
 		Parameters:
 		dataset: dataset with IoT traffic.
+
+		Returns:
+		the statistics ("mean", "sum" and "std" columns) indexed by label and time.
 		"""
-		dataset["Length"] = dataset["Length"].astype('int')
-		group = dataset.groupby(by=["src_mac", "Time"])
-		group.mean()["Length"].to_csv(
-			join(self.__temporary_directory.name, "length_avg.csv"),
-			sep=",",
-			header=False)
-		group.sum()["Length"].to_csv(
-			join(self.__temporary_directory.name, "length_sum.csv"),
-			sep=",",
-			header=False)
-		group.std()["Length"].to_csv(
-			join(self.__temporary_directory.name, "length_std.csv"),
-			sep=",",
-			header=False)
+		return Feature.summarize_statistics(Feature.accumulate_statistics(dataset.dropna(subset=["Length"])))
 
 	@staticmethod
-	def load_dataset(filename: str) -> pd.DataFrame:
+	def load_dataset(filename: str, chunksize: Optional[int] = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
 		"""
 		Loads a CSV file containing the IoT traffic in the following format: each measurement corresponds to seconds from the start of capture. 
-		At a minimum, the following columns must be present in the datasets: source MAC address, frame/packet size and time instant when the capture was performed. 
+		Only the source MAC address, frame/packet size and time instant when the capture was performed are parsed; lengths equal to "None" are loaded as missing values. 
 
 		Parameters:
 		filename: name of the CSV file that stores the data to be loaded. 
+		chunksize: number of rows per chunk. When None, the whole file is loaded at once; otherwise, an iterator over chunks is returned.
 		"""
-		return pd.read_csv(
-			filename,
-			low_memory=False,
-			encoding="iso-8859-1")[["src_mac", "Time", "Length"]]
+		return load_capture(filename, chunksize)
 
-	def create_features(self) -> pd.DataFrame:
+	@staticmethod
+	def create_features(statistics: pd.DataFrame) -> pd.DataFrame:
 		"""
 		Builds a dataset from statistics calculated based on packet length. 
-		"""		
+
+		Parameters:
+		statistics: statistics computed by group_samples_per_second.
+		"""
 		features = pd.DataFrame()
-		features["avg"] = pd.read_csv(
-			join(self.__temporary_directory.name, "length_avg.csv"),
-			names=["label", "Time", "Length"])["Length"]
-		features["std"] = pd.read_csv(
-			join(self.__temporary_directory.name, "length_std.csv"),
-			names=["label", "Time", "Length"])["Length"]
-		features["total"] = pd.read_csv(
-			join(self.__temporary_directory.name, "length_sum.csv"),
-			names=["label", "Time", "Length"])["Length"]
-		features["label"] = pd.read_csv(
-			join(self.__temporary_directory.name, "length_avg.csv"),
-			names=["label", "Time", "Length"])["label"]
+		features["avg"] = statistics["mean"].to_numpy()
+		features["std"] = statistics["std"].to_numpy()
+		features["total"] = statistics["sum"].to_numpy()
+		features["label"] = statistics.index.get_level_values("src_mac").to_numpy()
 		return features
 
+	@staticmethod
+	def empty_features() -> pd.DataFrame:
+		"""
+		Returns the features of a capture without IoT packets (e.g. a capture with only a header).
+		"""
+		return pd.DataFrame({
+			"avg": np.zeros(0, dtype=np.float64),
+			"std": np.zeros(0, dtype=np.float64),
+			"total": np.zeros(0, dtype=np.int64),
+			"label": np.zeros(0, dtype=np.int64)})
+
+
+def compute_features(datasets: Iterable[pd.DataFrame], aggregator: Optional[WindowAggregator] = None) -> pd.DataFrame:
+	"""
+	Computes the features of a capture read in chunks whose src_mac column already holds integer labels. When an aggregator is given, it accumulates the statistics of its window sizes from the same chunks.
+	"""
+	statistics = None
+	for dataset in datasets:
+		dataset = dataset.dropna(subset=["Length"])
+		statistics = Feature.accumulate_statistics(dataset, statistics)
+		if aggregator is not None:
+			aggregator.add(dataset)
+	if statistics is None:
+		return Feature.empty_features()
+	iot_features = Feature.create_features(Feature.summarize_statistics(statistics))
+	return iot_features.dropna()
 
-def process_file(csv_folder: str, output_folder: str, filename: str):
+
+def save_windowed_features(
+		aggregator: WindowAggregator,
+		output_folder: str,
+		filename: str,
+		storage: str,
+		padding_strategy: Optional[str] = None):
+	"""
+	Stores the features of every window size (and the length sketches) accumulated by an aggregator for a capture: next to its per-second features in CSV mode, or in the windowed feature store, partitioned by day (and strategy for padded traffic), in Parquet mode.
+	"""
+	windowed_features = aggregator.features()
+	if storage == STORAGE.PARQUET.value and padding_strategy is None:
+		windowed_feature_store(output_folder, by_strategy=False, sketch=aggregator.sketch).write(windowed_features, day=capture_day(filename))
+	elif storage == STORAGE.PARQUET.value:
+		windowed_feature_store(output_folder, sketch=aggregator.sketch).write(windowed_features, strategy=padding_strategy, day=capture_day(filename))
+	else:
+		windowed_features.to_csv(windowed_features_filepath(output_folder, filename), sep=",", index=False)
+
+
+def process_file(
+		csv_folder: str,
+		output_folder: str,
+		filename: str,
+		chunksize: int = CHUNK_SIZE,
+		storage: str = STORAGE.CSV.value,
+		windows: Sequence[float] = (),
+		sketch: Optional[LengthSketch] = None):
 	features = Feature(csv_folder, output_folder)
-	dataset = Feature.load_dataset(filename)
-	dataset = features.encode_labels(dataset)
-	dataset = Feature.filter_iot_devices(dataset)
-	dataset.drop(dataset["Length"][dataset["Length"] == "None"].index, inplace=True)
-	features.group_samples_per_second(dataset)
-	iot_features = features.create_features()
-	iot_features.dropna(inplace=True)
-	features.save_file(iot_features, filename)
-	features.remove_temporary_files()
-
-
-def iterate_over_files(csv_folder: str, output_folder: str):
-	files = glob(join(csv_folder, "*.xz"))
-	partial_process_file = partial(process_file, csv_folder, output_folder)
+	aggregator = WindowAggregator(windows, sketch) if windows else None
+	with stage("compute_features", file=basename(filename)) as record:
+		iot_features = compute_features(
+			map(features.encode_labels, count_rows(Feature.load_dataset(filename, chunksize), record)),
+			aggregator)
+	with stage("write_features", file=basename(filename), storage=storage) as record:
+		record.rows = len(iot_features)
+		if storage == STORAGE.PARQUET.value:
+			feature_store(output_folder, by_strategy=False).write(iot_features, day=capture_day(filename))
+		else:
+			features.save_file(iot_features, filename)
+		if aggregator is not None:
+			save_windowed_features(aggregator, output_folder, filename, storage)
+
+
+def process_partition(
+		padding_folder: str,
+		output_folder: str,
+		padding_strategy: str,
+		chunksize: int,
+		day: str,
+		windows: Sequence[float] = (),
+		sketch: Optional[LengthSketch] = None):
+	"""
+	Computes the features of one day of traffic padded by a strategy, reading only that partition of the Parquet store.
+	"""
+	datasets = packet_store(padding_folder).iterate(
+		["Time", "Length", "device"],
+		chunksize,
+		strategy=padding_strategy,
+		day=day)
+	aggregator = WindowAggregator(windows, sketch) if windows else None
+	with stage("compute_features", strategy=padding_strategy, day=day) as record:
+		iot_features = compute_features(
+			(dataset.rename(columns={"device": "src_mac"}) for dataset in count_rows(datasets, record)),
+			aggregator)
+	with stage("write_features", strategy=padding_strategy, day=day, storage=STORAGE.PARQUET.value) as record:
+		record.rows = len(iot_features)
+		feature_store(output_folder).write(iot_features, strategy=padding_strategy, day=day)
+		if aggregator is not None:
+			save_windowed_features(aggregator, output_folder, day, STORAGE.PARQUET.value, padding_strategy)
+
+
+def features_code_version() -> str:
+	return code_version(Feature, compute_features, load_capture, feature_store, WindowAggregator, LengthSketch)
+
+
+def window_parameters(windows: Sequence[float], sketch: Optional[LengthSketch] = None) -> Dict[str, Any]:
+	"""
+	Returns the fingerprint component of the window sizes (and of the length sketches), empty when only the per-second features are computed, so the fingerprints of those runs do not change.
+	"""
+	if not windows:
+		return {}
+	return {"windows": WindowAggregator(windows).windows, **({"sketch": asdict(sketch)} if sketch is not None else {})}
+
+
+def features_output_path(output_folder: str, filename: str, storage: str) -> str:
+	if storage == STORAGE.PARQUET.value:
+		return feature_store(output_folder, by_strategy=False).partition_folder(day=capture_day(filename))
+	return join(output_folder, f"{basename(filename)}_features.csv")
+
+
+def features_output_paths(output_folder: str, filename: str, storage: str, windows: Sequence[float] = ()) -> List[str]:
+	output_paths = [features_output_path(output_folder, filename, storage)]
+	if windows and storage == STORAGE.PARQUET.value:
+		output_paths.append(windowed_feature_store(output_folder, by_strategy=False).partition_folder(day=capture_day(filename)))
+	elif windows:
+		output_paths.append(windowed_features_filepath(output_folder, filename))
+	return output_paths
+
+
+def iterate_over_files(
+		csv_folder: str,
+		output_folder: str,
+		chunksize: int = CHUNK_SIZE,
+		storage: str = STORAGE.CSV.value,
+		windows: Sequence[float] = (),
+		sketch: Optional[LengthSketch] = None):
+	"""
+	Computes the features of the captures that are new or changed since the last run, according to the manifest of the output folder.
+	"""
+	manifest = Manifest(output_folder)
+	fingerprints = {
+		filepath: fingerprint(
+			input=manifest.file_digest(filepath),
+			storage=storage,
+			code=features_code_version(),
+			**window_parameters(windows, sketch))
+		for filepath in sorted(glob(join(csv_folder, "*.xz")))}
+	files = [
+		filepath for filepath, file_fingerprint in fingerprints.items()
+		if not manifest.is_fresh(basename(filepath), file_fingerprint, features_output_paths(output_folder, filepath, storage, windows))]
+	manifest.save()
+	partial_process_file = partial(process_file, csv_folder, output_folder, chunksize=chunksize, storage=storage, windows=windows, sketch=sketch)
 	with ProcessPoolExecutor(max_workers=cpu_count()) as executor:
-		executor.map(partial_process_file, files)
+		for filepath, _ in zip(files, executor.map(partial_process_file, files)):
+			manifest.record(basename(filepath), fingerprints[filepath])
+			manifest.save()
+
 
+def iterate_over_partitions(
+		padding_folder: str,
+		output_folder: str,
+		padding_strategy: str,
+		chunksize: int = CHUNK_SIZE,
+		windows: Sequence[float] = (),
+		sketch: Optional[LengthSketch] = None):
+	"""
+	Computes the features of the days padded by a strategy that are new or changed since the last run.
+	The manifest is kept in the output folder, outside the feature store, which pyarrow reads as a dataset of Parquet files only.
+	"""
+	packets = packet_store(padding_folder)
+	features = feature_store(output_folder)
+	manifest = Manifest(output_folder)
+	fingerprints = {
+		day: fingerprint(
+			input=manifest.folder_digest(packets.partition_folder(strategy=padding_strategy, day=day)),
+			code=features_code_version(),
+			**window_parameters(windows, sketch))
+		for day in packets.partition_values("day", strategy=padding_strategy)}
+	days = [
+		day for day, day_fingerprint in fingerprints.items()
+		if not manifest.is_fresh(
+			f"{padding_strategy}/{day}",
+			day_fingerprint,
+			[features.partition_folder(strategy=padding_strategy, day=day)] + (
+				[windowed_feature_store(output_folder).partition_folder(strategy=padding_strategy, day=day)] if windows else []))]
+	manifest.save()
+	partial_process_partition = partial(process_partition, padding_folder, output_folder, padding_strategy, chunksize, windows=windows, sketch=sketch)
+	with ProcessPoolExecutor(max_workers=cpu_count()) as executor:
+		for day, _ in zip(days, executor.map(partial_process_partition, days)):
+			manifest.record(f"{padding_strategy}/{day}", fingerprints[day])
+			manifest.save()
 
-def main(filename: str = ""):
-	configuration_file = join(FolderPath.CONFIGURATION.value, filename)
-	setup = ExperimentConfiguration.load_configuration(configuration_file)
 
-	if setup["padding"] != "None" and setup["padding_strategies"] != "None":
-		padding_strategies = setup["padding_strategies"]
-		for padding_strategy in padding_strategies:
-			print(f"Preparing features for strategy: {padding_strategy}.")
-			csv_folder = join(FolderPath.PADDING_DATA.value, setup["padding"], padding_strategy)
-			output_folder = join(FolderPath.PADDING_FEATURES.value, padding_strategy)
-			create_folder(output_folder)
-			iterate_over_files(csv_folder, output_folder)
-	else:
-		csv_folder = FolderPath.RAW_DATA.value
-		output_folder = FolderPath.GROUND_TRUTH_FEATURES.value
-		create_folder(output_folder)
-		iterate_over_files(csv_folder, output_folder)
+def pad_and_compute_features(
+		filepath: str,
+		strategies: Dict[str, PaddingStrategy],
+		seed: Optional[int] = None,
+		chunksize: int = CHUNK_SIZE,
+		aggregators: Optional[Dict[str, WindowAggregator]] = None) -> Dict[str, pd.DataFrame]:
+	"""
+	Computes the features of a capture padded by each strategy without writing the padded capture: the capture is read once and the padded lengths of each chunk are aggregated in memory.
+	As in PaddingExperiment, every packet with a length is padded in capture order and each strategy is reseeded from (seed, capture, strategy), so the features are equal to those of the padded captures.
+	When aggregators are given, the aggregator of each strategy accumulates the statistics of its window sizes from the same padded chunks.
+	"""
+	devices = load_devices()
+	if seed is not None:
+		for strategy_name, strategy in strategies.items():
+			strategy.reseed(derive_seed(seed, basename(filepath), strategy_name))
+	statistics = dict.fromkeys(strategies)
+	with stage("pad_and_compute_features", file=basename(filepath), strategies=",".join(strategies)) as record:
+		for dataset in count_rows(Feature.load_dataset(filepath, chunksize), record):
+			dataset = dataset.dropna(subset=["Length"])
+			lengths = dataset["Length"].to_numpy(dtype=np.int64)
+			labels, is_iot_device = encode_devices(dataset["src_mac"], devices)
+			iot_dataset = dataset.loc[is_iot_device].assign(src_mac=labels[is_iot_device])
+			for strategy_name, strategy in strategies.items():
+				padded_dataset = iot_dataset.assign(Length=PaddingExperiment.pad_lengths(strategy, lengths)[is_iot_device])
+				statistics[strategy_name] = Feature.accumulate_statistics(padded_dataset, statistics[strategy_name])
+				if aggregators is not None:
+					aggregators[strategy_name].add(padded_dataset)
+	return {
+		strategy_name: Feature.create_features(Feature.summarize_statistics(strategy_statistics)).dropna()
+		if strategy_statistics is not None else Feature.empty_features()
+		for strategy_name, strategy_statistics in statistics.items()}
+
+
+def padded_filename(filepath: str) -> str:
+	"""
+	Returns the name of the padded copy of a capture written by PaddingExperiment, e.g. 16-09-23.xz.
+	"""
+	return basename(filepath).replace(".csv.tar.xz", ".xz")
+
+
+def padding_features_folder(output_folder: str, padding_strategy: str, storage: str) -> str:
+	if storage == STORAGE.PARQUET.value:
+		return feature_store(output_folder).partition_folder(strategy=padding_strategy)
+	return join(output_folder, padding_strategy)
+
+
+def padding_features_output_path(output_folder: str, padding_strategy: str, filepath: str, storage: str) -> str:
+	if storage == STORAGE.PARQUET.value:
+		return feature_store(output_folder).partition_folder(strategy=padding_strategy, day=capture_day(filepath))
+	return join(output_folder, padding_strategy, f"{padded_filename(filepath)}_features.csv")
+
+
+def padding_features_output_paths(
+		output_folder: str,
+		padding_strategy: str,
+		filepath: str,
+		storage: str,
+		windows: Sequence[float] = ()) -> List[str]:
+	output_paths = [padding_features_output_path(output_folder, padding_strategy, filepath, storage)]
+	if windows and storage == STORAGE.PARQUET.value:
+		output_paths.append(windowed_feature_store(output_folder).partition_folder(strategy=padding_strategy, day=capture_day(filepath)))
+	elif windows:
+		output_paths.append(windowed_features_filepath(join(output_folder, padding_strategy), padded_filename(filepath)))
+	return output_paths
+
+
+def padding_features_artifact(padding_strategy: str, filepath: str, storage: str) -> str:
+	"""
+	Returns the name under which iterate_over_files and iterate_over_partitions record the features of a padded capture in their manifest, so the fused and materialized paths skip each other's outputs when their fingerprints match.
+	"""
+	if storage == STORAGE.PARQUET.value:
+		return f"{padding_strategy}/{capture_day(filepath)}"
+	return padded_filename(filepath)
+
+
+def pad_and_process_file(
+		output_folder: str,
+		strategies: Dict[str, PaddingStrategy],
+		seed: Optional[int],
+		chunksize: int,
+		storage: str,
+		windows: Sequence[float],
+		sketch: Optional[LengthSketch],
+		filepath: str,
+		strategy_names: List[str]):
+	strategies = {strategy_name: strategies[strategy_name] for strategy_name in strategy_names}
+	aggregators = {strategy_name: WindowAggregator(windows, sketch) for strategy_name in strategies} if windows else None
+	for strategy_name, iot_features in pad_and_compute_features(filepath, strategies, seed, chunksize, aggregators).items():
+		with stage("write_features", file=basename(filepath), strategy=strategy_name, storage=storage) as record:
+			record.rows = len(iot_features)
+			if storage == STORAGE.PARQUET.value:
+				feature_store(output_folder).write(iot_features, strategy=strategy_name, day=capture_day(filepath))
+			else:
+				iot_features.to_csv(padding_features_output_path(output_folder, strategy_name, filepath, storage), sep=",", index=False)
+			if aggregators is not None and storage == STORAGE.PARQUET.value:
+				save_windowed_features(aggregators[strategy_name], output_folder, filepath, storage, strategy_name)
+			elif aggregators is not None:
+				save_windowed_features(aggregators[strategy_name], join(output_folder, strategy_name), padded_filename(filepath), storage)
+
+
+def pad_and_iterate_over_files(
+		csv_folder: str,
+		output_folder: str,
+		strategies: Dict[str, PaddingStrategy],
+		seed: Optional[int] = None,
+		chunksize: int = CHUNK_SIZE,
+		storage: str = STORAGE.CSV.value,
+		windows: Sequence[float] = (),
+		sketch: Optional[LengthSketch] = None):
+	"""
+	Computes the features of the raw captures padded by every strategy in a single pass per capture, without writing the padded captures.
+	The (capture, strategy) pairs that are up to date according to the manifests of the padding features are skipped.
+	"""
+	# In Parquet mode, every strategy shares the manifest of iterate_over_partitions, kept in the output folder outside the feature store.
+	shared_manifests: Dict[str, Manifest] = {}
+	manifests: Dict[str, Manifest] = {}
+	for padding_strategy in strategies:
+		folder = padding_features_folder(output_folder, padding_strategy, storage)
+		create_folder(folder, exist_ok=True)
+		manifest = Manifest(output_folder if storage == STORAGE.PARQUET.value else folder)
+		manifests[padding_strategy] = shared_manifests.setdefault(manifest.filepath, manifest)
+	files = sorted(glob(join(csv_folder, "*.xz")))
+	fingerprints = {
+		(filepath, padding_strategy): fingerprint(
+			input=manifests[padding_strategy].file_digest(filepath),
+			parameters=strategy.parameters(),
+			seed=seed,
+			storage=storage,
+			fused=True,
+			code=code_version(type(strategy), PaddingExperiment, Feature, compute_features, pad_and_compute_features, WindowAggregator, LengthSketch),
+			**window_parameters(windows, sketch))
+		for filepath in files for padding_strategy, strategy in strategies.items()}
+	pending_strategies = {}
+	for filepath in files:
+		strategy_names = [
+			padding_strategy for padding_strategy in strategies
+			if not manifests[padding_strategy].is_fresh(
+				padding_features_artifact(padding_strategy, filepath, storage),
+				fingerprints[(filepath, padding_strategy)],
+				padding_features_output_paths(output_folder, padding_strategy, filepath, storage, windows))]
+		if strategy_names:
+			pending_strategies[filepath] = strategy_names
+	for manifest in shared_manifests.values():
+		manifest.save()
+	partial_process_file = partial(pad_and_process_file, output_folder, strategies, seed, chunksize, storage, windows, sketch)
+	with ProcessPoolExecutor(max_workers=cpu_count()) as executor:
+		results = executor.map(partial_process_file, pending_strategies, pending_strategies.values())
+		for (filepath, strategy_names), _ in zip(pending_strategies.items(), results):
+			for padding_strategy in strategy_names:
+				manifest = manifests[padding_strategy]
+				manifest.record(padding_features_artifact(padding_strategy, filepath, storage), fingerprints[(filepath, padding_strategy)])
+				manifest.save()
+
+
+def main(
+		filename: str = "",
+		chunksize: int = CHUNK_SIZE,
+		storage: str = STORAGE.CSV.value,
+		fused: bool = False,
+		seed: int = 42,
+		window: List[float] = typer.Option([]),
+		sketch: bool = False,
+		sketch_bin_width: int = DEFAULT_BIN_WIDTH,
+		profile: str = ""):
+	if sketch and not window:
+		window = [1.0]
+	length_sketch = LengthSketch(sketch_bin_width) if sketch else None
+	with profiling(profile, "prepare_features"):
+		configuration_file = join(FolderPath.CONFIGURATION.value, filename)
+		setup = ExperimentConfiguration.load_configuration(configuration_file)
+
+		if setup["padding"] != "None" and setup["padding_strategies"] != "None" and fused:
+			print(f"Padding the captures and preparing features for strategies: {', '.join(setup['padding_strategies'])}.")
+			strategies = create_strategies_mapping(
+				setup["padding_strategies"],
+				setup.get("histogram", join(FolderPath.HISTOGRAMS.value, "all.npz")),
+				setup.get("number_buckets", 10))
+			pad_and_iterate_over_files(
+				FolderPath.RAW_DATA.value,
+				FolderPath.PADDING_FEATURES.value,
+				strategies,
+				seed,
+				chunksize,
+				storage,
+				window,
+				length_sketch)
+		elif setup["padding"] != "None" and setup["padding_strategies"] != "None":
+			padding_strategies = setup["padding_strategies"]
+			for padding_strategy in padding_strategies:
+				print(f"Preparing features for strategy: {padding_strategy}.")
+				if storage == STORAGE.PARQUET.value:
+					padding_folder = join(FolderPath.PADDING_DATA.value, setup["padding"])
+					create_folder(
+						feature_store(FolderPath.PADDING_FEATURES.value).partition_folder(strategy=padding_strategy),
+						exist_ok=True)
+					iterate_over_partitions(padding_folder, FolderPath.PADDING_FEATURES.value, padding_strategy, chunksize, window, length_sketch)
+					continue
+				csv_folder = join(FolderPath.PADDING_DATA.value, setup["padding"], padding_strategy)
+				output_folder = join(FolderPath.PADDING_FEATURES.value, padding_strategy)
+				create_folder(output_folder, exist_ok=True)
+				iterate_over_files(csv_folder, output_folder, chunksize, windows=window, sketch=length_sketch)
+		else:
+			csv_folder = FolderPath.RAW_DATA.value
+			output_folder = FolderPath.GROUND_TRUTH_FEATURES.value
+			create_folder(output_folder, exist_ok=True)
+			iterate_over_files(csv_folder, output_folder, chunksize, storage, window, length_sketch)
 
 
 if __name__ == "__main__":
@@ -3,20 +3,34 @@ Implements the packet padding proposal presented in the paper "Adaptive Packet P
 """
 from os.path import join
 
-from adaptive_padding.constants import FolderPath
+import typer
+
+from adaptive_padding.constants import FolderPath, STORAGE
 from adaptive_padding.experiment.evaluation import PaddingExperiment
 from adaptive_padding.padding.strategies_mapping_factory import create_existing_strategies_mapping
+from adaptive_padding.utils.profiling import profiling
 
 
-def main():
-    strategies = create_existing_strategies_mapping()
-    experiment = PaddingExperiment(
-        FolderPath.RAW_DATA.value,
-        join(FolderPath.PADDING_DATA.value, "Existing"),
-        5,
-        strategies)
-    experiment.execute()
+def main(
+        workers: int = 1,
+        seed: int = 42,
+        single_pass: bool = False,
+        storage: str = STORAGE.CSV.value,
+        profile: str = ""):
+    with profiling(profile, "run_existing_padding"):
+        strategies = create_existing_strategies_mapping()
+        experiment = PaddingExperiment(
+            FolderPath.RAW_DATA.value,
+            join(FolderPath.PADDING_DATA.value, "Existing"),
+            5,
+            strategies,
+            single_pass=single_pass,
+            workers=workers,
+            seed=seed,
+            lookup_table_folder=FolderPath.LOOKUP_TABLES.value,
+            storage=STORAGE(storage).value)
+        experiment.execute()
 
 
 if __name__ == "__main__":
-    main()
+    typer.run(main)
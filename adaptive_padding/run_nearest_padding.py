@@ -1,21 +1,41 @@
 from os.path import join
 from typing import Dict
 
-from adaptive_padding.experiment.evaluation import PaddingExperiment
+import typer
+
+from adaptive_padding.experiment.evaluation import PaddingExperiment, ExperimentConfiguration
 from adaptive_padding.padding.padding_strategy import PaddingStrategy
 from adaptive_padding.padding.strategies_mapping_factory import create_nearest_strategies_mapping
-from adaptive_padding.constants import FolderPath
+from adaptive_padding.constants import FolderPath, STORAGE
+from adaptive_padding.utils.profiling import profiling
 
 
-def main():
-    strategies: Dict[str, PaddingStrategy] = create_nearest_strategies_mapping()
-    experiment = PaddingExperiment(
-        FolderPath.RAW_DATA.value,
-        join(FolderPath.PADDING_DATA.value, "Proposal"),
-        5,
-        strategies)
-    experiment.execute()
+def main(
+        filename: str = "near_experiment_configuration.json",
+        workers: int = 1,
+        seed: int = 42,
+        single_pass: bool = False,
+        use_julia: bool = False,
+        storage: str = STORAGE.CSV.value,
+        profile: str = ""):
+    with profiling(profile, "run_nearest_padding"):
+        setup = ExperimentConfiguration.load_configuration(join(FolderPath.CONFIGURATION.value, filename))
+        strategies: Dict[str, PaddingStrategy] = create_nearest_strategies_mapping(
+            histogram_filepath=setup.get("histogram", join(FolderPath.HISTOGRAMS.value, "all.npz")),
+            number_buckets=setup.get("number_buckets", 10),
+            use_julia=use_julia)
+        experiment = PaddingExperiment(
+            FolderPath.RAW_DATA.value,
+            join(FolderPath.PADDING_DATA.value, "Proposal"),
+            5,
+            strategies,
+            single_pass=single_pass,
+            workers=workers,
+            seed=seed,
+            lookup_table_folder=FolderPath.LOOKUP_TABLES.value,
+            storage=STORAGE(storage).value)
+        experiment.execute()
 
 
 if __name__ == "__main__":
-    main()
+    typer.run(main)
@@ -3,26 +3,37 @@ Implements the packet padding proposal presented in the paper "Adaptive Packet P
 """
 
 from os.path import join
-from random import seed
 from typing import Dict
 
-from adaptive_padding.constants import FolderPath
+import typer
+
+from adaptive_padding.constants import FolderPath, STORAGE
 from adaptive_padding.experiment.evaluation import PaddingExperiment
 from adaptive_padding.padding.padding_strategy import PaddingStrategy
 from adaptive_padding.padding.strategies_mapping_factory import create_proposal_strategies_mapping
-
-seed(42)
+from adaptive_padding.utils.profiling import profiling
 
 
-def main():
-    strategies: Dict[str, PaddingStrategy] = create_proposal_strategies_mapping()
-    experiment = PaddingExperiment(
-        FolderPath.RAW_DATA.value,
-        join(FolderPath.PADDING_DATA.value, "Proposal"),
-        5,
-        strategies)
-    experiment.execute()
+def main(
+        workers: int = 1,
+        seed: int = 42,
+        single_pass: bool = False,
+        storage: str = STORAGE.CSV.value,
+        profile: str = ""):
+    with profiling(profile, "run_proposal_padding"):
+        strategies: Dict[str, PaddingStrategy] = create_proposal_strategies_mapping()
+        experiment = PaddingExperiment(
+            FolderPath.RAW_DATA.value,
+            join(FolderPath.PADDING_DATA.value, "Proposal"),
+            5,
+            strategies,
+            single_pass=single_pass,
+            workers=workers,
+            seed=seed,
+            lookup_table_folder=FolderPath.LOOKUP_TABLES.value,
+            storage=STORAGE(storage).value)
+        experiment.execute()
 
 
 if __name__ == "__main__":
-    main()
+    typer.run(main)
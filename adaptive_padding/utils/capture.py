@@ -0,0 +1,64 @@
+"""
+Reading of the IoT traffic captures shared by the padding, feature and histogram stages.
+"""
+import json
+from os.path import join, basename
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from adaptive_padding.constants import FolderPath
+
+DEVICES_FILEPATH: str = join(FolderPath.CONFIGURATION.value, "devices.json")
+CAPTURE_DTYPES: Dict[str, str] = {"src_mac": "category", "Time": "float64", "Length": "Int64"}
+
+
+def capture_day(filepath: str) -> str:
+    return basename(filepath).split(".")[0]
+
+
+def load_devices(filepath: str = DEVICES_FILEPATH) -> List[str]:
+    """
+    Loads the MAC addresses of the IoT devices. The label of each device is its position in the list.
+
+    Parameters:
+    filepath: JSON file with a "devices" list of MAC addresses.
+    """
+    with open(filepath, mode="r") as file_reader:
+        return json.load(file_reader)["devices"]
+
+
+def encode_devices(mac_addresses: pd.Series, devices: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maps MAC addresses to device labels in a single pass over the column.
+
+    Parameters:
+    mac_addresses: source MAC address of each packet.
+    devices: MAC addresses of the IoT devices, in label order.
+
+    Returns:
+    the integer label of each packet (-1 for packets that do not come from an IoT device) and the mask of packets that
+    come from IoT devices.
+    """
+    labels = pd.Categorical(mac_addresses, categories=devices).codes.astype(np.int64)
+    return labels, labels >= 0
+
+
+def load_capture(filename, chunksize: Optional[int] = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Loads the source MAC address, frame/packet size and time instant of each packet of a capture. Lengths equal to
+    "None" are loaded as missing values.
+
+    Parameters:
+    filename: name of the CSV file that stores the data to be loaded.
+    chunksize: number of rows per chunk. When None, the whole file is loaded at once; otherwise, an iterator over chunks
+    is returned.
+    """
+    return pd.read_csv(
+        filename,
+        usecols=list(CAPTURE_DTYPES),
+        dtype=CAPTURE_DTYPES,
+        na_values=["None"],
+        chunksize=chunksize,
+        encoding="iso-8859-1")
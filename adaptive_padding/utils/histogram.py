@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_KEY: str = "all"
+
+
+@dataclass
+class LengthHistogram:
+    """
+    Packet length frequency map (countmap in OptimalPadding.jl) stored as a dense array indexed by length.
+    Histograms of different captures, devices or days are merged by adding them.
+    """
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    def __post_init__(self):
+        self.counts = np.trim_zeros(np.asarray(self.counts, dtype=np.int64), trim="b")
+
+    @staticmethod
+    def from_lengths(lengths: np.ndarray) -> "LengthHistogram":
+        histogram = LengthHistogram()
+        histogram.add(lengths)
+        return histogram
+
+    def add(self, lengths: np.ndarray) -> None:
+        """
+        Counts a batch of packet lengths.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if len(lengths) == 0:
+            return
+        counts = np.bincount(lengths, minlength=len(self.counts))
+        counts[:len(self.counts)] += self.counts
+        self.counts = counts
+
+    def merge(self, other: "LengthHistogram") -> "LengthHistogram":
+        size = max(len(self.counts), len(other.counts))
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(self.counts)] += self.counts
+        counts[:len(other.counts)] += other.counts
+        return LengthHistogram(counts)
+
+    def __add__(self, other: "LengthHistogram") -> "LengthHistogram":
+        return self.merge(other)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LengthHistogram) and np.array_equal(self.counts, other.counts)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def lengths_and_frequencies(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the observed lengths, in ascending order, and their frequencies.
+        """
+        lengths = np.flatnonzero(self.counts)
+        return lengths, self.counts[lengths]
+
+    def digest(self) -> str:
+        return sha256(self.counts.astype("<i8").tobytes()).hexdigest()
+
+
+def merge_histograms(*mappings: Dict[str, LengthHistogram]) -> Dict[str, LengthHistogram]:
+    """
+    Merges histograms that share the same key (device, day or DEFAULT_KEY).
+    """
+    merged: Dict[str, LengthHistogram] = {}
+    for mapping in mappings:
+        for key, histogram in mapping.items():
+            merged[key] = merged[key] + histogram if key in merged else LengthHistogram(histogram.counts.copy())
+    return merged
+
+
+def save_histograms(filepath: str, histograms: Dict[str, LengthHistogram]) -> None:
+    """
+    Stores histograms in a compressed NumPy archive with one row of counts per key.
+    """
+    keys = sorted(histograms)
+    size = max((len(histograms[key].counts) for key in keys), default=0)
+    counts = np.zeros((len(keys), size), dtype=np.int64)
+    for row, key in enumerate(keys):
+        counts[row, :len(histograms[key].counts)] = histograms[key].counts
+    with open(filepath, mode="wb") as file_writer:
+        np.savez_compressed(file_writer, keys=np.array(keys, dtype=str), counts=counts)
+
+
+def load_histograms(filepath: str) -> Dict[str, LengthHistogram]:
+    with np.load(filepath) as archive:
+        return {str(key): LengthHistogram(counts) for key, counts in zip(archive["keys"], archive["counts"])}
+
+
+def load_histogram(filepath: str, key: str = DEFAULT_KEY) -> LengthHistogram:
+    """
+    Loads one histogram from an archive written by save_histograms, or builds it from a CSV file with a Length column
+    holding one packet length per row (e.g. Data/OnlyIoT/packet_sizes.csv).
+    """
+    if filepath.endswith(".csv"):
+        return LengthHistogram.from_lengths(pd.read_csv(filepath, usecols=["Length"])["Length"].to_numpy())
+    return load_histograms(filepath)[key]
@@ -0,0 +1,98 @@
+"""
+Manifest of the artifacts written by a pipeline stage. Each artifact (e.g. one padded capture or one features file) is
+recorded with a fingerprint made of the digest of its input, the parameters that produced it and the version of the
+code. A stage skips the artifacts whose fingerprint is unchanged and whose outputs exist, so adding a capture day or a
+strategy only computes what is new or stale. Deleting the manifest forces a full rebuild.
+"""
+import inspect
+import json
+from hashlib import sha256
+from os import makedirs, replace, stat, walk
+from os.path import join, exists, dirname, relpath
+from typing import Any, Dict, Iterable
+
+MANIFEST_FILENAME: str = "manifest.json"
+BLOCK_SIZE: int = 1 << 20
+
+
+def fingerprint(**components) -> Dict[str, Any]:
+    """
+    Builds a fingerprint in the form it takes once stored in JSON (tuples become lists, keys are sorted), so that it
+    compares equal to the stored one.
+    """
+    return json.loads(json.dumps(components, sort_keys=True, default=str))
+
+
+def code_version(*objects) -> str:
+    """
+    Returns a digest of the source files that define the given modules, classes or functions. For a class, the files of
+    its base classes in this package are included, e.g. padding_strategy.py for every strategy.
+    """
+    filepaths = set()
+    for obj in objects:
+        for member in (inspect.getmro(obj) if inspect.isclass(obj) else [obj]):
+            if getattr(member, "__module__", getattr(member, "__name__", "")).startswith("adaptive_padding"):
+                filepaths.add(inspect.getsourcefile(member))
+    digest = sha256()
+    for filepath in sorted(filepaths):
+        with open(filepath, mode="rb") as file_reader:
+            digest.update(sha256(file_reader.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+class Manifest:
+    def __init__(self, folder: str, filename: str = MANIFEST_FILENAME):
+        self.filepath = join(folder, filename)
+        content = {}
+        if exists(self.filepath):
+            with open(self.filepath, mode="r") as file_reader:
+                content = json.load(file_reader)
+        self.artifacts: Dict[str, Dict[str, Any]] = content.get("artifacts", {})
+        self.files: Dict[str, Dict[str, Any]] = content.get("files", {})
+
+    def is_fresh(self, artifact: str, artifact_fingerprint: Dict[str, Any], outputs: Iterable[str] = ()) -> bool:
+        """
+        Tells whether the artifact was recorded with the same fingerprint and all of its outputs still exist.
+        """
+        return self.artifacts.get(artifact) == artifact_fingerprint and all(exists(output) for output in outputs)
+
+    def record(self, artifact: str, artifact_fingerprint: Dict[str, Any]) -> None:
+        self.artifacts[artifact] = artifact_fingerprint
+
+    def save(self) -> None:
+        """
+        Writes the manifest atomically, so an interrupted run leaves either the previous or the new manifest.
+        """
+        makedirs(dirname(self.filepath) or ".", exist_ok=True)
+        temporary_filepath = f"{self.filepath}.tmp"
+        with open(temporary_filepath, mode="w") as file_writer:
+            json.dump({"artifacts": self.artifacts, "files": self.files}, file_writer, indent=1, sort_keys=True)
+        replace(temporary_filepath, self.filepath)
+
+    def file_digest(self, filepath: str) -> str:
+        """
+        Returns the SHA-256 digest of a file. Digests are kept in the manifest with the size and modification time of
+        the file, so unchanged multi-gigabyte captures are only read once.
+        """
+        status = stat(filepath)
+        cached = self.files.get(filepath)
+        if cached is not None and cached["size"] == status.st_size and cached["mtime_ns"] == status.st_mtime_ns:
+            return cached["digest"]
+        digest = sha256()
+        with open(filepath, mode="rb") as file_reader:
+            while block := file_reader.read(BLOCK_SIZE):
+                digest.update(block)
+        self.files[filepath] = {"size": status.st_size, "mtime_ns": status.st_mtime_ns, "digest": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def folder_digest(self, folder: str) -> str:
+        """
+        Returns a digest of every file under a folder, e.g. one partition of a Parquet store.
+        """
+        digest = sha256()
+        for root, folders, filenames in walk(folder):
+            folders.sort()
+            for filename in sorted(filenames):
+                filepath = join(root, filename)
+                digest.update(f"{relpath(filepath, folder)}:{self.file_digest(filepath)}".encode())
+        return digest.hexdigest()
@@ -0,0 +1,161 @@
+"""
+Opt-in instrumentation of the pipeline stages. A stage (e.g. padding a capture, computing the features of a day or
+fitting a classifier) records its wall time, CPU time and number of rows, the peak resident set size of its process so
+far and how much the stage raised that peak. A stage that raises is recorded too, with the name of the exception.
+
+Profiling is enabled for the duration of an entry point by profiling(), which the --profile option of the scripts
+calls with an output folder. It exports the location of the partial profiles in an environment variable, so worker
+processes started by the entry point record their stages too: each process appends one JSON line per stage to its own
+file. At the end, the partial profiles are merged into <folder>/<script>.json and <folder>/<script>.csv. When profiling
+is disabled, stages only cost a lookup of the environment variable.
+"""
+import json
+import os
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from glob import glob
+from os import makedirs, getpid
+from os.path import join
+from shutil import rmtree
+from time import perf_counter, process_time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_VARIABLE: str = "ADAPTIVE_PADDING_PROFILE"
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    labels: Dict[str, Any] = field(default_factory=dict)
+    rows: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    process_peak_rss: Optional[int] = None
+    peak_rss_increase: Optional[int] = None
+    error: Optional[str] = None
+    pid: int = field(default_factory=getpid)
+
+
+def parts_folder() -> Optional[str]:
+    """
+    Returns the folder of the partial profiles, or None when profiling is disabled.
+    """
+    return os.environ.get(PROFILE_VARIABLE) or None
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Returns the peak resident set size of the current process in bytes (None where it is not available).
+    """
+    if resource is None:
+        return None
+    maximum = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximum if sys.platform == "darwin" else maximum * 1024
+
+
+@contextmanager
+def stage(name: str, **labels) -> Iterator[StageRecord]:
+    """
+    Measures the enclosed block. The labels identify what the stage processed (e.g. file, strategy); the block sets the
+    number of rows on the yielded record.
+
+    The peak resident set size only grows during the life of a process, so a worker that runs many stages reports the
+    largest of them in process_peak_rss; peak_rss_increase is the part of that peak reached during this stage.
+    """
+    record = StageRecord(name, labels)
+    folder = parts_folder()
+    if folder is None:
+        yield record
+        return
+    start_wall, start_cpu, start_peak_rss = perf_counter(), process_time(), peak_rss()
+    try:
+        yield record
+    except Exception as error:
+        record.error = type(error).__name__
+        raise
+    finally:
+        record.wall_time = perf_counter() - start_wall
+        record.cpu_time = process_time() - start_cpu
+        record.process_peak_rss = peak_rss()
+        if record.process_peak_rss is not None:
+            record.peak_rss_increase = record.process_peak_rss - start_peak_rss
+        with open(join(folder, f"{record.pid}.jsonl"), mode="a") as file_writer:
+            file_writer.write(json.dumps(asdict(record), default=str) + "\n")
+
+
+def profiled(name: str, **labels):
+    """
+    Decorator that measures every call of a function as a stage with the given labels.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_rows(datasets: Iterable[pd.DataFrame], record: StageRecord) -> Iterator[pd.DataFrame]:
+    """
+    Adds the number of rows of each dataset (e.g. each chunk of a capture) to the record as it is consumed.
+    """
+    for dataset in datasets:
+        record.rows += len(dataset)
+        yield dataset
+
+
+def load_records(folder: str) -> List[Dict[str, Any]]:
+    records = []
+    for filepath in sorted(glob(join(folder, "*.jsonl"))):
+        with open(filepath, mode="r") as file_reader:
+            records.extend(json.loads(line) for line in file_reader if line.strip())
+    return records
+
+
+def write_profile(records: List[Dict[str, Any]], filepath: str) -> pd.DataFrame:
+    """
+    Writes the records as <filepath>.json and, with one column per label, <filepath>.csv.
+    """
+    with open(f"{filepath}.json", mode="w") as file_writer:
+        json.dump(records, file_writer, indent=1)
+    profile = pd.json_normalize(records, sep="_")
+    profile.columns = [column.replace("labels_", "") for column in profile.columns]
+    if not profile.empty:
+        profile["rows_per_second"] = profile["rows"] / profile["wall_time"].where(profile["wall_time"] > 0)
+    profile.to_csv(f"{filepath}.csv", index=False)
+    return profile
+
+
+@contextmanager
+def profiling(folder: Optional[str], name: str) -> Iterator[None]:
+    """
+    Profiles the stages run by an entry point (and its worker processes) and writes <folder>/<name>.json and .csv.
+    Nothing is recorded when folder is None or empty.
+    """
+    if not folder:
+        yield
+        return
+    parts = join(folder, f"{name}.parts")
+    rmtree(parts, ignore_errors=True)
+    makedirs(parts)
+    previous = os.environ.get(PROFILE_VARIABLE)
+    os.environ[PROFILE_VARIABLE] = parts
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[PROFILE_VARIABLE]
+        else:
+            os.environ[PROFILE_VARIABLE] = previous
+        write_profile(load_records(parts), join(folder, name))
+        rmtree(parts, ignore_errors=True)
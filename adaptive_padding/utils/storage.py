@@ -0,0 +1,194 @@
+"""
+Columnar storage backend for the intermediate data of the pipeline. Padded captures and features are stored as Parquet
+datasets partitioned in hive style (key=value folders), holding only the columns read by the next stage in compact
+types. Readers push partition filters and column selections down to pyarrow, so a stage only decompresses the
+partitions and columns it needs.
+
+Layout:
+<padding data>/<padding>/parquet/strategy=<name>/day=<day>/device=<label>/part-0.parquet (Time, Length)
+<padding features>/parquet/strategy=<name>/day=<day>/part-0.parquet (avg, std, total, label)
+<ground truth features>/parquet/day=<day>/part-0.parquet (avg, std, total, label)
+<padding features>/parquet_windowed/strategy=<name>/day=<day>/part-0.parquet (window, avg, std, total, count, label)
+<ground truth features>/parquet_windowed/day=<day>/part-0.parquet (window, avg, std, total, count, label)
+
+The windowed features may also hold the length sketch of each window (bin_0, bin_1, ... and q10..q90).
+"""
+from os import makedirs, listdir
+from os.path import join, exists
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from adaptive_padding.features.sketches import LengthSketch, QUANTILE_COLUMNS
+
+PARQUET_FOLDER: str = "parquet"
+WINDOWED_PARQUET_FOLDER: str = "parquet_windowed"
+PART_FILENAME: str = "part-0.parquet"
+COMPRESSION: str = "zstd"
+
+PACKET_PARTITIONING: pa.Schema = pa.schema([("strategy", pa.string()), ("day", pa.string()), ("device", pa.int8())])
+PACKET_SCHEMA: pa.Schema = pa.schema([("Time", pa.float64()), ("Length", pa.uint16())])
+FEATURE_SCHEMA: pa.Schema = pa.schema([
+    ("avg", pa.float64()), ("std", pa.float64()), ("total", pa.uint32()), ("label", pa.int8())])
+WINDOWED_FEATURE_SCHEMA: pa.Schema = pa.schema([
+    ("window", pa.float64()),
+    ("avg", pa.float64()),
+    ("std", pa.float64()),
+    ("total", pa.uint64()),
+    ("count", pa.uint32()),
+    ("label", pa.int8())])
+
+
+class ParquetStore:
+    """
+    A Parquet dataset whose files are stored one per partition, e.g. one per (strategy, day, device).
+    """
+    def __init__(self, root: str, partitioning: pa.Schema, schema: pa.Schema):
+        self.root = root
+        self.partitioning = partitioning
+        self.schema = schema
+
+    def partition_folder(self, **partition) -> str:
+        """
+        Returns the folder of a partition. The keys must be a prefix of the partitioning keys.
+        """
+        keys = self.partitioning.names[:len(partition)]
+        if set(keys) != set(partition):
+            raise ValueError(f"Partition keys {sorted(partition)} are not a prefix of {self.partitioning.names}.")
+        return join(self.root, *[f"{key}={partition[key]}" for key in keys])
+
+    def write(self, dataset: pd.DataFrame, **partition) -> None:
+        """
+        Stores a dataset as the single file of a partition, replacing it if it exists.
+        """
+        with PartitionedParquetWriter(self) as writer:
+            writer.write(pa.Table.from_pandas(dataset, schema=self.schema, preserve_index=False), **partition)
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", partitioning=ds.partitioning(self.partitioning, flavor="hive"))
+
+    @staticmethod
+    def partition_filter(**partition) -> Optional[ds.Expression]:
+        expression = None
+        for key, value in partition.items():
+            condition = ds.field(key) == value
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def read(self, columns: Optional[List[str]] = None, **partition) -> pd.DataFrame:
+        """
+        Loads the given columns of the rows that belong to the partition.
+        """
+        return self.dataset().to_table(columns=columns, filter=ParquetStore.partition_filter(**partition)).to_pandas()
+
+    def iterate(self, columns: Optional[List[str]] = None, batch_size: int = 1_000_000, **partition) \
+            -> Iterator[pd.DataFrame]:
+        """
+        Yields the given columns of the rows that belong to the partition in batches of at most batch_size rows.
+        """
+        batches = self.dataset().to_batches(
+            columns=columns,
+            filter=ParquetStore.partition_filter(**partition),
+            batch_size=batch_size)
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def partition_values(self, key: str, **partition) -> List[str]:
+        """
+        Lists the values of a partitioning key present in the store, e.g. the days padded with a strategy.
+        """
+        folder = self.partition_folder(**partition)
+        if not exists(folder):
+            return []
+        prefix = f"{key}="
+        return sorted(name[len(prefix):] for name in listdir(folder) if name.startswith(prefix))
+
+
+class PartitionedParquetWriter:
+    """
+    Keeps one open Parquet file per partition, so a capture processed in chunks yields one file per partition.
+    """
+    def __init__(self, store: ParquetStore):
+        self.store = store
+        self.writers: Dict[Tuple, pq.ParquetWriter] = {}
+
+    def write(self, table: pa.Table, **partition) -> None:
+        key = tuple(partition[name] for name in self.store.partitioning.names if name in partition)
+        if key not in self.writers:
+            folder = self.store.partition_folder(**partition)
+            makedirs(folder, exist_ok=True)
+            self.writers[key] = pq.ParquetWriter(
+                join(folder, PART_FILENAME),
+                self.store.schema,
+                compression=COMPRESSION)
+        self.writers[key].write_table(table)
+
+    def write_packets(self, strategy: str, day: str, labels: np.ndarray, times: np.ndarray, lengths: np.ndarray):
+        """
+        Appends the padded packets of a chunk to the partition of each device, keeping their order.
+        """
+        order = np.argsort(labels, kind="stable")
+        devices, starts = np.unique(labels[order], return_index=True)
+        for device, indices in zip(devices.tolist(), np.split(order, starts[1:])):
+            table = pa.table(
+                {"Time": times[indices], "Length": lengths[indices].astype(np.uint16)},
+                schema=self.store.schema)
+            self.write(table, strategy=strategy, day=day, device=device)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+    def __enter__(self) -> "PartitionedParquetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def packet_store(padding_folder: str) -> ParquetStore:
+    """
+    Returns the store of the packets padded by the strategies of a padding type, e.g.
+    Data/Processed/padding_data/Existing.
+    """
+    return ParquetStore(join(padding_folder, PARQUET_FOLDER), PACKET_PARTITIONING, PACKET_SCHEMA)
+
+
+def feature_store(features_folder: str, by_strategy: bool = True) -> ParquetStore:
+    """
+    Returns the store of the features of the padded traffic (partitioned by strategy and day) or of the original traffic
+    (partitioned by day).
+    """
+    names = ["strategy", "day"] if by_strategy else ["day"]
+    partitioning = pa.schema([(name, pa.string()) for name in names])
+    return ParquetStore(join(features_folder, PARQUET_FOLDER), partitioning, FEATURE_SCHEMA)
+
+
+def sketch_feature_schema(sketch: LengthSketch) -> pa.Schema:
+    """
+    Returns the schema of the windowed features with the bin counts and quantiles of the given length sketch.
+    """
+    return pa.schema(
+        list(WINDOWED_FEATURE_SCHEMA)
+        + [(column, pa.uint32()) for column in sketch.bin_columns]
+        + [(column, pa.float64()) for column in QUANTILE_COLUMNS])
+
+
+def windowed_feature_store(
+        features_folder: str,
+        by_strategy: bool = True,
+        sketch: Optional[LengthSketch] = None) -> ParquetStore:
+    """
+    Returns the store of the features of every window size, partitioned like feature_store. With a sketch, the files
+    are written with the columns of the length sketches.
+    """
+    names = ["strategy", "day"] if by_strategy else ["day"]
+    partitioning = pa.schema([(name, pa.string()) for name in names])
+    schema = sketch_feature_schema(sketch) if sketch is not None else WINDOWED_FEATURE_SCHEMA
+    return ParquetStore(join(features_folder, WINDOWED_PARQUET_FOLDER), partitioning, schema)
@@ -0,0 +1,247 @@
+"""
+Generator of synthetic smart home captures, used to test the pipeline at scale and to benchmark it without the UNSW
+days. Each device sends packets at its own rate with lengths drawn from its own distribution. Captures are written in
+the layout of the UNSW days (a quoted CSV file with the packet length at column index 5 inside an xz-compressed tar
+archive, <day>.csv.tar.xz), or as the packets of the IoT devices in the Parquet store of the padding stage.
+
+Packets are generated in blocks of seconds, each from a random generator seeded with the seed of the capture and the
+index of the block, so only one block is held in memory and a capture can be generated twice: the tar header needs the
+size of the CSV file before its content is written, and the first pass only counts bytes, so no uncompressed copy is
+kept on disk.
+"""
+import json
+import tarfile
+from dataclasses import dataclass
+from lzma import open as lzma_open
+from os.path import basename
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from adaptive_padding.utils.capture import load_devices, encode_devices
+from adaptive_padding.utils.storage import PartitionedParquetWriter, packet_store
+
+ENCODING: str = "ISO-8859-1"
+HEADER: str = '"No.","Time","Source","Destination","Protocol","Length","src_mac","Info"\n'
+MINIMUM_LENGTH: int = 42
+MTU: int = 1500
+BLOCK_SECONDS: int = 60
+TAR_BLOCK_SIZE: int = tarfile.BLOCKSIZE
+DESTINATIONS: List[str] = ["10.0.0.1", "52.94.233.129", "8.8.8.8", "192.168.1.1"]
+PROTOCOLS: List[str] = ["TCP", "UDP"]
+
+
+def iot(rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Mostly small packets (acknowledgements, sensor reports).
+    """
+    return np.minimum(MINIMUM_LENGTH + rng.geometric(1 / 60, size=size), MTU - 1)
+
+
+def bimodal(rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Small and near-MTU packets, as sent by cameras and speakers streaming media.
+    """
+    small = rng.integers(MINIMUM_LENGTH, 120, size=size)
+    large = rng.integers(1300, MTU, size=size)
+    return np.where(rng.random(size) < 0.6, small, large)
+
+
+def uniform(rng: np.random.Generator, size: int) -> np.ndarray:
+    return rng.integers(MINIMUM_LENGTH, MTU, size=size)
+
+
+DISTRIBUTIONS: Dict[str, Callable[[np.random.Generator, int], np.ndarray]] = {
+    "iot": iot,
+    "bimodal": bimodal,
+    "uniform": uniform}
+
+
+def sample_lengths(distribution: str, size: int, seed: int = 0) -> np.ndarray:
+    return DISTRIBUTIONS[distribution](np.random.default_rng(seed), size).astype(np.int64)
+
+
+@dataclass
+class DeviceProfile:
+    """
+    Traffic of one device. When lengths is given, packet lengths are drawn from it with the given weights (e.g. the
+    lengths observed for a real device); otherwise, from the named distribution.
+    """
+    mac_address: str
+    packets_per_second: float = 5.0
+    distribution: str = "iot"
+    lengths: Optional[List[int]] = None
+    weights: Optional[List[float]] = None
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.lengths is not None:
+            weights = None if self.weights is None else np.asarray(self.weights, dtype=np.float64) / np.sum(self.weights)
+            return rng.choice(np.asarray(self.lengths, dtype=np.int64), size=size, p=weights)
+        return DISTRIBUTIONS[self.distribution](rng, size).astype(np.int64)
+
+
+@dataclass
+class CaptureSpecification:
+    """
+    A capture of duration seconds. missing_length_fraction is the share of packets whose length is "None", as for the
+    frames without an IP length in the UNSW days.
+    """
+    devices: List[DeviceProfile]
+    duration: int = 3600
+    seed: int = 0
+    missing_length_fraction: float = 0.0
+    block_seconds: int = BLOCK_SECONDS
+
+    @staticmethod
+    def create(
+            number_iot_devices: Optional[int] = None,
+            number_other_devices: int = 2,
+            packets_per_second: float = 5.0,
+            distribution: str = "iot",
+            duration: int = 3600,
+            seed: int = 0,
+            devices_filepath: Optional[str] = None) -> "CaptureSpecification":
+        """
+        Creates a capture in which the first number_iot_devices devices of devices.json (all by default) and
+        number_other_devices other devices send packets at the same rate and with the same length distribution.
+        """
+        iot_devices = load_devices(devices_filepath) if devices_filepath is not None else load_devices()
+        iot_devices = iot_devices[:number_iot_devices]
+        other_devices = [f"02:00:00:00:{index // 256:02x}:{index % 256:02x}" for index in range(number_other_devices)]
+        return CaptureSpecification(
+            [DeviceProfile(mac_address, packets_per_second, distribution) for mac_address in iot_devices + other_devices],
+            duration,
+            seed)
+
+    @staticmethod
+    def load(filepath: str) -> "CaptureSpecification":
+        """
+        Loads a specification from a JSON file with the fields of CaptureSpecification and a list of devices with the
+        fields of DeviceProfile.
+        """
+        with open(filepath, mode="r") as file_reader:
+            content = json.load(file_reader)
+        content["devices"] = [DeviceProfile(**device) for device in content["devices"]]
+        return CaptureSpecification(**content)
+
+    @property
+    def packets_per_second(self) -> float:
+        return sum(device.packets_per_second for device in self.devices)
+
+    def number_blocks(self) -> int:
+        return -(-self.duration // self.block_seconds)
+
+    def generate_block(self, block: int) -> pd.DataFrame:
+        """
+        Generates the packets of the seconds [block * block_seconds, (block + 1) * block_seconds), ordered by time.
+        The number of packets of each device follows a Poisson distribution.
+        """
+        rng = np.random.default_rng([self.seed, block])
+        start = block * self.block_seconds
+        seconds = min(self.block_seconds, self.duration - start)
+        counts = rng.poisson([device.packets_per_second * seconds for device in self.devices])
+        sources = np.repeat(np.arange(len(self.devices)), counts)
+        lengths = np.concatenate(
+            [device.sample(rng, count) for device, count in zip(self.devices, counts)] + [np.zeros(0, dtype=np.int64)])
+        times = start + rng.integers(0, seconds, size=len(sources))
+        order = np.argsort(times, kind="stable")
+        packets = pd.DataFrame({
+            "Time": times[order],
+            "source": sources[order],
+            "Length": pd.array(lengths[order], dtype="Int64"),
+            "destination": rng.integers(len(DESTINATIONS), size=len(sources)),
+            "protocol": rng.integers(len(PROTOCOLS), size=len(sources))})
+        if self.missing_length_fraction > 0:
+            packets.loc[rng.random(len(packets)) < self.missing_length_fraction, "Length"] = pd.NA
+        return packets
+
+    def generate(self) -> Iterator[pd.DataFrame]:
+        for block in range(self.number_blocks()):
+            yield self.generate_block(block)
+
+
+def render_block(packets: pd.DataFrame, devices: List[DeviceProfile], first_number: int) -> str:
+    """
+    Formats packets as CSV lines with every field quoted, numbering them from first_number.
+    """
+    mac_addresses = [device.mac_address for device in devices]
+    lines = []
+    for number, time, source, length, destination, protocol in zip(
+            range(first_number, first_number + len(packets)),
+            packets["Time"].tolist(),
+            packets["source"].tolist(),
+            packets["Length"].astype(object).where(packets["Length"].notna(), "None").tolist(),
+            packets["destination"].tolist(),
+            packets["protocol"].tolist()):
+        lines.append(
+            f'"{number}","{time}","192.168.1.{10 + source % 240}","{DESTINATIONS[destination]}",'
+            f'"{PROTOCOLS[protocol]}","{length}","{mac_addresses[source]}","Len={length}"\n')
+    return "".join(lines)
+
+
+def render_capture(specification: CaptureSpecification) -> Iterator[str]:
+    yield HEADER
+    first_number = 1
+    for packets in specification.generate():
+        yield render_block(packets, specification.devices, first_number)
+        first_number += len(packets)
+
+
+def write_capture(filepath: str, specification: CaptureSpecification) -> int:
+    """
+    Writes the capture as a CSV file inside an xz-compressed tar archive, e.g. Data/Raw/16-09-23.csv.tar.xz.
+
+    Returns:
+    the number of packets written.
+    """
+    size = sum(len(text) for text in render_capture(specification))
+    tar_info = tarfile.TarInfo(basename(filepath).replace(".tar.xz", ""))
+    tar_info.size = size
+    number_packets = 0
+    with lzma_open(filepath, mode="wb") as file_writer:
+        file_writer.write(tar_info.tobuf(format=tarfile.USTAR_FORMAT))
+        for text in render_capture(specification):
+            file_writer.write(text.encode(ENCODING))
+            number_packets += text.count("\n")
+        file_writer.write(b"\0" * (-size % TAR_BLOCK_SIZE))
+        file_writer.write(b"\0" * (2 * TAR_BLOCK_SIZE))
+    return number_packets - 1
+
+
+def write_packets(
+        padding_folder: str,
+        day: str,
+        specification: CaptureSpecification,
+        strategy: str = "synthetic",
+        devices_filepath: Optional[str] = None) -> int:
+    """
+    Writes the packets of the IoT devices of the capture to the Parquet store of a padding folder as the traffic of the
+    given strategy, so the feature and evaluation stages can run on it directly.
+
+    Returns:
+    the number of packets written.
+    """
+    devices = load_devices(devices_filepath) if devices_filepath is not None else load_devices()
+    mac_addresses = pd.Series([device.mac_address for device in specification.devices], dtype="category")
+    number_packets = 0
+    with PartitionedParquetWriter(packet_store(padding_folder)) as writer:
+        for packets in specification.generate():
+            packets = packets.dropna(subset=["Length"])
+            labels, is_iot_device = encode_devices(mac_addresses.iloc[packets["source"].to_numpy()], devices)
+            writer.write_packets(
+                strategy,
+                day,
+                labels[is_iot_device],
+                packets["Time"].to_numpy(dtype=np.float64)[is_iot_device],
+                packets["Length"].to_numpy(dtype=np.int64)[is_iot_device])
+            number_packets += int(is_iot_device.sum())
+    return number_packets
+
+
+def capture_days(number_days: int, first_day: int = 23) -> List[str]:
+    """
+    Names days like the UNSW captures (16-09-23, 16-09-24, ...), which the evaluation expects.
+    """
+    days = pd.date_range(f"2016-09-{first_day:02d}", periods=number_days, freq="D")
+    return [day.strftime("%y-%m-%d") for day in days]
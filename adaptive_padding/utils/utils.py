@@ -1,10 +1,23 @@
+from hashlib import sha256
 from os import makedirs
 from os.path import exists, join
 from datetime import datetime
 
 
-def create_folder(folder_path: str) -> str:
-    if exists(folder_path):
+def create_folder(folder_path: str, exist_ok: bool = False) -> str:
+    """
+    Creates a folder. Unless exist_ok is set, an existing folder raises FileExistsError, so a stage without a manifest
+    does not overwrite the results of a previous run.
+    """
+    if exists(folder_path) and not exist_ok:
         raise FileExistsError(f"Folder {folder_path} exists.")
-    makedirs(folder_path)
+    makedirs(folder_path, exist_ok=exist_ok)
     return folder_path
+
+
+def derive_seed(seed: int, *keys: str) -> int:
+    """
+    Derives a deterministic 64-bit seed from a base seed and a sequence of keys, e.g. capture and strategy names.
+    """
+    digest = sha256(":".join([str(seed), *keys]).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
@@ -0,0 +1,89 @@
+"""
+End-to-end benchmarks of the pipeline on synthetic captures (generate_captures.py): padding (PaddingExperiment),
+features (prepare_features) and the attacker evaluation, each timed on the output of the previous stage.
+"""
+import os
+from glob import glob
+from os import makedirs
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List
+
+from adaptive_padding.constants import ATTACKER
+from adaptive_padding.experiment.evaluation import PaddingExperiment
+from adaptive_padding.padding.strategies_mapping_factory import create_existing_strategies_mapping, \
+    create_proposal_strategies_mapping
+from adaptive_padding.padding_strategies_evaluation import Experiment
+from adaptive_padding.prepare_features import process_file
+from adaptive_padding.utils.synthetic import CaptureSpecification, capture_days, write_capture
+from benchmarks.timing import Measurement
+
+NUMBER_DAYS: int = 2
+PACKETS_PER_SECOND: float = 10.0
+STRATEGIES: List[str] = ["mtu", "random255", "level500"]
+
+
+def timed(function, *args, **kwargs) -> float:
+    start = perf_counter()
+    function(*args, **kwargs)
+    return perf_counter() - start
+
+
+def run_macro(
+        number_rows: int = 100_000,
+        number_days: int = NUMBER_DAYS,
+        strategies: List[str] = STRATEGIES,
+        workers: int = 1) -> Dict[str, Measurement]:
+    """
+    Runs the pipeline once on number_days captures of about number_rows packets each, sent by the IoT devices and two
+    other devices at PACKETS_PER_SECOND each. Strategies are padded in a single pass over each capture.
+    """
+    days = capture_days(number_days)
+    specification = CaptureSpecification.create(packets_per_second=PACKETS_PER_SECOND)
+    specification.duration = max(1, round(number_rows / specification.packets_per_second))
+    mapping = {**create_existing_strategies_mapping(), **create_proposal_strategies_mapping()}
+    total_rows = number_rows * len(days)
+    results = {}
+    with TemporaryDirectory() as folder:
+        raw_folder, padding_folder = join(folder, "Raw"), join(folder, "padding_data")
+        ground_truth_folder, features_folder = join(folder, "ground_truth_features"), join(folder, "padding_features")
+        makedirs(raw_folder)
+        for seed, day in enumerate(days):
+            specification.seed = seed
+            write_capture(join(raw_folder, f"{day}.csv.tar.xz"), specification)
+
+        experiment = PaddingExperiment(
+            raw_folder,
+            padding_folder,
+            5,
+            {strategy: mapping[strategy] for strategy in strategies},
+            single_pass=True,
+            workers=workers,
+            seed=42)
+        results[f"macro/padding/{number_rows}_rows"] = Measurement(timed(experiment.execute), total_rows)
+
+        makedirs(ground_truth_folder)
+        seconds = sum(
+            timed(process_file, raw_folder, ground_truth_folder, filepath)
+            for filepath in sorted(glob(join(raw_folder, "*.xz"))))
+        for strategy in strategies:
+            makedirs(join(features_folder, strategy))
+            seconds += sum(
+                timed(process_file, join(padding_folder, strategy), join(features_folder, strategy), filepath)
+                for filepath in sorted(glob(join(padding_folder, strategy, "*.xz"))))
+        results[f"macro/features/{number_rows}_rows"] = Measurement(seconds, total_rows * (len(strategies) + 1))
+
+        # The evaluation writes its results to the working folder.
+        current_folder = os.getcwd()
+        os.chdir(folder)
+        try:
+            seconds = 0.0
+            for strategy in strategies:
+                evaluation = Experiment(strategy, ground_truth_folder, features_folder, model_cache_folder=None)
+                evaluation.filenames = [f"{day}.csv" for day in days]
+                seconds += timed(evaluation.run, ATTACKER.EXTERNAL.value, workers)
+            results[f"macro/evaluation/{number_rows}_rows"] = Measurement(seconds, total_rows * len(strategies))
+        finally:
+            os.chdir(current_folder)
+    return results
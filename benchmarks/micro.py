@@ -0,0 +1,49 @@
+"""
+Micro benchmarks of the padding strategies: pad on single lengths and pad_many on batches, for every strategy of
+strategies_mapping_factory and every length distribution.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from adaptive_padding.padding.nearest.external_integration import PythonExternalIntegration
+from adaptive_padding.padding.nearest.nearest_padding import NearestPadding
+from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.padding.strategies_mapping_factory import create_existing_strategies_mapping, \
+    create_proposal_strategies_mapping
+from adaptive_padding.utils.histogram import LengthHistogram
+from adaptive_padding.utils.synthetic import DISTRIBUTIONS, sample_lengths
+from benchmarks.timing import Measurement, measure
+
+
+def create_strategies(lengths: np.ndarray) -> Dict[str, PaddingStrategy]:
+    """
+    Creates every strategy of the experiments. The nearest padding lengths are solved for the distribution benchmarked,
+    as build_histograms.py would for a capture.
+    """
+    strategies = {**create_existing_strategies_mapping(seed=0), **create_proposal_strategies_mapping(seed=0)}
+    strategies["near"] = NearestPadding(PythonExternalIntegration(LengthHistogram.from_lengths(lengths), 10))
+    return strategies
+
+
+def pad_each(strategy: PaddingStrategy, lengths: List[int]) -> None:
+    for length in lengths:
+        strategy.pad(length)
+
+
+def run_micro(
+        number_lengths: int = 1_000_000,
+        number_calls: int = 10_000,
+        distributions: List[str] = None,
+        repeat: int = 3) -> Dict[str, Measurement]:
+    results = {}
+    for distribution in distributions or list(DISTRIBUTIONS):
+        lengths = sample_lengths(distribution, number_lengths)
+        single_lengths = lengths[:number_calls].tolist()
+        for name, strategy in create_strategies(lengths).items():
+            strategy.pad_many(lengths[:1])
+            results[f"micro/pad/{name}/{distribution}"] = measure(
+                lambda: pad_each(strategy, single_lengths), len(single_lengths), repeat)
+            results[f"micro/pad_many/{name}/{distribution}"] = measure(
+                lambda: strategy.pad_many(lengths), len(lengths), repeat)
+    return results
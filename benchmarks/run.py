@@ -0,0 +1,48 @@
+"""
+Runs the benchmark suites and saves the timings as a baseline, or compares them with a previous baseline.
+
+Examples:
+python -m benchmarks.run --output baseline.json
+python -m benchmarks.run --compare baseline.json --tolerance 0.2
+"""
+from typing import List, Optional
+
+import typer
+
+from benchmarks.macro import run_macro
+from benchmarks.micro import run_micro
+from benchmarks.solver import run_solver
+from benchmarks.timing import save_results, load_results, compare_results
+
+SUITES: List[str] = ["micro", "solver", "macro"]
+
+
+def main(
+        suite: List[str] = typer.Option(SUITES, help="Suites to run: micro, solver and/or macro."),
+        rows: int = typer.Option(100_000, help="Packets per synthetic capture in the macro suite (1e5 to 1e8)."),
+        workers: int = 1,
+        repeat: int = 3,
+        output: str = "benchmark_results.json",
+        compare: Optional[str] = typer.Option(None, help="Baseline to compare the results with."),
+        tolerance: float = 0.2):
+    results = {}
+    if "micro" in suite:
+        results.update(run_micro(repeat=repeat))
+    if "solver" in suite:
+        results.update(run_solver(repeat=repeat))
+    if "macro" in suite:
+        results.update(run_macro(rows, workers=workers))
+    save_results(output, results)
+    print(f"Saved {len(results)} benchmarks to {output}.")
+    if compare is None:
+        return
+    comparison = compare_results(load_results(compare), results, tolerance)
+    print(comparison.to_string(index=False))
+    regressions = comparison[comparison["regression"]]
+    if not regressions.empty:
+        print(f"{len(regressions)} benchmarks are more than {tolerance:.0%} slower than the baseline.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,32 @@
+"""
+Benchmarks of the nearest padding solver (the NumPy port of OptimalPadding.jl) across histogram sizes (number of
+distinct lengths) and numbers of buckets.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from adaptive_padding.padding.nearest.optimal_padding import optimal_padding_sweep
+from adaptive_padding.utils.synthetic import MINIMUM_LENGTH, MTU
+from benchmarks.timing import Measurement, measure
+
+
+def create_histogram(number_lengths: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    lengths = np.sort(rng.choice(np.arange(MINIMUM_LENGTH, MTU), size=number_lengths, replace=False))
+    return lengths, rng.integers(1, 100_000, size=number_lengths)
+
+
+def run_solver(
+        numbers_lengths: List[int] = (100, 500, 1458),
+        numbers_buckets: List[int] = (5, 10, 50),
+        repeat: int = 3) -> Dict[str, Measurement]:
+    results = {}
+    for number_lengths in numbers_lengths:
+        lengths, frequencies = create_histogram(number_lengths)
+        for number_buckets in numbers_buckets:
+            results[f"solver/optimal_padding/{number_lengths}_lengths/{number_buckets}_buckets"] = measure(
+                lambda: optimal_padding_sweep(lengths, frequencies, [number_buckets]), number_lengths, repeat)
+        results[f"solver/optimal_padding_sweep/{number_lengths}_lengths/{len(numbers_buckets)}_sizes"] = measure(
+            lambda: optimal_padding_sweep(lengths, frequencies, numbers_buckets), number_lengths, repeat)
+    return results
@@ -0,0 +1,84 @@
+"""
+Timing helpers and the baseline format of the benchmarks. A run is stored as JSON:
+{"metadata": {...}, "results": {"<suite>/<benchmark>/<case>": {"seconds": ..., "rows": ..., "rows_per_second": ...}}}.
+"""
+import json
+import platform
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    rows: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+
+def measure(function: Callable[[], Any], rows: int, repeat: int = 3) -> Measurement:
+    """
+    Runs the function repeat times and keeps the fastest run, which is the least disturbed by other processes.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return Measurement(min(timings), rows)
+
+
+def metadata() -> Dict[str, str]:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__}
+
+
+def save_results(filepath: str, results: Dict[str, Measurement]) -> None:
+    with open(filepath, mode="w") as file_writer:
+        json.dump(
+            {"metadata": metadata(), "results": {name: result.to_dict() for name, result in sorted(results.items())}},
+            file_writer,
+            indent=1)
+
+
+def load_results(filepath: str) -> Dict[str, Measurement]:
+    with open(filepath, mode="r") as file_reader:
+        results = json.load(file_reader)["results"]
+    return {name: Measurement(result["seconds"], result["rows"]) for name, result in results.items()}
+
+
+def compare_results(
+        baseline: Dict[str, Measurement],
+        current: Dict[str, Measurement],
+        tolerance: float = 0.2) -> pd.DataFrame:
+    """
+    Compares the benchmarks present in both runs. A benchmark regressed when it is more than tolerance (e.g. 0.2 for
+    20%) slower than in the baseline.
+    """
+    rows: List[Dict[str, Any]] = []
+    for name in sorted(set(baseline) & set(current)):
+        ratio = current[name].seconds / baseline[name].seconds if baseline[name].seconds > 0 else float("inf")
+        rows.append({
+            "benchmark": name,
+            "baseline_seconds": baseline[name].seconds,
+            "current_seconds": current[name].seconds,
+            "ratio": ratio,
+            "regression": ratio > 1 + tolerance})
+    return pd.DataFrame(rows, columns=["benchmark", "baseline_seconds", "current_seconds", "ratio", "regression"])
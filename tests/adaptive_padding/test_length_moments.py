@@ -0,0 +1,26 @@
+import numpy as np
+from pytest import mark, approx
+
+from adaptive_padding.padding.adaptive_padding.level100 import Level100
+from adaptive_padding.padding.adaptive_padding.level500 import Level500
+from adaptive_padding.padding.adaptive_padding.level700 import Level700
+from adaptive_padding.padding.adaptive_padding.level900 import Level900
+from adaptive_padding.padding.overhead import estimate_overhead
+from adaptive_padding.utils.histogram import LengthHistogram
+
+
+@mark.parametrize("strategy_class", [Level100, Level500, Level700, Level900])
+def test_length_moments_when_outside_random_bands_then_equal_to_pad_many(strategy_class):
+    lengths = np.concatenate([np.arange(1, 300), np.arange(1400, 1520)])
+    means, variances = strategy_class().length_moments(lengths)
+    assert means.tolist() == strategy_class().pad_many(lengths).tolist()
+    assert not variances.any()
+
+
+@mark.parametrize("strategy_class", [Level100, Level500, Level700, Level900])
+def test_estimate_overhead_when_random_bands_then_close_to_padded_bytes(strategy_class):
+    lengths = np.random.default_rng(0).integers(42, 1515, size=200_000)
+    estimate = estimate_overhead(LengthHistogram.from_lengths(lengths), strategy_class())
+    padded_bytes = strategy_class(seed=11).pad_many(lengths).sum()
+    assert abs(padded_bytes - estimate.expected_bytes) < 5 * np.sqrt(estimate.variance)
+    assert estimate.expected_bytes == approx(padded_bytes, rel=1e-3)
@@ -0,0 +1,25 @@
+import numpy as np
+from pytest import mark
+
+from adaptive_padding.padding.adaptive_padding.level100 import Level100
+from adaptive_padding.padding.adaptive_padding.level500 import Level500
+from adaptive_padding.padding.adaptive_padding.level700 import Level700
+from adaptive_padding.padding.adaptive_padding.level900 import Level900
+
+
+@mark.parametrize("strategy_class", [Level100, Level500, Level700, Level900])
+def test_pad_many_equal_to_pad_with_same_seed(strategy_class):
+    lengths = np.concatenate([np.arange(1, 1520), np.random.default_rng(0).integers(42, 1515, size=5000)])
+    scalar_strategy = strategy_class(seed=42)
+    expected = [scalar_strategy.pad(int(length)) for length in lengths]
+    actual = strategy_class(seed=42).pad_many(lengths)
+    assert expected == actual.tolist()
+
+
+@mark.parametrize("strategy_class", [Level100, Level500, Level700, Level900])
+def test_pad_many_when_split_in_batches_then_equal_to_single_batch(strategy_class):
+    lengths = np.random.default_rng(1).integers(42, 1515, size=3000)
+    expected = strategy_class(seed=3).pad_many(lengths)
+    strategy = strategy_class(seed=3)
+    actual = np.concatenate([strategy.pad_many(batch) for batch in np.array_split(lengths, 7)])
+    assert expected.tolist() == actual.tolist()
@@ -0,0 +1,20 @@
+from benchmarks.micro import run_micro
+from benchmarks.timing import Measurement, compare_results, save_results, load_results
+
+
+def test_compare_results_when_slower_than_tolerance_then_regression(tmp_path):
+    save_results(
+        str(tmp_path / "baseline.json"),
+        {"micro/pad/mtu/iot": Measurement(1.0, 100), "solver/a": Measurement(2.0, 1)})
+    baseline = load_results(str(tmp_path / "baseline.json"))
+    current = {"micro/pad/mtu/iot": Measurement(1.3, 100), "solver/a": Measurement(2.1, 1), "macro/new": Measurement(1, 1)}
+    comparison = compare_results(baseline, current, tolerance=0.2)
+    assert comparison["benchmark"].tolist() == ["micro/pad/mtu/iot", "solver/a"]
+    assert comparison["regression"].tolist() == [True, False]
+
+
+def test_run_micro_when_small_sizes_then_every_strategy_and_api_timed():
+    results = run_micro(number_lengths=1_000, number_calls=10, distributions=["bimodal"], repeat=1)
+    assert "micro/pad_many/near/bimodal" in results and "micro/pad/level900/bimodal" in results
+    assert len(results) == 2 * 11
+    assert all(result.seconds >= 0 for result in results.values())
@@ -0,0 +1,21 @@
+import io
+import tarfile
+from os.path import basename
+from typing import List
+
+HEADER = '"No.","Time","Source","Destination","Protocol","Length","src_mac","Info"\n'
+
+
+def write_capture(filepath: str, lines: List[str]) -> None:
+    """
+    Writes a capture the way the UNSW days are distributed: a CSV file inside an xz-compressed tar archive.
+    """
+    data = "".join([HEADER] + lines).encode("ISO-8859-1")
+    tar_info = tarfile.TarInfo(basename(filepath).replace(".tar.xz", ""))
+    tar_info.size = len(data)
+    with tarfile.open(filepath, mode="w:xz") as tar_file:
+        tar_file.addfile(tar_info, io.BytesIO(data))
+
+
+def capture_line(number: int, time: int, length, src_mac: str) -> str:
+    return f'"{number}","{time}","192.168.1.10","10.0.0.1","TCP","{length}","{src_mac}","Seq=1"\n'
@@ -1,3 +1,5 @@
+import numpy as np
+
 from adaptive_padding.padding.existing.mtu import Mtu
 from adaptive_padding.padding.existing.exponential_padding import ExponentialPadding
 
@@ -13,3 +15,8 @@ def mtu_padding():
 @fixture(scope="function")
 def exponential_padding():
     return ExponentialPadding()
+
+
+@fixture(scope="module")
+def packet_lengths():
+    return np.concatenate([np.arange(1, 1520), np.random.default_rng(0).integers(42, 1515, size=5000)])
@@ -0,0 +1,49 @@
+import numpy as np
+from pytest import mark, approx, raises
+
+from adaptive_padding.padding.existing.exponential_padding import ExponentialPadding
+from adaptive_padding.padding.existing.linear import LinearPadding
+from adaptive_padding.padding.existing.mouse_elephant import MouseElephant
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.padding.existing.random import RandomPadding
+from adaptive_padding.padding.existing.random_255 import Random255
+from adaptive_padding.padding.overhead import estimate_overhead, estimate_overheads
+from adaptive_padding.padding.padding_strategy import PaddingStrategy
+from adaptive_padding.utils.histogram import LengthHistogram
+
+
+@mark.parametrize("strategy_class", [ExponentialPadding, LinearPadding, MouseElephant, Mtu])
+def test_estimate_overhead_when_deterministic_then_exact(strategy_class, packet_lengths):
+    estimate = estimate_overhead(LengthHistogram.from_lengths(packet_lengths), strategy_class())
+    assert estimate.exact
+    assert estimate.expected_bytes == strategy_class().pad_many(packet_lengths).sum()
+    assert estimate.original_bytes == packet_lengths.sum()
+
+
+@mark.parametrize("strategy_class", [RandomPadding, Random255])
+def test_length_moments_when_random_then_equal_to_sample_moments(strategy_class):
+    lengths = np.repeat([60, 1300, 1400, 1499, 1500, 1514], 100_000)
+    padded_lengths = strategy_class(seed=5).pad_many(lengths).reshape(6, -1)
+    means, variances = strategy_class().length_moments(np.array([60, 1300, 1400, 1499, 1500, 1514]))
+    assert means == approx(padded_lengths.mean(axis=1), rel=1e-3)
+    assert variances == approx(padded_lengths.var(axis=1), rel=2e-2, abs=1e-9)
+
+
+def test_estimate_overheads_when_histograms_per_device_then_one_row_per_strategy_and_device():
+    histograms = {"device": LengthHistogram.from_lengths([100, 100, 1500]), "other": LengthHistogram.from_lengths([750])}
+    estimates = estimate_overheads(histograms, {"mtu": Mtu(), "random": RandomPadding()})
+    assert estimates[["strategy", "key"]].values.tolist() == [
+        ["mtu", "device"], ["mtu", "other"], ["random", "device"], ["random", "other"]]
+    assert estimates["overhead"].tolist()[:2] == approx([4500 / 1700, 2])
+    assert estimates["exact"].tolist() == [True, True, False, False]
+    assert estimates["overhead"].tolist()[3] == approx((750 + 375.5) / 750)
+
+
+class Truncation(PaddingStrategy):
+    def pad(self, length: int) -> int:
+        return length
+
+
+def test_estimate_overhead_when_strategy_without_moments_then_type_error():
+    with raises(TypeError):
+        estimate_overhead(LengthHistogram.from_lengths([100]), Truncation())
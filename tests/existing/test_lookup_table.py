@@ -0,0 +1,39 @@
+from os import listdir
+
+from pytest import mark
+
+from adaptive_padding.padding.existing.linear import LinearPadding
+from adaptive_padding.padding.existing.mouse_elephant import MouseElephant
+from adaptive_padding.padding.existing.mtu import Mtu
+
+
+@mark.parametrize("length, expected", [(60, 128), (128, 256), (1300, 1408), (1408, 1408), (1409, 1500)])
+def test_linear_strategy(length, expected):
+    actual: int = LinearPadding().pad(length)
+    assert expected == actual
+
+
+@mark.parametrize("length, expected", [(60, 100), (99, 100), (100, 1500), (1499, 1500)])
+def test_mouse_elephant_strategy(length, expected):
+    actual: int = MouseElephant().pad(length)
+    assert expected == actual
+
+
+def test_compile_table_when_saved_then_reused(tmp_path, monkeypatch):
+    expected = LinearPadding(threshold=64).compile_table(str(tmp_path))
+    monkeypatch.setattr(LinearPadding, "build_table", lambda *_: None)
+    actual = LinearPadding(threshold=64).compile_table(str(tmp_path))
+    assert expected.tolist() == actual.tolist()
+
+
+def test_compile_table_when_parameters_differ_then_saved_separately(tmp_path):
+    Mtu().compile_table(str(tmp_path))
+    Mtu(mtu_number_bytes=1400).compile_table(str(tmp_path))
+    assert len(listdir(tmp_path)) == 2
+
+
+def test_compile_table_when_code_changes_then_rebuilt(tmp_path, monkeypatch):
+    Mtu().compile_table(str(tmp_path))
+    monkeypatch.setattr("adaptive_padding.padding.padding_strategy.code_version", lambda *_: "changed")
+    Mtu().compile_table(str(tmp_path))
+    assert len(listdir(tmp_path)) == 2
@@ -0,0 +1,31 @@
+import numpy as np
+from pytest import mark
+
+from adaptive_padding.padding.existing.exponential_padding import ExponentialPadding
+from adaptive_padding.padding.existing.linear import LinearPadding
+from adaptive_padding.padding.existing.mouse_elephant import MouseElephant
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.padding.existing.random import RandomPadding
+from adaptive_padding.padding.existing.random_255 import Random255
+
+
+@mark.parametrize("strategy_class", [ExponentialPadding, LinearPadding, MouseElephant, Mtu])
+def test_pad_many_when_deterministic_then_equal_to_pad(strategy_class, packet_lengths):
+    expected = [strategy_class().pad(int(length)) for length in packet_lengths]
+    actual = strategy_class().pad_many(packet_lengths)
+    assert expected == actual.tolist()
+
+
+@mark.parametrize("strategy_class", [RandomPadding, Random255])
+def test_pad_many_when_random_then_equal_to_pad_with_same_seed(strategy_class, packet_lengths):
+    scalar_strategy = strategy_class(seed=7)
+    expected = [scalar_strategy.pad(int(length)) for length in packet_lengths]
+    actual = strategy_class(seed=7).pad_many(packet_lengths)
+    assert expected == actual.tolist()
+
+
+@mark.parametrize("strategy_class", [ExponentialPadding, LinearPadding, MouseElephant, Mtu, RandomPadding, Random255])
+def test_pad_many_when_greater_than_or_equal_to_1500_return_same_length(strategy_class):
+    lengths = np.array([1500, 1501, 1514])
+    actual = strategy_class().pad_many(lengths)
+    assert lengths.tolist() == actual.tolist()
@@ -0,0 +1,22 @@
+from lzma import open as lzma_open
+from os.path import join
+
+from pytest import fixture
+
+CAPTURE_LINES = [
+    '"No.","Time","Source","Destination","Protocol","Length","src_mac","Info"\n',
+    '"1","0","192.168.1.10","10.0.0.1","TCP","60","d0:52:a8:00:67:5e","Seq=1, Ack=60"\n',
+    '"2","0","192.168.1.11","10.0.0.1","TCP","None","44:65:0d:56:cc:d3","60"\n',
+    '"3","1","192.168.1.10","10.0.0.1","UDP","342","d0:52:a8:00:67:5e","Len=300"\n',
+    '"4","1","192.168.1.12","10.0.0.1","TCP","1514","70:ee:50:18:34:43","Seq=60"\n',
+    '"5","2","192.168.1.10","10.0.0.1","TCP","900","d0:52:a8:00:67:5e","Seq=900"\n']
+
+
+@fixture(scope="function")
+def capture_folder(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    for day in ["16-09-23", "16-09-24"]:
+        with lzma_open(join(raw_folder, f"{day}.csv.tar.xz"), mode="wt", encoding="ISO-8859-1") as file_writer:
+            file_writer.writelines(CAPTURE_LINES)
+    return str(raw_folder)
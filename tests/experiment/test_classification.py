@@ -0,0 +1,135 @@
+import json
+
+import numpy as np
+import pytest
+import pandas as pd
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from adaptive_padding.constants import ATTACKER
+from adaptive_padding.experiment.classification import ClassificationTask, FeatureMatrix, ModelCache, run_tasks, \
+    create_classifiers
+from adaptive_padding.experiment.results import RESULTS_FILENAME, load_results
+from adaptive_padding.padding_strategies_evaluation import Experiment
+
+
+def create_features(rng, number_samples=60):
+    labels = np.arange(number_samples) % 2
+    return pd.DataFrame({
+        "avg": rng.normal(100 + 400 * labels, 30),
+        "std": rng.normal(20 + 10 * labels, 5),
+        "total": rng.integers(100, 5000, size=number_samples),
+        "label": labels})
+
+
+def test_run_tasks_when_parallel_then_same_results_in_same_order(tmp_path):
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(80, 3)), np.arange(80) % 3
+    matrix = FeatureMatrix.create(str(tmp_path), "mtu-16-09-23", X, y)
+    tasks = [
+        ClassificationTask(
+            "mtu", f"16-09-{day}.csv", fold, str(estimator), estimator, matrix, matrix, np.arange(60), np.arange(60, 80))
+        for day in [23, 24] for fold in range(2)
+        for estimator in [DecisionTreeClassifier(random_state=0), KNeighborsClassifier(n_neighbors=3)]]
+    sequential = list(run_tasks(tasks, workers=1))
+    parallel = list(run_tasks(tasks, workers=2))
+    assert sequential == parallel
+    assert [(result.filename, result.fold, result.classifier) for result in parallel] == \
+        [(task.filename, task.fold, task.classifier) for task in tasks]
+    assert not hasattr(tasks[0].estimator, "classes_")
+
+
+def test_experiment_when_cross_validation_then_one_result_per_day_fold_and_classifier(tmp_path, monkeypatch):
+    rng = np.random.default_rng(1)
+    (tmp_path / "padding" / "mtu").mkdir(parents=True)
+    for filename in ["16-09-23.csv", "16-09-24.csv"]:
+        features_filepath = tmp_path / "padding" / "mtu" / f"{filename.replace('.csv', '.xz')}_features.csv"
+        create_features(rng).to_csv(features_filepath, index=False)
+    monkeypatch.chdir(tmp_path)
+    experiment = Experiment("mtu", str(tmp_path / "ground_truth"), str(tmp_path / "padding"))
+    experiment.filenames = ["16-09-23.csv", "16-09-24.csv"]
+    experiment.run_cross_validation(workers=2)
+    with open(tmp_path / "mtu_cross_validation.json") as file_reader:
+        performance = json.load(file_reader)
+    assert [classifier["name"] for classifier in performance] == list(create_classifiers())
+    assert all(len(values[0]) == 2 * 10 for values in experiment.performance.values())
+    assert experiment.number_tasks(ATTACKER.INTERNAL.value) == 2 * 10 * 4
+    results = load_results(str(tmp_path / RESULTS_FILENAME))
+    assert len(results) == 2 * 10 * 4 and (results["fit_time"] > 0).all()
+
+
+def test_feature_matrix_when_created_then_mapped_read_only_and_not_rewritten(tmp_path):
+    X, y = np.arange(12, dtype=np.float64).reshape(4, 3), np.array([0, 1, 0, 1])
+    matrix = FeatureMatrix.create(str(tmp_path), "ground_truth-16-09-23", X, y)
+    again = FeatureMatrix.create(str(tmp_path), "ground_truth-16-09-23", X + 1, y)
+    assert isinstance(matrix.X, np.memmap) and not matrix.X.flags.writeable
+    assert np.array_equal(again.X, X)
+    X_selected, y_selected = matrix.select(np.array([1, 3]))
+    assert np.array_equal(X_selected, X[[1, 3]]) and np.array_equal(y_selected, [1, 1])
+
+
+def test_experiment_when_train_test_split_then_ground_truth_models_reused_across_strategies(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    (tmp_path / "ground_truth").mkdir()
+    create_features(rng).to_csv(tmp_path / "ground_truth" / "16-09-23.csv.tar.xz_features.csv", index=False)
+    for strategy in ["mtu", "linear"]:
+        (tmp_path / "padding" / strategy).mkdir(parents=True)
+        create_features(rng).to_csv(tmp_path / "padding" / strategy / "16-09-23.xz_features.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    fits = []
+    original_store = ModelCache.store
+    monkeypatch.setattr(ModelCache, "store", lambda self, key, model: fits.append(key) or original_store(self, key, model))
+    for strategy in ["mtu", "linear"]:
+        experiment = Experiment(strategy, str(tmp_path / "ground_truth"), str(tmp_path / "padding"))
+        experiment.filenames = ["16-09-23.csv"]
+        experiment.run_train_test_split()
+    assert len(fits) == len(set(fits)) == len(create_classifiers())
+    assert len(list((tmp_path / "Data" / "Processed" / "ground_truth_models").iterdir())) == len(create_classifiers())
+    with open(tmp_path / "linear_train_test_split.json") as file_reader:
+        assert len(json.load(file_reader)) == len(create_classifiers())
+
+
+def test_experiment_when_window_configured_then_features_of_that_window_loaded(tmp_path):
+    rng = np.random.default_rng(3)
+    (tmp_path / "padding" / "mtu").mkdir(parents=True)
+    windowed = pd.concat([create_features(rng).assign(window=window, count=2) for window in [1.0, 5.0]])
+    windowed.to_csv(tmp_path / "padding" / "mtu" / "16-09-23.xz_windowed_features.csv", index=False)
+    experiment = Experiment("mtu", str(tmp_path / "ground_truth"), str(tmp_path / "padding"), window=5)
+    features = experiment.load_padding_features("16-09-23.csv")
+    expected = windowed[windowed["window"] == 5.0][["avg", "std", "total", "label"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(features, expected)
+
+
+def test_experiment_when_windowed_features_without_window_then_error(tmp_path):
+    with pytest.raises(ValueError):
+        Experiment("mtu", str(tmp_path / "ground_truth"), str(tmp_path / "padding"), features=["avg", "q50"])
+
+
+def test_experiment_when_features_configured_then_only_those_loaded(tmp_path):
+    rng = np.random.default_rng(4)
+    (tmp_path / "padding" / "mtu").mkdir(parents=True)
+    windowed = create_features(rng).assign(window=1.0, count=2, q50=100.0)
+    windowed.to_csv(tmp_path / "padding" / "mtu" / "16-09-23.xz_windowed_features.csv", index=False)
+    experiment = Experiment("mtu", str(tmp_path / "ground_truth"), str(tmp_path / "padding"), window=1, features=["q50", "count"])
+    features = experiment.load_padding_features("16-09-23.csv")
+    assert features.columns.tolist() == ["q50", "count", "label"]
+
+
+def test_experiment_when_train_test_split_then_ground_truth_features_loaded_once_per_day(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    (tmp_path / "ground_truth").mkdir()
+    (tmp_path / "padding" / "mtu").mkdir(parents=True)
+    for filename in ["16-09-23.csv", "16-09-24.csv"]:
+        create_features(rng).to_csv(tmp_path / "ground_truth" / f"{filename}.tar.xz_features.csv", index=False)
+        create_features(rng).to_csv(tmp_path / "padding" / "mtu" / f"{filename.replace('.csv', '.xz')}_features.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    loaded = []
+    original_load = Experiment.load_ground_truth_features
+    monkeypatch.setattr(
+        Experiment,
+        "load_ground_truth_features",
+        lambda self, filename: loaded.append(filename) or original_load(self, filename))
+    experiment = Experiment("mtu", str(tmp_path / "ground_truth"), str(tmp_path / "padding"))
+    experiment.filenames = ["16-09-23.csv", "16-09-24.csv"]
+    experiment.run_train_test_split()
+    assert sorted(loaded) == ["16-09-23.csv", "16-09-24.csv"]
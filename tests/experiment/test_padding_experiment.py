@@ -0,0 +1,124 @@
+from lzma import open as lzma_open
+from os.path import join
+
+import numpy as np
+
+from adaptive_padding.constants import STORAGE
+from adaptive_padding.experiment.evaluation import PaddingExperiment
+from adaptive_padding.padding.adaptive_padding.level100 import Level100
+from adaptive_padding.padding.adaptive_padding.level900 import Level900
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.padding.existing.random import RandomPadding
+from adaptive_padding.utils.capture import load_devices, encode_devices, load_capture
+from adaptive_padding.utils.manifest import Manifest
+from adaptive_padding.utils.storage import packet_store
+from tests.capture import write_capture, capture_line
+from tests.experiment.conftest import CAPTURE_LINES
+
+
+def read_capture(filepath):
+    with lzma_open(filepath, mode="rt", encoding="ISO-8859-1") as file_reader:
+        return file_reader.readlines()
+
+
+def test_padding_experiment_rewrites_only_length_column(capture_folder, tmp_path):
+    output_folder = str(tmp_path / "padding_data")
+    PaddingExperiment(capture_folder, output_folder, 5, {"mtu": Mtu()}).execute()
+    lines = read_capture(join(output_folder, "mtu", "16-09-23.xz"))
+    assert lines[0] == CAPTURE_LINES[0]
+    assert lines[1] == '"1","0","192.168.1.10","10.0.0.1","TCP","1500","d0:52:a8:00:67:5e","Seq=1, Ack=60"\n'
+    assert lines[2] == CAPTURE_LINES[2]
+    assert lines[4] == CAPTURE_LINES[4]
+
+
+def test_padding_experiment_when_chunked_then_equal_to_single_chunk(capture_folder, tmp_path):
+    PaddingExperiment(capture_folder, str(tmp_path / "single"), 5, {"level900": Level900(seed=1)}).execute()
+    PaddingExperiment(capture_folder, str(tmp_path / "chunked"), 5, {"level900": Level900(seed=1)}, chunk_size=2).execute()
+    expected = read_capture(join(tmp_path, "single", "level900", "16-09-23.xz"))
+    actual = read_capture(join(tmp_path, "chunked", "level900", "16-09-23.xz"))
+    assert expected == actual
+
+
+def test_padding_experiment_when_single_pass_then_equal_to_one_pass_per_strategy(capture_folder, tmp_path):
+    def create_strategies():
+        return {"mtu": Mtu(), "level900": Level900(seed=5)}
+    PaddingExperiment(capture_folder, str(tmp_path / "per_strategy"), 5, create_strategies()).execute()
+    PaddingExperiment(capture_folder, str(tmp_path / "single_pass"), 5, create_strategies(), single_pass=True).execute()
+    for strategy_name in ["mtu", "level900"]:
+        for filename in ["16-09-23.xz", "16-09-24.xz"]:
+            expected = read_capture(join(tmp_path, "per_strategy", strategy_name, filename))
+            actual = read_capture(join(tmp_path, "single_pass", strategy_name, filename))
+            assert expected == actual
+
+
+def test_padding_experiment_when_seeded_then_output_does_not_depend_on_number_of_workers(capture_folder, tmp_path):
+    def create_strategies():
+        return {"random": RandomPadding(), "level100": Level100()}
+    PaddingExperiment(capture_folder, str(tmp_path / "sequential"), 5, create_strategies(), seed=42).execute()
+    PaddingExperiment(capture_folder, str(tmp_path / "parallel"), 5, create_strategies(), workers=2, seed=42).execute()
+    for strategy_name in ["random", "level100"]:
+        for filename in ["16-09-23.xz", "16-09-24.xz"]:
+            expected = read_capture(join(tmp_path, "sequential", strategy_name, filename))
+            actual = read_capture(join(tmp_path, "parallel", strategy_name, filename))
+            assert expected == actual
+
+
+def test_padding_experiment_when_parquet_then_same_lengths_as_csv(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    devices = load_devices()
+    rng = np.random.default_rng(0)
+    lines = []
+    for number in range(1, 200):
+        length = "None" if number % 13 == 0 else int(rng.integers(42, 1515))
+        src_mac = devices[number % 4] if number % 5 else "aa:bb:cc:dd:ee:ff"
+        lines.append(capture_line(number, number // 10, length, src_mac))
+    write_capture(str(raw_folder / "16-09-23.csv.tar.xz"), lines)
+    for storage in [STORAGE.CSV.value, STORAGE.PARQUET.value]:
+        strategies = {"random": RandomPadding()}
+        PaddingExperiment(
+            str(raw_folder), str(tmp_path / storage), 5, strategies, chunk_size=50, seed=7, storage=storage).execute()
+    expected = load_capture(str(tmp_path / "csv" / "random" / "16-09-23.xz")).dropna(subset=["Length"])
+    labels, is_iot_device = encode_devices(expected["src_mac"], devices)
+    expected = expected.loc[is_iot_device].assign(device=labels[is_iot_device])
+    actual = packet_store(str(tmp_path / "parquet")).read(strategy="random", day="16-09-23")
+    assert str(actual["Length"].dtype) == "uint16"
+    for device in range(4):
+        for column in ["Time", "Length"]:
+            expected_values = expected.loc[expected["device"] == device, column].tolist()
+            assert actual.loc[actual["device"] == device, column].tolist() == expected_values
+
+
+def test_padding_experiment_when_rerun_then_only_new_or_changed_pairs_are_padded(capture_folder, tmp_path):
+    output_folder = str(tmp_path / "padding_data")
+
+    def pending_jobs(strategies):
+        experiment = PaddingExperiment(capture_folder, output_folder, 5, strategies, seed=42)
+        manifest = Manifest(output_folder)
+        jobs = experiment.create_jobs(manifest, experiment.create_fingerprints(manifest))
+        return [(job.filename, job.strategy_names) for job in jobs]
+
+    PaddingExperiment(capture_folder, output_folder, 5, {"mtu": Mtu(), "level100": Level100()}, seed=42).execute()
+    assert pending_jobs({"mtu": Mtu(), "level100": Level100()}) == []
+    with lzma_open(join(capture_folder, "16-09-25.csv.tar.xz"), mode="wt", encoding="ISO-8859-1") as file_writer:
+        file_writer.writelines(CAPTURE_LINES)
+    assert pending_jobs({"mtu": Mtu(), "level100": Level100(), "random": RandomPadding()}) == [
+        ("16-09-23.csv.tar.xz", ("random",)),
+        ("16-09-24.csv.tar.xz", ("random",)),
+        ("16-09-25.csv.tar.xz", ("mtu",)),
+        ("16-09-25.csv.tar.xz", ("level100",)),
+        ("16-09-25.csv.tar.xz", ("random",))]
+    assert pending_jobs({"mtu": Mtu(mtu_number_bytes=1400)}) == [
+        ("16-09-23.csv.tar.xz", ("mtu",)),
+        ("16-09-24.csv.tar.xz", ("mtu",)),
+        ("16-09-25.csv.tar.xz", ("mtu",))]
+
+
+def test_padding_experiment_when_strategies_reused_then_fingerprints_unchanged(capture_folder, tmp_path):
+    output_folder = str(tmp_path / "padding_data")
+    strategies = {"level100": Level100(), "random": RandomPadding(seed=3)}
+    PaddingExperiment(capture_folder, output_folder, 5, strategies, seed=42).execute()
+    assert strategies["random"].parameters()["seed"] == 3 and strategies["level100"].parameters()["seed"] is None
+    experiment = PaddingExperiment(capture_folder, output_folder, 5, strategies, seed=42)
+    manifest = Manifest(output_folder)
+    assert experiment.create_jobs(manifest, experiment.create_fingerprints(manifest)) == []
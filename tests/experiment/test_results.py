@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from adaptive_padding.experiment.classification import ClassificationResult
+from adaptive_padding.experiment.results import ResultsSink, load_results, summarize_results
+
+
+def create_result(strategy, fold, classifier="SVC()", accuracy=0.5):
+    return ClassificationResult(strategy, "16-09-23.csv", fold, classifier, accuracy, accuracy, accuracy, 0.1, 0.01)
+
+
+def test_results_sink_when_flushed_in_batches_then_one_row_per_result(tmp_path):
+    filepath = str(tmp_path / "results.parquet")
+    with ResultsSink(filepath, batch_size=3) as sink:
+        for fold in range(7):
+            sink.append("internal", create_result("mtu", fold))
+    results = load_results(filepath)
+    assert results["fold"].tolist() == list(range(7))
+    assert set(results["day"]) == {"16-09-23"} and set(results["attacker"]) == {"internal"}
+
+
+def test_results_sink_when_strategy_evaluated_again_then_only_its_rows_replaced(tmp_path):
+    filepath = str(tmp_path / "results.parquet")
+    with ResultsSink(filepath) as sink:
+        sink.append("internal", create_result("mtu", 0, accuracy=0.1))
+        sink.append("internal", create_result("linear", 0, accuracy=0.2))
+        sink.append("external", create_result("mtu", -1, accuracy=0.3))
+    with ResultsSink(filepath) as sink:
+        sink.append("internal", create_result("mtu", 0, accuracy=0.9))
+    results = load_results(filepath).sort_values(["attacker", "strategy"])
+    assert list(zip(results["attacker"], results["strategy"], results["accuracy"])) == \
+        [("external", "mtu", 0.3), ("internal", "linear", 0.2), ("internal", "mtu", 0.9)]
+    assert load_results(filepath, attacker="external")["strategy"].tolist() == ["mtu"]
+
+
+def test_summarize_results_when_several_folds_then_average_min_and_max():
+    results = pd.DataFrame([vars(create_result("mtu", fold, accuracy=accuracy)) for fold, accuracy in enumerate([.2, .4])])
+    summary = summarize_results(results)
+    assert summary["mtu"] == [pytest.approx({
+        "name": "SVC()",
+        "Average accuracy": 0.3, "Min accuracy": 0.2, "Max accuracy": 0.4,
+        "Average recall": 0.3, "Min recall": 0.2, "Max recall": 0.4,
+        "Average f1_score": 0.3, "Min f1_score": 0.2, "Max f1_score": 0.4})]
+
+
+def test_results_sink_when_run_fails_then_previous_results_kept(tmp_path):
+    filepath = str(tmp_path / "results.parquet")
+    with ResultsSink(filepath) as sink:
+        sink.append("internal", create_result("mtu", 0, accuracy=0.1))
+    with pytest.raises(RuntimeError):
+        with ResultsSink(filepath, batch_size=1) as sink:
+            sink.append("internal", create_result("mtu", 0, accuracy=0.9))
+            sink.append("internal", create_result("linear", 0, accuracy=0.2))
+            raise RuntimeError("classifier failed")
+    results = load_results(filepath)
+    assert list(zip(results["strategy"], results["accuracy"])) == [("mtu", 0.1)]
+    assert [path.name for path in tmp_path.iterdir()] == ["results.parquet"]
@@ -0,0 +1,53 @@
+import pandas as pd
+from pytest import approx
+
+from adaptive_padding import compute_byte_overhead
+from adaptive_padding.compute_byte_overhead import process_raw_data, file_totals, compute_breakdown
+from adaptive_padding.compute_byte_overhead import compute_byte_overhead as overall_overhead
+from tests.capture import write_capture, capture_line
+
+FIRST_DEVICE = "d0:52:a8:00:67:5e"
+SECOND_DEVICE = "44:65:0d:56:cc:d3"
+
+
+def test_file_totals_when_read_in_chunks_then_bytes_per_device(tmp_path):
+    filepath = str(tmp_path / "16-09-23.csv.tar.xz")
+    write_capture(filepath, [
+        capture_line(1, 0, 60, FIRST_DEVICE),
+        capture_line(2, 0, 100, FIRST_DEVICE),
+        capture_line(3, 0, "None", FIRST_DEVICE),
+        capture_line(4, 1, 1500, SECOND_DEVICE),
+        capture_line(5, 1, 600, "aa:bb:cc:dd:ee:ff")])
+    totals = file_totals(filepath, chunksize=2)
+    assert totals.columns.tolist() == ["day", "device", "packets", "bytes"]
+    assert totals.set_index("device")["bytes"].to_dict() == {0: 160, 1: 1500}
+    assert totals["packets"].tolist() == [2, 1]
+    assert set(totals["day"]) == {"16-09-23"}
+
+
+def test_process_raw_data_when_unchanged_then_totals_loaded_from_cache(tmp_path, monkeypatch):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    for day, length in [("16-09-23", 100), ("16-09-24", 200)]:
+        write_capture(str(raw_folder / f"{day}.csv.tar.xz"), [
+            capture_line(1, 0, length, FIRST_DEVICE),
+            capture_line(2, 0, length, SECOND_DEVICE)])
+    output_folder = str(tmp_path / "totals")
+    first = process_raw_data(str(raw_folder), output_folder, workers=1)
+    calls = []
+    monkeypatch.setattr(compute_byte_overhead, "file_totals", lambda *args: calls.append(args))
+    second = process_raw_data(str(raw_folder), output_folder, workers=1)
+    assert calls == []
+    pd.testing.assert_frame_equal(first, second)
+    assert first["bytes"].tolist() == [100, 100, 200, 200]
+
+
+def test_compute_breakdown_when_device_missing_from_padded_traffic_then_overall_overhead_over_every_day():
+    raw_totals = pd.DataFrame({
+        "day": ["16-09-23", "16-09-23", "16-09-24"], "device": [0, 1, 0], "packets": [2, 1, 1], "bytes": [100, 50, 50]})
+    padding_totals = {"Linear": pd.DataFrame({
+        "day": ["16-09-23", "16-09-24"], "device": [0, 0], "packets": [2, 1], "bytes": [150, 100]})}
+    breakdown = compute_breakdown(raw_totals, padding_totals)
+    assert breakdown["padded_bytes"].tolist() == [150, 0, 100]
+    assert breakdown["overhead"].tolist() == approx([1.5, 0, 2])
+    assert overall_overhead(breakdown) == {"Linear": approx(250 / 200)}
@@ -0,0 +1,194 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from pytest import approx
+
+from adaptive_padding.constants import STORAGE
+from adaptive_padding.experiment.evaluation import PaddingExperiment
+from adaptive_padding.padding.existing.linear import LinearPadding
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.padding.existing.random import RandomPadding
+from adaptive_padding.prepare_features import Feature, process_file, process_partition, pad_and_iterate_over_files, \
+    iterate_over_partitions
+from adaptive_padding.utils.storage import feature_store
+from tests.capture import HEADER, write_capture, capture_line
+
+FIRST_DEVICE = "d0:52:a8:00:67:5e"
+SECOND_DEVICE = "44:65:0d:56:cc:d3"
+
+
+def test_process_file_when_grouped_per_second_then_statistics_per_device(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    features_folder = tmp_path / "Features"
+    raw_folder.mkdir()
+    features_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    write_capture(filepath, [
+        capture_line(1, 0, 60, FIRST_DEVICE),
+        capture_line(2, 0, 100, FIRST_DEVICE),
+        capture_line(3, 0, 1500, SECOND_DEVICE),
+        capture_line(4, 0, 70, SECOND_DEVICE),
+        capture_line(5, 1, 342, FIRST_DEVICE),
+        capture_line(6, 1, 342, FIRST_DEVICE),
+        capture_line(7, 1, 600, "aa:bb:cc:dd:ee:ff")])
+    process_file(str(raw_folder), str(features_folder), filepath)
+    features = pd.read_csv(features_folder / "16-09-23.csv.tar.xz_features.csv")
+    devices = Feature(str(raw_folder), str(features_folder)).devices
+    assert features.columns.tolist() == ["avg", "std", "total", "label"]
+    assert features["label"].tolist() == [devices[FIRST_DEVICE], devices[FIRST_DEVICE], devices[SECOND_DEVICE]]
+    assert features["avg"].tolist() == approx([80, 342, 785])
+    assert features["std"].tolist() == approx([28.2842712, 0, 1011.1626970])
+    assert features["total"].tolist() == [160, 684, 1570]
+
+
+def test_create_features_when_single_packet_then_row_dropped_by_process_file():
+    dataset = pd.DataFrame({"src_mac": [0, 0, 1], "Time": [0, 0, 0], "Length": [60, 80, 100]})
+    statistics = Feature("", "").group_samples_per_second(dataset)
+    features = Feature.create_features(statistics).dropna()
+    assert features["label"].tolist() == [0]
+    assert features["total"].tolist() == [140]
+
+
+def test_encode_labels_when_devices_loaded_from_file_then_labels_follow_file_order(tmp_path):
+    devices_filepath = tmp_path / "devices.json"
+    devices_filepath.write_text(json.dumps({"devices": [SECOND_DEVICE, FIRST_DEVICE]}))
+    feature = Feature("", "", str(devices_filepath))
+    dataset = pd.DataFrame({
+        "src_mac": [FIRST_DEVICE, "aa:bb:cc:dd:ee:ff", SECOND_DEVICE, FIRST_DEVICE, None],
+        "Time": [0, 0, 0, 1, 1],
+        "Length": [60, 70, 80, 90, 100]})
+    labels, is_iot_device = feature.encode_devices(dataset["src_mac"])
+    assert labels.tolist() == [1, -1, 0, 1, -1]
+    assert is_iot_device.tolist() == [True, False, True, True, False]
+    encoded = feature.encode_labels(dataset)
+    assert encoded["src_mac"].tolist() == [1, 0, 1]
+    assert encoded["Length"].tolist() == [60, 80, 90]
+
+
+def test_process_file_when_read_in_chunks_then_equal_to_single_chunk(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(0)
+    devices = [FIRST_DEVICE, SECOND_DEVICE, "aa:bb:cc:dd:ee:ff"]
+    lengths = ["None" if number % 17 == 0 else int(rng.integers(42, 1515)) for number in range(1, 400)]
+    write_capture(filepath, [
+        capture_line(number, number // 20, length, devices[number % 3])
+        for number, length in enumerate(lengths, start=1)])
+    for folder, chunksize in [("single", 1_000), ("chunks", 7)]:
+        (tmp_path / folder).mkdir()
+        process_file(str(raw_folder), str(tmp_path / folder), filepath, chunksize=chunksize)
+    single = pd.read_csv(tmp_path / "single" / "16-09-23.csv.tar.xz_features.csv")
+    chunks = pd.read_csv(tmp_path / "chunks" / "16-09-23.csv.tar.xz_features.csv")
+    pd.testing.assert_frame_equal(single, chunks)
+    assert len(single) == 40
+
+
+def test_load_dataset_when_length_is_none_then_missing():
+    capture = HEADER + capture_line(1, 0, "None", FIRST_DEVICE) + capture_line(2, 1, 60, FIRST_DEVICE)
+    dataset = Feature.load_dataset(io.StringIO(capture))
+    assert dataset.columns.tolist() == ["Time", "Length", "src_mac"]
+    assert dataset["Length"].isna().tolist() == [True, False]
+    assert str(dataset["Length"].dtype) == "Int64"
+    assert str(dataset["src_mac"].dtype) == "category"
+
+
+def test_process_partition_when_parquet_then_equal_to_csv_features(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(1)
+    devices = [FIRST_DEVICE, SECOND_DEVICE, "aa:bb:cc:dd:ee:ff"]
+    write_capture(filepath, [
+        capture_line(number, number // 20, int(rng.integers(42, 1515)), devices[number % 3])
+        for number in range(1, 400)])
+    for storage in [STORAGE.CSV.value, STORAGE.PARQUET.value]:
+        PaddingExperiment(str(raw_folder), str(tmp_path / storage), 5, {"linear": LinearPadding()}, storage=storage).execute()
+    (tmp_path / "csv_features").mkdir()
+    process_file("", str(tmp_path / "csv_features"), str(tmp_path / "csv" / "linear" / "16-09-23.xz"))
+    process_partition(str(tmp_path / "parquet"), str(tmp_path / "parquet_features"), "linear", 50, "16-09-23")
+    expected = pd.read_csv(tmp_path / "csv_features" / "16-09-23.xz_features.csv")
+    actual = feature_store(str(tmp_path / "parquet_features")).read(strategy="linear", day="16-09-23")
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+
+
+def test_pad_and_iterate_over_files_when_fused_then_equal_to_features_of_padded_captures(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(2)
+    devices = [FIRST_DEVICE, SECOND_DEVICE, "aa:bb:cc:dd:ee:ff"]
+    lengths = ["None" if number % 13 == 0 else int(rng.integers(42, 1515)) for number in range(1, 600)]
+    write_capture(filepath, [
+        capture_line(number, number // 20, length, devices[number % 3])
+        for number, length in enumerate(lengths, start=1)])
+    strategies = {"linear": LinearPadding(), "random": RandomPadding()}
+    PaddingExperiment(str(raw_folder), str(tmp_path / "padding_data"), 5, strategies, chunk_size=64, seed=42).execute()
+    pad_and_iterate_over_files(str(raw_folder), str(tmp_path / "fused"), strategies, seed=42, chunksize=50)
+    for strategy_name in strategies:
+        (tmp_path / "materialized" / strategy_name).mkdir(parents=True)
+        process_file(
+            "",
+            str(tmp_path / "materialized" / strategy_name),
+            str(tmp_path / "padding_data" / strategy_name / "16-09-23.xz"))
+        expected = pd.read_csv(tmp_path / "materialized" / strategy_name / "16-09-23.xz_features.csv")
+        actual = pd.read_csv(tmp_path / "fused" / strategy_name / "16-09-23.xz_features.csv")
+        pd.testing.assert_frame_equal(actual, expected)
+    output_filepath = tmp_path / "fused" / "random" / "16-09-23.xz_features.csv"
+    modification_time = output_filepath.stat().st_mtime_ns
+    pad_and_iterate_over_files(str(raw_folder), str(tmp_path / "fused"), strategies, seed=42, chunksize=50)
+    assert output_filepath.stat().st_mtime_ns == modification_time
+
+
+def test_process_file_when_capture_has_no_packets_then_empty_features(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    write_capture(filepath, [])
+    process_file(str(raw_folder), str(tmp_path), filepath, chunksize=10)
+    process_file(str(raw_folder), str(tmp_path), filepath, chunksize=10, storage=STORAGE.PARQUET.value)
+    features = pd.read_csv(tmp_path / "16-09-23.csv.tar.xz_features.csv")
+    assert features.empty and features.columns.tolist() == ["avg", "std", "total", "label"]
+    assert feature_store(str(tmp_path), by_strategy=False).read(day="16-09-23").empty
+
+
+def test_iterate_over_partitions_when_parquet_then_feature_store_readable(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(3)
+    write_capture(filepath, [
+        capture_line(number, number // 20, int(rng.integers(42, 1515)), [FIRST_DEVICE, SECOND_DEVICE][number % 2])
+        for number in range(1, 300)])
+    padding_folder = str(tmp_path / "padding_data")
+    PaddingExperiment(str(raw_folder), padding_folder, 5, {"linear": LinearPadding()}, storage=STORAGE.PARQUET.value).execute()
+    features_folder = str(tmp_path / "padding_features")
+    iterate_over_partitions(padding_folder, features_folder, "linear", 50)
+    iterate_over_partitions(padding_folder, features_folder, "linear", 50)
+    features = feature_store(features_folder).read(strategy="linear", day="16-09-23")
+    assert len(features) > 0 and set(features["label"]) == {0, 1}
+
+
+def test_pad_and_iterate_over_files_when_fused_and_parquet_then_equal_to_features_of_padded_partitions(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(4)
+    devices = [FIRST_DEVICE, SECOND_DEVICE, "aa:bb:cc:dd:ee:ff"]
+    write_capture(filepath, [
+        capture_line(number, number // 20, int(rng.integers(42, 1515)), devices[number % 3])
+        for number in range(1, 600)])
+    strategies = {"mtu": Mtu(), "random": RandomPadding()}
+    padding_folder = str(tmp_path / "padding_data")
+    PaddingExperiment(
+        str(raw_folder), padding_folder, 5, strategies, chunk_size=64, seed=42, storage=STORAGE.PARQUET.value).execute()
+    fused_folder = str(tmp_path / "fused")
+    pad_and_iterate_over_files(str(raw_folder), fused_folder, strategies, 42, 50, STORAGE.PARQUET.value)
+    pad_and_iterate_over_files(str(raw_folder), fused_folder, strategies, 42, 50, STORAGE.PARQUET.value)
+    for strategy_name in strategies:
+        iterate_over_partitions(padding_folder, str(tmp_path / "materialized"), strategy_name, 50)
+        expected = feature_store(str(tmp_path / "materialized")).read(strategy=strategy_name, day="16-09-23")
+        actual = feature_store(fused_folder).read(strategy=strategy_name, day="16-09-23")
+        pd.testing.assert_frame_equal(actual, expected)
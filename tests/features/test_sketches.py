@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from pytest import mark, raises
+
+from adaptive_padding.features.sketches import LengthSketch, QUANTILE_COLUMNS, QUANTILES
+from adaptive_padding.features.windows import WindowAggregator
+from adaptive_padding.prepare_features import process_file
+from adaptive_padding.utils.storage import windowed_feature_store
+from tests.capture import write_capture, capture_line
+
+FIRST_DEVICE = "d0:52:a8:00:67:5e"
+SECOND_DEVICE = "44:65:0d:56:cc:d3"
+
+
+@mark.parametrize("bin_width", [1, 8, 95])
+def test_length_sketch_quantiles_when_many_lengths_then_within_one_bin_of_exact_quantiles(bin_width):
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(42, 1515, size=(3, 5_000))
+    sketch = LengthSketch(bin_width)
+    counts = sketch.bin_counts(lengths.ravel(), np.repeat(np.arange(3), 5_000), 3)
+    assert counts.shape == (3, sketch.number_bins) and counts.sum(axis=1).tolist() == [5_000] * 3
+    expected = np.quantile(lengths, QUANTILES, axis=1).T
+    assert np.all(np.abs(sketch.quantiles(counts) - expected) <= bin_width)
+
+
+def test_length_sketch_when_invalid_bin_width_then_error():
+    with raises(ValueError):
+        LengthSketch(0)
+
+
+def test_window_aggregator_when_sketches_merged_then_equal_to_single_pass():
+    rng = np.random.default_rng(1)
+    dataset = pd.DataFrame({
+        "src_mac": rng.integers(0, 3, size=2_000),
+        "Time": np.sort(rng.uniform(0, 60, size=2_000)),
+        "Length": rng.integers(42, 1515, size=2_000)})
+    sketch = LengthSketch()
+    single = WindowAggregator([1, 10], sketch)
+    single.add(dataset)
+    first, second = WindowAggregator([1, 10], sketch), WindowAggregator([1, 10], sketch)
+    first.add(dataset.iloc[:700])
+    second.add(dataset.iloc[700:])
+    merged = first.merge(second).features()
+    expected = single.features()
+    assert merged.columns.tolist() == single.columns
+    pd.testing.assert_frame_equal(merged, expected)
+    assert (expected[sketch.bin_columns].sum(axis=1) == expected["count"]).all()
+    assert (np.diff(expected[QUANTILE_COLUMNS].to_numpy(), axis=1) >= 0).all()
+    with raises(ValueError):
+        first.merge(WindowAggregator([1, 10], LengthSketch(16)))
+
+
+def test_process_file_when_sketch_and_parquet_then_sketch_columns_stored(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(2)
+    devices = [FIRST_DEVICE, SECOND_DEVICE]
+    write_capture(filepath, [
+        capture_line(number, number // 20, int(rng.integers(42, 1515)), devices[number % 2])
+        for number in range(1, 400)])
+    sketch = LengthSketch(16)
+    process_file(str(raw_folder), str(tmp_path), filepath, chunksize=50, storage="parquet", windows=[5], sketch=sketch)
+    features = windowed_feature_store(str(tmp_path), by_strategy=False).read(day="16-09-23")
+    assert set(sketch.columns).issubset(features.columns)
+    assert (features[sketch.bin_columns].sum(axis=1) == features["count"]).all()
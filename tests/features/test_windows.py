@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from pytest import approx
+
+from adaptive_padding.features.windows import WindowAggregator, WINDOWED_FEATURE_COLUMNS
+from adaptive_padding.prepare_features import process_file
+from tests.capture import write_capture, capture_line
+
+FIRST_DEVICE = "d0:52:a8:00:67:5e"
+SECOND_DEVICE = "44:65:0d:56:cc:d3"
+
+
+def test_window_aggregator_when_read_in_chunks_then_equal_to_groupby_per_window():
+    rng = np.random.default_rng(0)
+    dataset = pd.DataFrame({
+        "src_mac": rng.integers(0, 3, size=2_000),
+        "Time": np.sort(rng.uniform(0, 120, size=2_000)),
+        "Length": rng.integers(42, 1515, size=2_000)})
+    windows = [0.5, 1, 5, 30]
+    aggregator = WindowAggregator(windows)
+    for start in range(0, len(dataset), 300):
+        aggregator.add(dataset.iloc[start:start + 300])
+    actual = aggregator.features()
+    assert actual.columns.tolist() == WINDOWED_FEATURE_COLUMNS
+    for window in windows:
+        groups = dataset.groupby(["src_mac", np.floor(dataset["Time"] / window)])["Length"]
+        expected = groups.agg(["mean", "std", "sum", "count"]).dropna()
+        selected = actual[actual["window"] == window]
+        assert selected["label"].tolist() == expected.index.get_level_values("src_mac").tolist()
+        assert selected["avg"].tolist() == approx(expected["mean"].tolist())
+        assert selected["std"].tolist() == approx(expected["std"].tolist())
+        assert selected["total"].tolist() == expected["sum"].tolist()
+        assert selected["count"].tolist() == expected["count"].tolist()
+
+
+def test_process_file_when_windows_then_one_second_window_equal_to_per_second_features(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    rng = np.random.default_rng(1)
+    devices = [FIRST_DEVICE, SECOND_DEVICE, "aa:bb:cc:dd:ee:ff"]
+    write_capture(filepath, [
+        capture_line(number, number // 15, int(rng.integers(42, 1515)), devices[number % 3])
+        for number in range(1, 500)])
+    process_file(str(raw_folder), str(tmp_path), filepath, chunksize=40, windows=[1, 5])
+    features = pd.read_csv(tmp_path / "16-09-23.csv.tar.xz_features.csv")
+    windowed = pd.read_csv(tmp_path / "16-09-23.csv.tar.xz_windowed_features.csv")
+    assert sorted(windowed["window"].unique()) == [1, 5]
+    one_second = windowed[windowed["window"] == 1].reset_index(drop=True)
+    pd.testing.assert_frame_equal(one_second[features.columns], features, check_dtype=False)
+    assert len(windowed[windowed["window"] == 5]) < len(one_second)
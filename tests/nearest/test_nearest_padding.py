@@ -1,3 +1,4 @@
+import numpy as np
 from pytest import mark
 
 
@@ -5,3 +6,10 @@ from pytest import mark
 def test_nearest_pad(create_nearest_padding, length, expected):
     actual: int = create_nearest_padding.pad(length)
     assert expected == actual
+
+
+def test_nearest_pad_many_equal_to_pad(create_nearest_padding):
+    lengths = np.arange(1, 1520)
+    expected = [create_nearest_padding.pad(int(length)) for length in lengths]
+    actual = create_nearest_padding.pad_many(lengths)
+    assert expected == actual.tolist()
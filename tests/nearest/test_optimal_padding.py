@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from pytest import mark
+
+from adaptive_padding.padding.nearest.external_integration import PythonExternalIntegration
+from adaptive_padding.padding.nearest.optimal_padding import compute_cost_matrix, optimal_padding
+from adaptive_padding.utils.histogram import load_histogram
+
+
+def discrete_optimal_padding_reference(number_buckets, lengths, frequencies):
+    """
+    Direct port of discrete_optimal_padding from OptimalPadding.jl, with zero-based indices.
+    """
+    cost_matrix = compute_cost_matrix(lengths, frequencies)
+    number_lengths = len(lengths)
+    d = np.zeros((number_buckets, number_lengths), dtype=np.int64)
+    pred = np.zeros((number_buckets, number_lengths), dtype=np.int64)
+    d[0] = cost_matrix[0]
+    for layer in range(1, number_buckets):
+        for j in range(1, number_lengths):
+            d[layer, j] = np.iinfo(np.int64).max
+            for i in range(j):
+                if cost_matrix[i + 1, j] + d[layer - 1, i] < d[layer, j]:
+                    d[layer, j] = cost_matrix[i + 1, j] + d[layer - 1, i]
+                    pred[layer, j] = i
+    y = np.zeros(number_buckets, dtype=np.int64)
+    y[-1] = number_lengths - 1
+    for layer in range(number_buckets - 2, -1, -1):
+        y[layer] = pred[layer + 1, y[layer + 1]]
+    return d[-1, -1], lengths[y]
+
+
+def test_cost_matrix_when_padding_to_largest_length():
+    cost_matrix = compute_cost_matrix(np.array([60, 100, 1500]), np.array([2, 1, 3]))
+    assert cost_matrix[0, 1] == 2 * 40
+    assert cost_matrix[0, 2] == 2 * 1440 + 1400
+    assert cost_matrix[1, 2] == 1400
+    assert cost_matrix[2, 2] == 0
+
+
+@mark.parametrize("seed", range(20))
+def test_optimal_padding_equal_to_reference(seed):
+    rng = np.random.default_rng(seed)
+    number_lengths = int(rng.integers(2, 40))
+    lengths = np.sort(rng.choice(np.arange(40, 1515), size=number_lengths, replace=False))
+    frequencies = rng.integers(1, 4, size=number_lengths)
+    number_buckets = int(rng.integers(1, number_lengths + 1))
+    expected_padding, expected_lengths = discrete_optimal_padding_reference(number_buckets, lengths, frequencies)
+    actual_padding, actual_lengths = optimal_padding(lengths, frequencies, number_buckets)
+    assert expected_padding == actual_padding
+    assert expected_lengths.tolist() == actual_lengths.tolist()
+
+
+def test_python_external_integration_when_histogram_loaded_from_packet_sizes(tmp_path):
+    filepath = tmp_path / "packet_sizes.csv"
+    pd.DataFrame({"Length": [60, 60, 66, 1514, 1514, 342, 350]}).to_csv(filepath, index=False)
+    actual = PythonExternalIntegration(load_histogram(str(filepath)), number_buckets=3).execute()
+    assert actual == [66, 350, 1514]
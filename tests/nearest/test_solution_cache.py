@@ -0,0 +1,29 @@
+import numpy as np
+
+from adaptive_padding.padding.nearest import solution_cache
+from adaptive_padding.padding.nearest.optimal_padding import optimal_padding
+from adaptive_padding.padding.nearest.solution_cache import solve_with_cache, SolutionCache
+from adaptive_padding.utils.histogram import LengthHistogram
+
+
+def create_histogram():
+    return LengthHistogram.from_lengths(np.random.default_rng(0).integers(42, 1515, size=5000))
+
+
+def test_solve_with_cache_when_sweeping_then_equal_to_solving_each_number_of_buckets():
+    histogram = create_histogram()
+    lengths, frequencies = histogram.lengths_and_frequencies()
+    actual = solve_with_cache(histogram, range(2, 17))
+    for number_buckets in range(2, 17):
+        _, expected = optimal_padding(lengths, frequencies, number_buckets)
+        assert expected.tolist() == actual[number_buckets]
+
+
+def test_solve_with_cache_when_cached_then_not_solved_again(tmp_path, monkeypatch):
+    histogram = create_histogram()
+    expected = solve_with_cache(histogram, [4, 10], str(tmp_path))
+    assert sorted(SolutionCache(str(tmp_path)).load(histogram.digest())) == [4, 10]
+    monkeypatch.setattr(solution_cache, "optimal_padding_sweep", lambda lengths, frequencies, numbers_buckets: {
+        number_buckets: (0, np.zeros(0, dtype=np.int64)) for number_buckets in numbers_buckets})
+    actual = solve_with_cache(histogram, [4, 10], str(tmp_path))
+    assert expected == actual
@@ -0,0 +1,58 @@
+import numpy as np
+
+from adaptive_padding.build_histograms import scan_capture, iterate_over_files
+from adaptive_padding.constants import HISTOGRAM_GROUP
+from adaptive_padding.utils.histogram import DEFAULT_KEY, LengthHistogram, merge_histograms, save_histograms, load_histograms
+from tests.capture import write_capture, capture_line
+
+
+def test_histogram_when_added_in_batches_then_equal_to_single_batch():
+    lengths = np.random.default_rng(0).integers(42, 1515, size=1000)
+    histogram = LengthHistogram()
+    for batch in np.array_split(lengths, 4):
+        histogram.add(batch)
+    assert histogram == LengthHistogram.from_lengths(lengths)
+    assert histogram.total == 1000
+
+
+def test_histogram_merge():
+    merged = merge_histograms(
+        {"all": LengthHistogram.from_lengths(np.array([60, 60, 1514]))},
+        {"all": LengthHistogram.from_lengths(np.array([66])), "day": LengthHistogram.from_lengths(np.array([100]))})
+    lengths, frequencies = merged["all"].lengths_and_frequencies()
+    assert lengths.tolist() == [60, 66, 1514]
+    assert frequencies.tolist() == [2, 1, 1]
+    assert merged["day"].total == 1
+
+
+def test_histograms_when_saved_then_loaded_unchanged(tmp_path):
+    histograms = {
+        "d0:52:a8:00:67:5e": LengthHistogram.from_lengths(np.array([60, 1514])),
+        "44:65:0d:56:cc:d3": LengthHistogram.from_lengths(np.array([66]))}
+    save_histograms(str(tmp_path / "histograms.npz"), histograms)
+    assert load_histograms(str(tmp_path / "histograms.npz")) == histograms
+
+
+def test_scan_capture_per_device(tmp_path):
+    filepath = str(tmp_path / "16-09-23.csv.tar.xz")
+    write_capture(filepath, [
+        capture_line(1, 0, 60, "d0:52:a8:00:67:5e"),
+        capture_line(2, 0, "None", "d0:52:a8:00:67:5e"),
+        capture_line(3, 1, 1514, "44:65:0d:56:cc:d3"),
+        capture_line(4, 1, 66, "aa:bb:cc:dd:ee:ff"),
+        capture_line(5, 2, 60, "d0:52:a8:00:67:5e")])
+    histograms = scan_capture(filepath, HISTOGRAM_GROUP.DEVICE, {"d0:52:a8:00:67:5e", "44:65:0d:56:cc:d3"}, chunksize=2)
+    assert sorted(histograms) == ["44:65:0d:56:cc:d3", "d0:52:a8:00:67:5e"]
+    assert histograms["d0:52:a8:00:67:5e"] == LengthHistogram.from_lengths(np.array([60, 60]))
+    assert histograms["44:65:0d:56:cc:d3"] == LengthHistogram.from_lengths(np.array([1514]))
+
+
+def test_iterate_over_files_when_capture_changes_then_rescanned(tmp_path):
+    raw_folder = tmp_path / "Raw"
+    raw_folder.mkdir()
+    filepath = str(raw_folder / "16-09-23.csv.tar.xz")
+    write_capture(filepath, [capture_line(1, 0, 60, "d0:52:a8:00:67:5e")])
+    iterate_over_files(str(raw_folder), str(tmp_path), HISTOGRAM_GROUP.ALL, None, chunksize=10)
+    write_capture(filepath, [capture_line(1, 0, 66, "d0:52:a8:00:67:5e")])
+    histograms = iterate_over_files(str(raw_folder), str(tmp_path), HISTOGRAM_GROUP.ALL, None, chunksize=10)
+    assert histograms[DEFAULT_KEY] == LengthHistogram.from_lengths(np.array([66]))
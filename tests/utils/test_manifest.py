@@ -0,0 +1,32 @@
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.utils.manifest import Manifest, fingerprint, code_version
+
+
+def test_manifest_when_saved_then_fingerprints_compare_equal_after_loading(tmp_path):
+    output = tmp_path / "output.csv"
+    output.write_text("avg,std,total,label\n")
+    manifest = Manifest(str(tmp_path))
+    artifact_fingerprint = fingerprint(input="abc", parameters={"lengths": (60, 1500)}, seed=None)
+    manifest.record("near/16-09-23.csv.tar.xz", artifact_fingerprint)
+    manifest.save()
+    loaded = Manifest(str(tmp_path))
+    assert loaded.is_fresh("near/16-09-23.csv.tar.xz", artifact_fingerprint, [str(output)])
+    changed_fingerprint = fingerprint(input="abd", parameters={"lengths": (60, 1500)}, seed=None)
+    assert not loaded.is_fresh("near/16-09-23.csv.tar.xz", changed_fingerprint)
+    output.unlink()
+    assert not loaded.is_fresh("near/16-09-23.csv.tar.xz", artifact_fingerprint, [str(output)])
+
+
+def test_file_digest_when_file_changes_then_digest_changes(tmp_path):
+    capture = tmp_path / "16-09-23.csv.tar.xz"
+    capture.write_bytes(b"first")
+    manifest = Manifest(str(tmp_path))
+    first_digest = manifest.file_digest(str(capture))
+    assert manifest.file_digest(str(capture)) == first_digest
+    capture.write_bytes(b"second day")
+    assert manifest.file_digest(str(capture)) != first_digest
+
+
+def test_code_version_includes_base_classes():
+    assert code_version(Mtu) != code_version(Mtu.__mro__[1])
+    assert code_version(Mtu) == code_version(Mtu)
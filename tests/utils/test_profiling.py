@@ -0,0 +1,49 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from adaptive_padding.utils.profiling import PROFILE_VARIABLE, profiling, stage, profiled, count_rows
+
+
+@profiled("square")
+def square(value):
+    return value * value
+
+
+def test_stage_when_profiling_disabled_then_nothing_written(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_VARIABLE, raising=False)
+    monkeypatch.chdir(tmp_path)
+    with stage("pad", file="16-09-23.csv") as record:
+        record.rows = 10
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiling_when_stages_run_then_json_and_csv_profiles_written(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_VARIABLE, raising=False)
+    with profiling(str(tmp_path), "run_existing_padding"):
+        with stage("pad", file="16-09-23.csv", strategies="mtu") as record:
+            for _ in count_rows([pd.DataFrame({"Length": [1, 2]}), pd.DataFrame({"Length": [3]})], record):
+                pass
+        assert square(3) == 9
+    assert PROFILE_VARIABLE not in os.environ
+    with open(tmp_path / "run_existing_padding.json") as file_reader:
+        records = json.load(file_reader)
+    assert [(record["stage"], record["rows"]) for record in records] == [("pad", 3), ("square", 0)]
+    assert all(record["wall_time"] >= 0 and record["cpu_time"] >= 0 for record in records)
+    profile = pd.read_csv(tmp_path / "run_existing_padding.csv")
+    assert {"stage", "file", "strategies", "rows", "wall_time", "cpu_time", "process_peak_rss", "peak_rss_increase", "rows_per_second"} <= set(profile.columns)
+    assert not (tmp_path / "run_existing_padding.parts").exists()
+
+
+def test_stage_when_block_raises_then_recorded_with_error(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_VARIABLE, raising=False)
+    with profiling(str(tmp_path), "prepare_features"):
+        with pytest.raises(ValueError):
+            with stage("compute_features", file="16-09-23.csv"):
+                raise ValueError("corrupted capture")
+    with open(tmp_path / "prepare_features.json") as file_reader:
+        records = json.load(file_reader)
+    assert [(record["stage"], record["labels"]["file"], record["error"]) for record in records] == [
+        ("compute_features", "16-09-23.csv", "ValueError")]
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from pytest import raises
+
+from adaptive_padding.utils.storage import PartitionedParquetWriter, packet_store, feature_store
+
+
+def test_packet_store_when_written_in_chunks_then_one_partition_per_device(tmp_path):
+    store = packet_store(str(tmp_path))
+    with PartitionedParquetWriter(store) as writer:
+        writer.write_packets("mtu", "16-09-23", np.array([1, 0, 1]), np.array([0.0, 0.0, 1.0]), np.array([60, 70, 80]))
+        writer.write_packets("mtu", "16-09-23", np.array([0, 1]), np.array([2.0, 2.0]), np.array([90, 100]))
+        writer.write_packets("mtu", "16-09-24", np.array([0]), np.array([0.0]), np.array([1500]))
+    assert store.partition_values("day", strategy="mtu") == ["16-09-23", "16-09-24"]
+    assert store.partition_values("device", strategy="mtu", day="16-09-23") == ["0", "1"]
+    packets = store.read(["Time", "Length"], strategy="mtu", day="16-09-23", device=1)
+    assert packets["Length"].tolist() == [60, 80, 100]
+    assert packets["Time"].tolist() == [0.0, 1.0, 2.0]
+    assert store.read(["Length"], strategy="mtu")["Length"].sum() == 60 + 70 + 80 + 90 + 100 + 1500
+
+
+def test_feature_store_when_written_then_read_with_compact_types(tmp_path):
+    store = feature_store(str(tmp_path))
+    features = pd.DataFrame({"avg": [80.0, 342.0], "std": [28.28, 0.0], "total": [160, 684], "label": [0, 3]})
+    store.write(features, strategy="level100", day="16-09-23")
+    loaded = store.read(["avg", "std", "total", "label"], strategy="level100", day="16-09-23")
+    pd.testing.assert_frame_equal(loaded, features, check_dtype=False)
+    assert str(loaded["total"].dtype) == "uint32"
+    assert str(loaded["label"].dtype) == "int8"
+    assert store.read(strategy="level100", day="16-09-24").empty
+
+
+def test_partition_folder_when_keys_are_not_a_prefix_then_error(tmp_path):
+    with raises(ValueError):
+        feature_store(str(tmp_path)).partition_folder(day="16-09-23")
@@ -0,0 +1,51 @@
+import tarfile
+from lzma import open as lzma_open
+
+import numpy as np
+
+from adaptive_padding.experiment.evaluation import PaddingExperiment
+from adaptive_padding.padding.existing.mtu import Mtu
+from adaptive_padding.utils.capture import load_capture
+from adaptive_padding.utils.storage import packet_store
+from adaptive_padding.utils.synthetic import CaptureSpecification, DeviceProfile, write_capture, write_packets
+
+
+def create_specification(**kwargs):
+    devices = [
+        DeviceProfile("d0:52:a8:00:67:5e", packets_per_second=3, distribution="bimodal"),
+        DeviceProfile("44:65:0d:56:cc:d3", packets_per_second=2, lengths=[60, 1514], weights=[3, 1]),
+        DeviceProfile("02:00:00:00:00:01", packets_per_second=5, distribution="uniform")]
+    return CaptureSpecification(devices, duration=130, seed=7, **kwargs)
+
+
+def test_write_capture_when_read_by_pipeline_then_unsw_layout(tmp_path):
+    (tmp_path / "Raw").mkdir()
+    filepath = str(tmp_path / "Raw" / "16-09-23.csv.tar.xz")
+    number_packets = write_capture(filepath, create_specification(missing_length_fraction=0.1))
+    with tarfile.open(filepath) as tar_file:
+        assert tar_file.getnames() == ["16-09-23.csv"]
+    capture = load_capture(filepath)
+    assert len(capture) == number_packets > 0
+    assert capture["Time"].is_monotonic_increasing and capture["Time"].max() < 130
+    assert set(capture.loc[capture["src_mac"] == "44:65:0d:56:cc:d3", "Length"].dropna()) <= {60, 1514}
+    assert 0 < capture["Length"].isna().sum() < number_packets
+    PaddingExperiment(str(tmp_path / "Raw"), str(tmp_path / "padding_data"), 5, {"mtu": Mtu()}).execute()
+    with lzma_open(tmp_path / "padding_data" / "mtu" / "16-09-23.xz", mode="rt", encoding="ISO-8859-1") as file_reader:
+        lengths = {line.split(",")[5] for line in file_reader.readlines()[1:-1]}
+    assert lengths == {'"1500"', '"1514"', '"None"'}
+
+
+def test_generate_when_same_seed_then_same_packets():
+    first = list(create_specification().generate())
+    second = list(create_specification().generate())
+    assert len(first) == 3
+    assert all(a.equals(b) for a, b in zip(first, second))
+    assert not first[0].equals(first[1])
+
+
+def test_write_packets_when_parquet_then_only_iot_devices_stored(tmp_path):
+    specification = create_specification()
+    number_packets = write_packets(str(tmp_path), "16-09-23", specification)
+    packets = packet_store(str(tmp_path)).read(strategy="synthetic", day="16-09-23")
+    assert len(packets) == number_packets
+    assert set(packets["device"].astype(np.int64)) == {0, 1}